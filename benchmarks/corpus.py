@@ -0,0 +1,197 @@
+"""Synthetic benchmark documents, generated deterministically at several sizes.
+
+    python -m benchmarks.corpus --output /tmp/markitdown-corpus
+"""
+import argparse
+import csv
+import os
+import random
+from typing import Callable, Dict, List
+
+SIZES = ('small', 'medium', 'large')
+
+# Units per size: paragraphs, slides, rows, pages or pixels depending on the format
+SIZE_UNITS: Dict[str, Dict[str, int]] = {
+    'docx': {'small': 10, 'medium': 200, 'large': 2000},
+    'pptx': {'small': 3, 'medium': 30, 'large': 150},
+    'xlsx': {'small': 50, 'medium': 2000, 'large': 20000},
+    'pdf': {'small': 1, 'medium': 10, 'large': 50},
+    'csv': {'small': 100, 'medium': 5000, 'large': 50000},
+    'html': {'small': 20, 'medium': 500, 'large': 5000},
+    'png': {'small': 600, 'medium': 1240, 'large': 2480},
+}
+
+WORDS = (
+    'quarterly', 'revenue', 'customer', 'analysis', 'product', 'market', 'report', 'summary',
+    'growth', 'region', 'service', 'project', 'schedule', 'budget', 'forecast', 'review',
+    '매출', '분기', '보고서', '고객', '분석', '요약', '제품', '일정'
+)
+
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+
+def _table_row(rng: random.Random, index: int) -> List[str]:
+    return [f'ITEM-{index:05d}', rng.choice(WORDS), str(rng.randint(1, 1000)), f'{rng.uniform(0, 10000):.2f}']
+
+
+def generate_docx(path: str, units: int, rng: random.Random) -> None:
+    from docx import Document
+
+    document = Document()
+    document.add_heading('Benchmark document', 0)
+    for i in range(units):
+        if i % 20 == 0:
+            document.add_heading(f'Section {i // 20 + 1}', level=1)
+        document.add_paragraph(_sentence(rng, 30))
+        if i % 50 == 25:
+            table = document.add_table(rows=6, cols=4)
+            for row_index, row in enumerate(table.rows):
+                for cell, value in zip(row.cells, _table_row(rng, row_index)):
+                    cell.text = value
+    document.save(path)
+
+
+def generate_pptx(path: str, units: int, rng: random.Random) -> None:
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    presentation = Presentation()
+    for i in range(units):
+        slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+        slide.shapes.title.text = f'Slide {i + 1}: {_sentence(rng, 4)}'
+        body = slide.placeholders[1].text_frame
+        body.text = _sentence(rng)
+        for _ in range(4):
+            body.add_paragraph().text = _sentence(rng)
+        if i % 5 == 4:
+            shape = slide.shapes.add_table(5, 4, Inches(0.5), Inches(4.5), Inches(9), Inches(2))
+            for row_index in range(5):
+                for col_index, value in enumerate(_table_row(rng, row_index)):
+                    shape.table.cell(row_index, col_index).text = value
+    presentation.save(path)
+
+
+def generate_xlsx(path: str, units: int, rng: random.Random) -> None:
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    for sheet_index in range(3):
+        sheet = workbook.active if sheet_index == 0 else workbook.create_sheet()
+        sheet.title = f'Sheet{sheet_index + 1}'
+        sheet.append(['id', 'category', 'quantity', 'amount'])
+        for i in range(units // 3 or 1):
+            sheet.append(_table_row(rng, i))
+    workbook.save(path)
+
+
+def generate_csv(path: str, units: int, rng: random.Random) -> None:
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'category', 'quantity', 'amount'])
+        for i in range(units):
+            writer.writerow(_table_row(rng, i))
+
+
+def generate_html(path: str, units: int, rng: random.Random) -> None:
+    parts = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>Benchmark</title></head><body>']
+    for i in range(units):
+        if i % 25 == 0:
+            parts.append(f'<h2>Section {i // 25 + 1}</h2>')
+        parts.append(f'<p>{_sentence(rng, 25)} <a href="https://example.com/{i}">link</a></p>')
+        if i % 50 == 10:
+            rows = ''.join('<tr>' + ''.join(f'<td>{v}</td>' for v in _table_row(rng, r)) + '</tr>' for r in range(8))
+            parts.append(f'<table><tr><th>id</th><th>category</th><th>quantity</th><th>amount</th></tr>{rows}</table>')
+    parts.append('</body></html>')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(parts))
+
+
+def generate_pdf(path: str, units: int, rng: random.Random) -> None:
+    # A minimal hand-written PDF with a text layer (ASCII only, Helvetica), so no
+    # PDF writer dependency is needed
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>', None, '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    page_ids = []
+    ascii_words = [word for word in WORDS if word.isascii()]
+    for page in range(units):
+        lines = [f'Page {page + 1} benchmark report']
+        lines += [' '.join(rng.choice(ascii_words) for _ in range(10)) for _ in range(45)]
+        stream = 'BT /F1 11 Tf 14 TL 50 790 Td\n' + '\n'.join(f'({line}) Tj T*' for line in lines) + '\nET'
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream')
+        content_id = len(objects)
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>'
+        )
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f'{number} 0 obj\n{body}\nendobj\n'.encode('latin-1')
+    xref_offset = len(output)
+    output += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('latin-1')
+    for offset in offsets:
+        output += f'{offset:010d} 00000 n \n'.encode('latin-1')
+    output += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n'.encode('latin-1')
+    with open(path, 'wb') as f:
+        f.write(output)
+
+
+def generate_png(path: str, units: int, rng: random.Random) -> None:
+    from PIL import Image, ImageDraw
+
+    width, height = units, int(units * 1.414)
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+    line_height = max(12, width // 50)
+    for y in range(line_height * 2, height - line_height, line_height * 2):
+        draw.text((line_height * 2, y), ' '.join(rng.choice(WORDS[:16]) for _ in range(8)), fill='black')
+    image.save(path, format='PNG')
+
+
+GENERATORS: Dict[str, Callable[[str, int, random.Random], None]] = {
+    'docx': generate_docx,
+    'pptx': generate_pptx,
+    'xlsx': generate_xlsx,
+    'pdf': generate_pdf,
+    'csv': generate_csv,
+    'html': generate_html,
+    'png': generate_png,
+}
+
+FORMATS = tuple(GENERATORS)
+
+
+def build_corpus(output_dir: str, formats=FORMATS, sizes=SIZES, seed: int = 42) -> Dict[str, Dict[str, str]]:
+    """Generate (or reuse) every requested document; returns {format: {size: path}}"""
+    os.makedirs(output_dir, exist_ok=True)
+    corpus: Dict[str, Dict[str, str]] = {}
+    for fmt in formats:
+        for size in sizes:
+            path = os.path.join(output_dir, f'{size}.{fmt}')
+            if not os.path.exists(path):
+                GENERATORS[fmt](path, SIZE_UNITS[fmt][size], random.Random(f'{seed}-{fmt}-{size}'))
+            corpus.setdefault(fmt, {})[size] = path
+    return corpus
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Generate the synthetic benchmark corpus')
+    parser.add_argument('--output', default='/tmp/markitdown-corpus')
+    parser.add_argument('--formats', default=','.join(FORMATS))
+    parser.add_argument('--sizes', default=','.join(SIZES))
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.output, args.formats.split(','), args.sizes.split(','))
+    for fmt, paths in corpus.items():
+        for size, path in paths.items():
+            print(f'{fmt:5} {size:6} {os.path.getsize(path) / 1024:10.1f} KB  {path}')
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,295 @@
+"""End-to-end benchmark of every conversion endpoint over the synthetic corpus.
+
+Requests go through the Flask test client in this process, and AI endpoints
+talk to the local mock Azure OpenAI server, so results only depend on this
+code and host. Baselines are JSON files that later runs can be compared to.
+
+    python -m benchmarks.run --iterations 10 --save-baseline benchmarks/baselines/main.json
+    python -m benchmarks.run --iterations 10 --compare benchmarks/baselines/main.json --fail-on-regression
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .corpus import FORMATS, SIZES, build_corpus
+
+
+@dataclass(frozen=True)
+class EndpointSpec:
+    name: str
+    path: str
+    formats: Tuple[str, ...]
+    ai: bool = False
+    stream: bool = False
+
+
+ENDPOINTS = (
+    EndpointSpec('convert', '/convert', ('docx', 'pptx', 'xlsx', 'pdf', 'csv', 'html')),
+    EndpointSpec('convert_with_ai', '/convert_with_ai', ('pdf', 'docx', 'pptx', 'xlsx'), ai=True),
+    EndpointSpec('convert_with_ai_stream', '/convert_with_ai/stream', ('pdf', 'docx', 'pptx', 'xlsx'), ai=True, stream=True),
+    EndpointSpec('convert_image', '/convert_image', ('png',), ai=True),
+    EndpointSpec('convert_image_rest', '/convert-image', ('png',), ai=True),
+    EndpointSpec('convert_image_stream', '/convert-image/stream', ('png',), ai=True, stream=True),
+)
+
+AI_ERROR_MARKER = b'[Error: Failed to analyze'
+
+
+@dataclass
+class CaseResult:
+    endpoint: str
+    format: str
+    size: str
+    requests: int = 0
+    errors: int = 0
+    latencies_ms: List[float] = field(default_factory=list)
+    first_chunk_ms: List[float] = field(default_factory=list)
+    wall_time_s: float = 0.0
+    peak_rss_mb: float = 0.0
+    last_error: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f'{self.endpoint}/{self.format}/{self.size}'
+
+    def summary(self) -> dict:
+        successful = len(self.latencies_ms)
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'throughput_rps': round(successful / self.wall_time_s, 3) if self.wall_time_s else 0.0,
+            'p50_ms': percentile(self.latencies_ms, 50),
+            'p95_ms': percentile(self.latencies_ms, 95),
+            'p99_ms': percentile(self.latencies_ms, 99),
+            'first_chunk_p50_ms': percentile(self.first_chunk_ms, 50),
+            'peak_rss_mb': round(self.peak_rss_mb, 1),
+            'last_error': self.last_error
+        }
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    # Nearest-rank percentile, so small samples report an observed latency
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return round(ordered[int(rank) - 1], 1)
+
+
+class RssSampler:
+    """Polls the process RSS in the background to catch each case's peak"""
+
+    def __init__(self, interval: float = 0.005):
+        from src.shared.infrastructure.utils.process_utils import get_current_rss_bytes
+
+        self._read_rss = get_current_rss_bytes
+        self._interval = interval
+        self._peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self) -> 'RssSampler':
+        self._peak = self._read_rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def peak_mb(self) -> float:
+        return self._peak / (1024 * 1024)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self._peak = max(self._peak, self._read_rss())
+
+
+def run_request(client, spec: EndpointSpec, file_path: str, ai_form: dict) -> Tuple[bool, float, Optional[float], Optional[str]]:
+    form = dict(ai_form) if spec.ai else {}
+    form['format'] = 'json'
+    start = time.perf_counter()
+    first_chunk = None
+
+    with open(file_path, 'rb') as f:
+        form['file'] = (f, os.path.basename(file_path))
+        response = client.post(spec.path, data=form, buffered=not spec.stream)
+        if spec.stream:
+            body = bytearray()
+            for chunk in response.response:
+                if first_chunk is None and b'event: ai_chunk' in chunk:
+                    first_chunk = (time.perf_counter() - start) * 1000
+                body += chunk
+            response.close()
+            body = bytes(body)
+        else:
+            body = response.get_data()
+
+    elapsed = (time.perf_counter() - start) * 1000
+    if response.status_code != 200:
+        return False, elapsed, first_chunk, f'HTTP {response.status_code}: {body[:200].decode("utf-8", "replace")}'
+    if spec.stream and b'event: result' not in body:
+        error_start = body.find(b'event: error')
+        return False, elapsed, first_chunk, body[error_start:error_start + 200].decode('utf-8', 'replace') or 'no result event'
+    if spec.ai and AI_ERROR_MARKER in body:
+        return False, elapsed, first_chunk, 'AI analysis error in markdown'
+    return True, elapsed, first_chunk, None
+
+
+def run_case(client, spec: EndpointSpec, fmt: str, size: str, file_path: str, iterations: int, warmup: int, ai_form: dict) -> CaseResult:
+    result = CaseResult(spec.name, fmt, size)
+    for _ in range(warmup):
+        run_request(client, spec, file_path, ai_form)
+
+    with RssSampler() as sampler:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            ok, elapsed, first_chunk, error = run_request(client, spec, file_path, ai_form)
+            result.requests += 1
+            if ok:
+                result.latencies_ms.append(elapsed)
+                if first_chunk is not None:
+                    result.first_chunk_ms.append(first_chunk)
+            else:
+                result.errors += 1
+                result.last_error = error
+        result.wall_time_s = time.perf_counter() - started
+    result.peak_rss_mb = sampler.peak_mb
+    return result
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold_pct: float) -> List[str]:
+    """Print the differences to a baseline and return the regressed case keys"""
+    regressions = []
+    print(f"\n{'case':45} {'p50 Δ%':>9} {'p95 Δ%':>9} {'rps Δ%':>9} {'rss Δ MB':>9}")
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous or current['p50_ms'] is None or previous.get('p50_ms') is None:
+            continue
+
+        def change(name):
+            return (current[name] - previous[name]) / previous[name] * 100 if previous[name] else 0.0
+
+        p50, p95, rps = change('p50_ms'), change('p95_ms'), change('throughput_rps')
+        rss = current['peak_rss_mb'] - previous['peak_rss_mb']
+        regressed = p95 > threshold_pct or rps < -threshold_pct
+        if regressed:
+            regressions.append(key)
+        print(f"{key:45} {p50:+9.1f} {p95:+9.1f} {rps:+9.1f} {rss:+9.1f}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def print_results(results: Dict[str, dict]) -> None:
+    print(f"\n{'case':45} {'n':>4} {'err':>4} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'1st chunk':>9} {'peak MB':>8}")
+    for key, r in results.items():
+        def fmt(value):
+            return f'{value:.1f}' if value is not None else '-'
+        print(
+            f"{key:45} {r['requests']:>4} {r['errors']:>4} {r['throughput_rps']:>8.2f} {fmt(r['p50_ms']):>9} "
+            f"{fmt(r['p95_ms']):>9} {fmt(r['p99_ms']):>9} {fmt(r['first_chunk_p50_ms']):>9} {r['peak_rss_mb']:>8.1f}"
+        )
+        if r['errors'] and r['last_error']:
+            print(f"{'':45} last error: {r['last_error'][:120]}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark conversion endpoints over a synthetic corpus')
+    parser.add_argument('--corpus-dir', default='/tmp/markitdown-corpus')
+    parser.add_argument('--endpoints', default=','.join(spec.name for spec in ENDPOINTS))
+    parser.add_argument('--formats', default=','.join(FORMATS))
+    parser.add_argument('--sizes', default='small,medium')
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1, help='untimed requests before each case')
+    parser.add_argument('--ai-ttft-ms', type=float, default=200.0)
+    parser.add_argument('--ai-tokens-per-sec', type=float, default=400.0)
+    parser.add_argument('--ai-output-tokens', type=int, default=200)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--save-baseline', help='store the results as a baseline JSON file')
+    parser.add_argument('--compare', help='baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=20.0, help='p95 / throughput change (%%) counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from src.shared.infrastructure.config.settings import AppSettings
+    from src.web.app import create_app
+    from tools.mock_azure_openai import MockConfig, start_in_thread
+
+    selected = set(args.endpoints.split(','))
+    formats = [fmt for fmt in args.formats.split(',') if fmt in FORMATS]
+    sizes = [size for size in args.sizes.split(',') if size in SIZES]
+    corpus = build_corpus(args.corpus_dir, formats, sizes)
+
+    mock_config = MockConfig(
+        latency_distribution='fixed',
+        ttft_ms=args.ai_ttft_ms,
+        tokens_per_sec=args.ai_tokens_per_sec,
+        output_tokens=args.ai_output_tokens,
+        seed=1
+    )
+    # Repeats of a case must convert again, not come from the result cache
+    settings = AppSettings(debug=False, warmup_converters=True, slow_request_threshold_ms=0, convert_cache_max_entries=0)
+    app = create_app(settings)
+    logging.getLogger().setLevel(logging.WARNING)
+    # The mock server's access log would drown the progress output
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    client = app.test_client()
+
+    results: Dict[str, dict] = {}
+    with start_in_thread(mock_config) as mock:
+        ai_form = {'azure_endpoint': mock.endpoint, 'api_key': 'benchmark', 'deployment_name': 'gpt-4o'}
+        for spec in ENDPOINTS:
+            if spec.name not in selected:
+                continue
+            for fmt in spec.formats:
+                for size in sizes:
+                    if fmt not in corpus:
+                        continue
+                    case = run_case(client, spec, fmt, size, corpus[fmt][size], args.iterations, args.warmup, ai_form)
+                    results[case.key] = case.summary()
+                    print(f"{case.key:45} done ({case.requests - case.errors}/{case.requests} ok)", file=sys.stderr)
+        mock_stats = mock.stats.as_dict()
+
+    print_results(results)
+
+    document = {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'iterations': args.iterations,
+            'mock_config': asdict(mock_config),
+            'mock_stats': mock_stats
+        },
+        'results': results
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False, indent=2)
+        print(f'\nSaved results to {path}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline['results'], args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} case(s) regressed by more than {args.threshold:.0f}%')
+            if args.fail_on_regression:
+                return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
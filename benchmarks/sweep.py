@@ -0,0 +1,342 @@
+"""Concurrency sweep against a running server, to find where latency blows up.
+
+Drives a mixed workload at increasing concurrency levels (closed loop: each
+client sends its next request as soon as the previous one finishes), reports
+per-endpoint latency and throughput for every level, finds each endpoint's
+knee and suggests gunicorn worker/thread settings for the host. AI requests go
+to an in-process mock Azure OpenAI server unless --ai-endpoint is given.
+
+    gunicorn --config gunicorn.conf.py main:app &
+    python -m benchmarks.sweep --url http://127.0.0.1:5001 --levels 1,2,4,8,16,32 --duration 20
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .corpus import build_corpus
+from .run import ENDPOINTS, EndpointSpec, percentile
+
+DEFAULT_MIX = 'convert:docx:small=4,convert:pdf:medium=2,convert:xlsx:small=2,convert_with_ai_stream:pdf:small=1,convert_image_rest:png:small=1'
+
+# Stages spent waiting on Azure OpenAI rather than using the worker's CPU
+AI_WAIT_STAGES = ('ai_page', 'ai_batch', 'llm_convert')
+
+
+@dataclass(frozen=True)
+class WorkItem:
+    spec: EndpointSpec
+    format: str
+    size: str
+    weight: float
+
+    @property
+    def key(self) -> str:
+        return f'{self.spec.name}/{self.format}/{self.size}'
+
+
+@dataclass
+class Sample:
+    key: str
+    ok: bool
+    latency_ms: float
+    ai_wait_ms: float
+    error: Optional[str] = None
+
+
+def parse_mix(value: str) -> List[WorkItem]:
+    specs = {spec.name: spec for spec in ENDPOINTS}
+    items = []
+    for entry in value.split(','):
+        target, _, weight = entry.partition('=')
+        name, fmt, size = target.split(':')
+        if name not in specs or fmt not in specs[name].formats:
+            raise ValueError(f'Unknown workload {target}')
+        items.append(WorkItem(specs[name], fmt, size, float(weight or 1)))
+    return items
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    stages = {}
+    for entry in filter(None, (part.strip() for part in (header or '').split(','))):
+        name, _, params = entry.partition(';')
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip() == 'dur':
+                stages[name.strip()] = float(value)
+    return stages
+
+
+def stream_timings(body: bytes) -> Dict[str, float]:
+    marker = body.rfind(b'event: result\ndata: ')
+    if marker < 0:
+        return {}
+    data = body[marker + len(b'event: result\ndata: '):].split(b'\n', 1)[0]
+    try:
+        timings = json.loads(data)['result']['metadata'].get('timings') or {}
+    except (ValueError, KeyError, TypeError):
+        return {}
+    return timings.get('stages', {})
+
+
+def multipart_body(fields: dict, filename: str, content: bytes) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8'))
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: application/octet-stream\r\n\r\n'.encode('utf-8')
+    )
+    parts.append(content)
+    parts.append(f'\r\n--{boundary}--\r\n'.encode('utf-8'))
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def send(base_url: str, item: WorkItem, file_path: str, ai_form: dict, timeout: float) -> Sample:
+    data = dict(ai_form) if item.spec.ai else {}
+    with open(file_path, 'rb') as f:
+        body, content_type = multipart_body(data, os.path.basename(file_path), f.read())
+    http_request = urllib.request.Request(
+        base_url + item.spec.path, data=body, headers={'Content-Type': content_type}, method='POST'
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(http_request, timeout=timeout) as response:
+            body = response.read()
+    except urllib.error.HTTPError as e:
+        e.read()
+        return Sample(item.key, False, (time.perf_counter() - start) * 1000, 0.0, f'HTTP {e.code}')
+    except Exception as e:
+        return Sample(item.key, False, (time.perf_counter() - start) * 1000, 0.0, type(e).__name__)
+
+    latency = (time.perf_counter() - start) * 1000
+    if response.status != 200:
+        return Sample(item.key, False, latency, 0.0, f'HTTP {response.status}')
+    if item.spec.stream:
+        if b'event: result' not in body:
+            return Sample(item.key, False, latency, 0.0, 'no result event')
+        stages = stream_timings(body)
+    else:
+        stages = parse_server_timing(response.headers.get('Server-Timing'))
+    return Sample(item.key, True, latency, sum(stages.get(stage, 0.0) for stage in AI_WAIT_STAGES))
+
+
+def run_level(base_url: str, items: List[WorkItem], corpus: Dict[str, Dict[str, str]], concurrency: int,
+              duration: float, ai_form: dict, timeout: float, seed: int) -> Tuple[List[Sample], float]:
+    samples: List[Sample] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    weights = [item.weight for item in items]
+
+    def client(index: int) -> None:
+        rng = random.Random(f'{seed}-{concurrency}-{index}')
+        while time.perf_counter() < deadline:
+            item = rng.choices(items, weights)[0]
+            sample = send(base_url, item, corpus[item.format][item.size], ai_form, timeout)
+            with lock:
+                samples.append(sample)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict[str, dict]:
+    by_key: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        by_key.setdefault(sample.key, []).append(sample)
+    by_key['ALL'] = samples
+
+    summary = {}
+    for key, group in by_key.items():
+        ok = [s for s in group if s.ok]
+        latencies = [s.latency_ms for s in ok]
+        summary[key] = {
+            'requests': len(group),
+            'error_rate': round(1 - len(ok) / len(group), 4) if group else 0.0,
+            'throughput_rps': round(len(ok) / elapsed, 3),
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'p99_ms': percentile(latencies, 99),
+            'ai_wait_ratio': round(sum(s.ai_wait_ms for s in ok) / sum(latencies), 3) if latencies else 0.0,
+            'errors': sorted({s.error for s in group if s.error})[:3]
+        }
+    return summary
+
+
+def find_knee(levels: Dict[int, Dict[str, dict]], key: str, latency_factor: float, max_error_rate: float) -> Optional[int]:
+    """Highest level before p95 exceeds latency_factor x the lowest level's p95 or errors appear"""
+    knee = None
+    base_p95 = None
+    for concurrency in sorted(levels):
+        stats = levels[concurrency].get(key)
+        if not stats or stats['p95_ms'] is None:
+            continue
+        if base_p95 is None:
+            base_p95 = stats['p95_ms']
+        if stats['p95_ms'] > base_p95 * latency_factor or stats['error_rate'] > max_error_rate:
+            break
+        knee = concurrency
+    return knee
+
+
+def find_throughput_knee(levels: Dict[int, Dict[str, dict]], min_gain: float = 0.1) -> int:
+    """Highest level that still raised total throughput by at least min_gain.
+
+    The mixed workload's p95 is dominated by its slowest endpoint, so its knee
+    is where adding clients stops adding throughput.
+    """
+    ordered = sorted(levels)
+    knee = ordered[0]
+    for previous, current in zip(ordered, ordered[1:]):
+        if levels[current]['ALL']['throughput_rps'] < levels[previous]['ALL']['throughput_rps'] * (1 + min_gain):
+            break
+        knee = current
+    return knee
+
+
+def recommend(levels: Dict[int, Dict[str, dict]], knees: Dict[str, Optional[int]], cpus: int) -> Dict[str, object]:
+    lowest = levels[min(levels)]['ALL']
+    best_level = max(levels, key=lambda c: levels[c]['ALL']['throughput_rps'])
+    ai_wait_ratio = lowest['ai_wait_ratio']
+    cpu_ratio = max(0.05, 1 - ai_wait_ratio)
+    overall_knee = knees['ALL']
+
+    # CPU-bound conversions want about one process per core (they hold the
+    # GIL); time spent waiting on Azure can be overlapped with threads
+    workers = max(2, cpus + 1 if cpu_ratio > 0.5 else cpus)
+    threads = max(1, min(16, round(1 / cpu_ratio)))
+    capacity = workers * threads
+    slowest_p99 = max((s['p99_ms'] or 0) for level in levels.values() for s in level.values())
+
+    recommendation = {
+        'workers': workers,
+        'worker_class': 'gthread' if threads > 1 else 'sync',
+        'threads': threads,
+        'concurrency_capacity': capacity,
+        'observed_knee_concurrency': overall_knee,
+        'peak_throughput_concurrency': best_level,
+        'ai_wait_ratio': ai_wait_ratio,
+        # Long SSE conversions must outlive the worker timeout
+        'timeout_seconds': max(30, math.ceil(slowest_p99 / 1000 * 2)),
+        'backlog': max(64, overall_knee * 4)
+    }
+    if capacity < overall_knee:
+        recommendation['note'] = 'The knee is above the suggested capacity; the host is not the bottleneck at this mix'
+    elif capacity > best_level * 2:
+        recommendation['note'] = 'Throughput peaked well below the suggested capacity; CPU or memory saturates first'
+    return recommendation
+
+
+def print_level(concurrency: int, summary: Dict[str, dict]) -> None:
+    print(f"\nconcurrency {concurrency}")
+    print(f"  {'workload':40} {'n':>5} {'err%':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ai wait':>8}")
+    for key, s in sorted(summary.items(), key=lambda item: item[0] == 'ALL'):
+        def fmt(value):
+            return f'{value:.1f}' if value is not None else '-'
+        print(
+            f"  {key:40} {s['requests']:>5} {s['error_rate'] * 100:>6.1f} {s['throughput_rps']:>8.2f} "
+            f"{fmt(s['p50_ms']):>9} {fmt(s['p95_ms']):>9} {fmt(s['p99_ms']):>9} {s['ai_wait_ratio'] * 100:>7.0f}%"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Ramp concurrency against a running server to find its saturation point')
+    parser.add_argument('--url', default='http://127.0.0.1:5001')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='endpoint:format:size=weight, comma separated')
+    parser.add_argument('--levels', default='1,2,4,8,16,32')
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds per concurrency level')
+    parser.add_argument('--timeout', type=float, default=300.0, help='per-request timeout in seconds')
+    parser.add_argument('--latency-factor', type=float, default=2.0, help='p95 growth over the lowest level that marks the knee')
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--cpus', type=int, default=os.cpu_count(), help='CPUs of the server host')
+    parser.add_argument('--corpus-dir', default='/tmp/markitdown-corpus')
+    parser.add_argument('--ai-endpoint', help='Azure OpenAI endpoint to use instead of the in-process mock')
+    parser.add_argument('--ai-deployment', default='gpt-4o')
+    parser.add_argument('--ai-ttft-ms', type=float, default=800.0)
+    parser.add_argument('--ai-tokens-per-sec', type=float, default=50.0)
+    parser.add_argument('--ai-output-tokens', type=int, default=300)
+    parser.add_argument('--ai-max-concurrency', type=int, default=0, help='mock quota; 429 above this many AI requests in flight')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write levels, knees and recommendation as JSON to this file')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from tools.mock_azure_openai import MockConfig, start_in_thread
+
+    items = parse_mix(args.mix)
+    corpus = build_corpus(args.corpus_dir, sorted({i.format for i in items}), sorted({i.size for i in items}))
+    base_url = args.url.rstrip('/')
+    concurrency_levels = [int(level) for level in args.levels.split(',')]
+
+    mock = None
+    if args.ai_endpoint:
+        ai_endpoint = args.ai_endpoint
+    else:
+        import logging
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        mock = start_in_thread(MockConfig(
+            ttft_ms=args.ai_ttft_ms,
+            tokens_per_sec=args.ai_tokens_per_sec,
+            output_tokens=args.ai_output_tokens,
+            max_concurrency=args.ai_max_concurrency,
+            seed=args.seed
+        ))
+        ai_endpoint = mock.endpoint
+    ai_form = {
+        'azure_endpoint': ai_endpoint,
+        'api_key': os.getenv('AZURE_OPENAI_API_KEY', 'sweep'),
+        'deployment_name': args.ai_deployment
+    }
+
+    levels: Dict[int, Dict[str, dict]] = {}
+    try:
+        for concurrency in concurrency_levels:
+            samples, elapsed = run_level(base_url, items, corpus, concurrency, args.duration, ai_form, args.timeout, args.seed)
+            levels[concurrency] = summarize(samples, elapsed)
+            print_level(concurrency, levels[concurrency])
+    finally:
+        if mock:
+            mock.shutdown()
+
+    keys = sorted({key for summary in levels.values() for key in summary})
+    knees = {key: find_knee(levels, key, args.latency_factor, args.max_error_rate) for key in keys if key != 'ALL'}
+    knees['ALL'] = find_throughput_knee(levels)
+    recommendation = recommend(levels, knees, args.cpus)
+
+    print('\nknee (highest concurrency before p95 > '
+          f'{args.latency_factor:g}x its lowest-level value or errors > {args.max_error_rate:.0%}; '
+          'ALL: before throughput stops growing by 10%)')
+    for key in keys:
+        print(f"  {key:40} {knees[key] if knees[key] is not None else '-'}")
+    print('\nrecommendation')
+    for key, value in recommendation.items():
+        print(f'  {key:30} {value}')
+    print(
+        f"\n  gunicorn --workers {recommendation['workers']} --worker-class {recommendation['worker_class']}"
+        + (f" --threads {recommendation['threads']}" if recommendation['threads'] > 1 else '')
+        + f" --timeout {recommendation['timeout_seconds']} --backlog {recommendation['backlog']}"
+    )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'levels': levels, 'knees': knees, 'recommendation': recommendation}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
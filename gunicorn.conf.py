@@ -1,6 +1,25 @@
 # Gunicorn configuration file
+import gc
 import multiprocessing
 import os
+import shutil
+import sys
+
+# The app is preloaded in the master (see preload_app below), so warm every
+# converter backend there once instead of on each worker's first request
+os.environ.setdefault('WARMUP_CONVERTERS', 'true')
+
+# Each worker keeps its Prometheus samples in this directory so /metrics can
+# aggregate all workers; it must be set before prometheus_client is imported
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/markitdown-metrics')
+
+# Samples of a previous run are cleared here rather than in on_starting: with
+# preload_app the app, and any metric it creates, is imported before that hook.
+# Gunicorn reads this file again on reload, when the live workers' files must stay.
+if os.environ.get('MARKITDOWN_METRICS_DIR_OWNER') != str(os.getpid()):
+    os.environ['MARKITDOWN_METRICS_DIR_OWNER'] = str(os.getpid())
+    shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
 
 # Server socket
 bind = f"0.0.0.0:{os.getenv('PORT', '5001')}"
@@ -13,10 +32,18 @@ worker_connections = 1000
 timeout = 30
 keepalive = 2
 
-# Restart workers after this many requests, to help prevent memory leaks
-max_requests = 1000
+# Sync workers are killed once a request runs past the timeout, so requests get
+# a deadline a few seconds short of it and return what they finished instead
+os.environ.setdefault('REQUEST_DEADLINE_SECONDS', str(timeout - 5))
+
+# Workers are recycled by memory instead (see post_request); a request count
+# limit can still be set as an extra safety net, 0 disables it
+max_requests = int(os.getenv('MAX_REQUESTS', '0'))
 max_requests_jitter = 50
 
+# Gracefully restart a worker once its RSS exceeds this after a request, 0 disables it
+worker_max_rss_mb = int(os.getenv('WORKER_MAX_RSS_MB', '1024'))
+
 # Logging
 accesslog = "-"
 errorlog = "-"
@@ -36,4 +63,66 @@ tmp_upload_dir = None
 
 # SSL (if needed)
 # keyfile = "/path/to/keyfile"
-# certfile = "/path/to/certfile"
\ No newline at end of file
+# certfile = "/path/to/certfile"
+
+# Server hooks
+def when_ready(server):
+    from src.shared.infrastructure.utils.process_utils import get_memory_usage, format_memory_usage
+
+    # Move everything the preloaded app allocated out of the collector's reach,
+    # so garbage collection in the workers does not dirty the shared pages
+    gc.freeze()
+    server.log.info(f"Master ready ({format_memory_usage(get_memory_usage())})")
+
+
+def post_worker_init(worker):
+    from src.shared.infrastructure.utils.process_utils import get_memory_usage, format_memory_usage
+
+    worker.log.info(f"Worker {worker.pid} ready ({format_memory_usage(get_memory_usage())})")
+
+
+def post_request(worker, req, environ, resp):
+    if worker_max_rss_mb <= 0 or not worker.alive:
+        return
+
+    from src.shared.infrastructure.utils.process_utils import get_current_rss_bytes
+
+    rss_mb = get_current_rss_bytes() / (1024 * 1024)
+    if rss_mb <= worker_max_rss_mb:
+        return
+
+    from src.shared.infrastructure.monitoring.metrics import WORKER_RECYCLES
+
+    # post_request runs once the response (including a whole SSE stream) has
+    # been sent; clearing alive lets the worker exit after it, and the arbiter
+    # starts a fresh one from the preloaded master
+    worker.alive = False
+    WORKER_RECYCLES.labels(reason='rss').inc()
+    worker.log.warning(
+        f"Recycling worker {worker.pid}: rss={rss_mb:.1f}MB exceeds WORKER_MAX_RSS_MB={worker_max_rss_mb} "
+        f"after {req.method} {req.path} (request {worker.nr})"
+    )
+
+
+def worker_exit(server, worker):
+    import logging
+
+    # onnxruntime (used by MarkItDown's file type detection) starts native
+    # threads in the preloaded master that do not survive the fork, and its
+    # static destructors then hang the exiting worker until the arbiter kills
+    # it. Only then is the interpreter teardown skipped, exiting with the
+    # status the worker was leaving with; other workers exit normally.
+    if 'onnxruntime' not in sys.modules:
+        return
+    exit_error = sys.exc_info()[1]
+    exit_code = exit_error.code if isinstance(exit_error, SystemExit) else 1
+    logging.shutdown()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(exit_code if isinstance(exit_code, int) else 1)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
\ No newline at end of file
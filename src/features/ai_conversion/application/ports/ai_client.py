@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Dict, Iterator, List
+from .....shared.domain.models.conversion_preset import VisionOptions
 
 
 class AIClientPort(ABC):
@@ -9,5 +10,16 @@ class AIClientPort(ABC):
         pass
     
     @abstractmethod
-    def analyze_image(self, image_bytes: bytes, client: Any, deployment_name: str, page_num: int = None) -> str:
+    def analyze_image(self, image_bytes: bytes, client: Any, deployment_name: str, page_num: int = None, options: VisionOptions = None) -> str:
+        pass
+    
+    def analyze_image_stream(self, image_bytes: bytes, client: Any, deployment_name: str, page_num: int = None, options: VisionOptions = None) -> Iterator[str]:
+        yield self.analyze_image(image_bytes, client, deployment_name, page_num, options=options)
+    
+    def analyze_images(self, images: List[bytes], client: Any, deployment_name: str, page_nums: List[int], options: VisionOptions = None) -> Dict[int, str]:
+        """Analyze several pages in one request, returning markdown per page number"""
+        raise NotImplementedError("This AI client cannot analyze several pages in one request")
+    
+    def warmup(self) -> None:
+        """Load lazily imported backends ahead of the first request"""
         pass
\ No newline at end of file
@@ -0,0 +1,36 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Tuple
+from ...domain.models.batch_job import BatchProgress
+from .....shared.domain.models.conversion_preset import VisionOptions
+
+
+class BatchClientPort(ABC):
+    """Offline analysis of pages through the provider's batch API"""
+
+    @property
+    @abstractmethod
+    def api_version(self) -> str:
+        """API version batches are submitted with; the batch API needs a newer one than chat calls"""
+        pass
+
+    @abstractmethod
+    def create_client(self, endpoint: str, api_key: str) -> Any:
+        pass
+
+    @abstractmethod
+    def page_request(self, image_bytes: bytes, deployment_name: str, page_num: int, options: VisionOptions = None) -> dict:
+        """The submission line that analyzes one page"""
+        pass
+
+    @abstractmethod
+    def submit(self, client: Any, requests: List[dict]) -> BatchProgress:
+        pass
+
+    @abstractmethod
+    def progress(self, client: Any, batch_id: str) -> BatchProgress:
+        pass
+
+    @abstractmethod
+    def results(self, client: Any, progress: BatchProgress, deployment_name: str) -> Tuple[Dict[int, str], Dict[int, str]]:
+        """Markdown of the pages that succeeded and errors of those that did not, by page number"""
+        pass
@@ -1,11 +1,27 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Dict, List
+from .....shared.domain.models.conversion_preset import ImageEncoding
 
 
 class ImageProcessorPort(ABC):
     
     @abstractmethod
-    def convert_pdf_to_images(self, pdf_path: str, dpi: int = 200) -> List[bytes]:
+    def convert_pdf_to_images(self, pdf_path: str, dpi: int = 200, encoding: ImageEncoding = None) -> List[bytes]:
+        """Render every page; encoding defaults to PNG"""
+        pass
+    
+    @abstractmethod
+    def convert_pdf_pages_to_images(self, pdf_path: str, pages: List[int], dpi: int = 200, encoding: ImageEncoding = None) -> List[bytes]:
+        """Render only the given 1-based page numbers, in ascending order"""
+        pass
+    
+    @abstractmethod
+    def convert_pdf_pages_at_dpis(self, pdf_path: str, page_dpis: Dict[int, int], encoding: ImageEncoding = None) -> List[bytes]:
+        """Render each given 1-based page at its own DPI, in ascending page order"""
+        pass
+    
+    @abstractmethod
+    def count_pdf_pages(self, pdf_path: str) -> int:
         pass
     
     @abstractmethod
@@ -13,9 +29,18 @@ class ImageProcessorPort(ABC):
         pass
     
     @abstractmethod
-    def convert_office_document_to_images(self, file_path: str, file_extension: str, dpi: int = 200) -> List[bytes]:
+    def remove_converted_pdf(self, pdf_path: str) -> None:
+        """Delete a PDF made by convert_office_to_pdf, with its temporary directory"""
+        pass
+    
+    @abstractmethod
+    def convert_office_document_to_images(self, file_path: str, file_extension: str, dpi: int = 200, encoding: ImageEncoding = None) -> List[bytes]:
         pass
     
     @abstractmethod
     def convert_document_to_images_basic(self, file_path: str) -> List[bytes]:
+        pass
+    
+    def warmup(self) -> None:
+        """Load lazily imported backends ahead of the first request"""
         pass
\ No newline at end of file
@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from ...domain.models.batch_job import BatchJob
+
+
+class JobStorePort(ABC):
+
+    @abstractmethod
+    def save(self, job: BatchJob) -> None:
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        pass
+
+    @abstractmethod
+    def unfinished(self) -> List[BatchJob]:
+        """Jobs still waiting for their batch"""
+        pass
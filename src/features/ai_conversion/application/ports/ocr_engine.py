@@ -0,0 +1,14 @@
+from abc import ABC, abstractmethod
+from typing import List
+from ...domain.models.ocr_result import OCRPageResult
+
+
+class OCREnginePort(ABC):
+
+    @abstractmethod
+    def recognize_pages(self, images: List[bytes]) -> List[OCRPageResult]:
+        """Recognize the text of each image, in the order given"""
+        pass
+
+    def is_available(self) -> bool:
+        return True
@@ -0,0 +1,11 @@
+from abc import ABC, abstractmethod
+from typing import List
+from ...domain.models.page_detail import PageDetail
+
+
+class PageDetailPort(ABC):
+
+    @abstractmethod
+    def measure_pages(self, images: List[bytes], dpi: int) -> List[PageDetail]:
+        """Measure page previews rendered at dpi, in the order given"""
+        pass
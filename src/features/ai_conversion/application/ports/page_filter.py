@@ -0,0 +1,11 @@
+from abc import ABC, abstractmethod
+from typing import List
+from ...domain.models.page_inspection import PageInspection
+
+
+class PageFilterPort(ABC):
+
+    @abstractmethod
+    def inspect_pages(self, images: List[bytes]) -> List[PageInspection]:
+        """Find blank pages and repeats of earlier pages, in the order given"""
+        pass
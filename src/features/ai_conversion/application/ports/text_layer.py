@@ -0,0 +1,11 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from ...domain.models.page_text import PageTextLayer
+
+
+class TextLayerPort(ABC):
+
+    @abstractmethod
+    def extract_pages(self, pdf_path: str, pages: Optional[List[int]] = None) -> List[PageTextLayer]:
+        """Text layers of all pages, or of the given 1-based page numbers in ascending order"""
+        pass
@@ -1,88 +1,125 @@
+import contextvars
 import logging
-from typing import List
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, replace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from ..ports.ai_client import AIClientPort
 from ..ports.image_processor import ImageProcessorPort
 from ..ports.file_storage import FileStoragePort
+from ..ports.text_layer import TextLayerPort
+from ..ports.ocr_engine import OCREnginePort
+from ..ports.page_filter import PageFilterPort
+from ..ports.page_detail import PageDetailPort
+from ..ports.batch_client import BatchClientPort
+from ..ports.job_store import JobStorePort
+from ...domain.models.batch_job import BATCH_COMPLETED, JOB_COMPLETED, JOB_FAILED, JOB_SUBMITTED, BatchJob
 from ...domain.models.conversion_request import AIConversionRequest
-from ...domain.models.conversion_result import AIConversionResult, AIAnalysisResult
+from .....shared.domain.models.conversion_preset import ImageEncoding, VisionOptions
+from ...domain.models.conversion_result import REASON_DEADLINE, AIConversionResult, AIAnalysisResult
+from ...domain.models.conversion_events import (
+    DocumentAnalyzed, DocumentRendered, PageChunk, PageFinished, PageStarted
+)
+from ...domain.models.page_plan import DocumentPlan, PlannedPage
+from ...domain.models.page_text import PageTextLayer
+from .....shared.domain.models.vision_reply import capture_reply
 from ...domain.services.markdown_enhancer import MarkdownEnhancerService
-from ...domain.exceptions.conversion_exceptions import ConversionFailedException, AIClientException
+from ...domain.services.model_cascade import ModelCascade
+from ...domain.services.page_batcher import PageBatcher
+from ...domain.services.dpi_planner import PREVIEW_DPI, DpiPlanner
+from ...domain.services.page_router import (
+    OCR_ELIGIBLE_REASONS, PAGE_ROUTING_HYBRID, PAGE_ROUTING_VISION, ROUTE_BLANK, ROUTE_DUPLICATE,
+    ROUTE_TEXT, ROUTE_VISION, PageRouter
+)
+from ...domain.exceptions.conversion_exceptions import (
+    ConversionFailedException, AIClientException, PageSelectionException
+)
+from .....shared.infrastructure.monitoring.metrics import (
+    AI_BATCH_JOBS, AI_CASCADE_ESCALATIONS, AI_CASCADE_PAGES, PAGE_ROUTES, PAGES_PROCESSED, track_stage
+)
+from .....shared.infrastructure.monitoring.stage_timer import current_timings
+from .....shared.infrastructure.monitoring.profiler import profiled
+from .....shared.infrastructure.utils.cancellation import CancellationToken, DeadlineExceeded, current_cancellation
 
 logger = logging.getLogger(__name__)
 
+OFFICE_EXTENSIONS = ['.pptx', '.ppt', '.docx', '.doc', '.xlsx', '.xls']
+
 
 class ConvertWithAIUseCase:
-    
+
     def __init__(
         self,
         ai_client: AIClientPort,
         image_processor: ImageProcessorPort,
         file_storage: FileStoragePort,
-        markdown_enhancer: MarkdownEnhancerService
+        markdown_enhancer: MarkdownEnhancerService,
+        text_layer: Optional[TextLayerPort] = None,
+        page_router: Optional[PageRouter] = None,
+        ocr_engine: Optional[OCREnginePort] = None,
+        page_filter: Optional[PageFilterPort] = None,
+        page_batcher: Optional[PageBatcher] = None,
+        page_detail: Optional[PageDetailPort] = None,
+        dpi_planner: Optional[DpiPlanner] = None,
+        model_cascade: Optional[ModelCascade] = None,
+        batch_client: Optional[BatchClientPort] = None,
+        job_store: Optional[JobStorePort] = None
     ):
         self._ai_client = ai_client
         self._image_processor = image_processor
         self._file_storage = file_storage
         self._markdown_enhancer = markdown_enhancer
-    
+        self._text_layer = text_layer
+        self._page_router = page_router or PageRouter()
+        self._ocr_engine = ocr_engine
+        self._page_filter = page_filter
+        self._page_batcher = page_batcher or PageBatcher()
+        self._page_detail = page_detail
+        self._dpi_planner = dpi_planner or DpiPlanner()
+        self._model_cascade = model_cascade or ModelCascade()
+        self._batch_client = batch_client
+        self._job_store = job_store
+
+    @property
+    def markdown_enhancer(self) -> MarkdownEnhancerService:
+        return self._markdown_enhancer
+
     def execute(self, request: AIConversionRequest) -> AIConversionResult:
         try:
-            azure_client = self._ai_client.create_client(
-                request.azure_endpoint, 
-                request.api_key, 
-                request.api_version
-            )
-            
-            extension = request.filename.lower().split('.')[-1]
-            extension = f'.{extension}'
-            
-            image_bytes_list = self._convert_document_to_images(
-                request.file_path, extension, request.dpi
-            )
-            
-            analysis_results = []
             markdown_pages = []
-            
-            for i, image_bytes in enumerate(image_bytes_list):
-                try:
-                    page_markdown = self._ai_client.analyze_image(
-                        image_bytes, azure_client, request.deployment_name, i + 1
-                    )
-                    markdown_pages.append(page_markdown)
-                    analysis_results.append(AIAnalysisResult(
-                        page=i + 1,
-                        status='success',
-                        content_length=len(page_markdown)
-                    ))
-                    logger.info(f"Successfully analyzed page {i + 1}")
-                
-                except Exception as e:
-                    error_markdown = f"# Page {i + 1}\n\n[Error: Failed to analyze this page - {str(e)}]\n\n"
-                    markdown_pages.append(error_markdown)
-                    analysis_results.append(AIAnalysisResult(
-                        page=i + 1,
-                        status='error',
-                        error=str(e)
-                    ))
-                    logger.error(f"Failed to analyze page {i + 1}: {str(e)}")
-            
+            analyzed = None
+
+            for event in self.stream(request, stream_pages=False):
+                if isinstance(event, PageStarted):
+                    markdown_pages.append('')
+                elif isinstance(event, PageChunk):
+                    markdown_pages[-1] += event.content
+                elif isinstance(event, PageFinished) and event.error_markdown:
+                    markdown_pages[-1] += event.error_markdown
+                elif isinstance(event, DocumentAnalyzed):
+                    analyzed = event
+
             combined_markdown = "\n\n---\n\n".join(markdown_pages)
-            
+
             if request.enhance_markdown:
-                combined_markdown = self._markdown_enhancer.enhance_markdown_structure(
-                    combined_markdown, request.filename
-                )
-            
+                with track_stage('enhance'):
+                    combined_markdown = self._markdown_enhancer.enhance_markdown_structure(
+                        combined_markdown, request.filename
+                    )
+
+            analysis_results = analyzed.analysis_results
             successful_pages = len([r for r in analysis_results if r.status == 'success'])
             failed_pages = len([r for r in analysis_results if r.status == 'error'])
-            
+
             return AIConversionResult(
                 success=True,
                 markdown=combined_markdown,
                 analysis_results=analysis_results,
-                pages_processed=len(image_bytes_list),
+                pages_processed=len(analysis_results),
                 successful_pages=successful_pages,
                 failed_pages=failed_pages,
+                partial=analyzed.partial,
                 metadata={
                     'original_filename': request.filename,
                     'converted_size': len(combined_markdown),
@@ -90,10 +127,19 @@ class ConvertWithAIUseCase:
                     'method': 'ai_image_analysis',
                     'llm_model': request.deployment_name,
                     'azure_endpoint': request.azure_endpoint,
-                    'dpi': request.dpi if extension == '.pdf' else None
+                    'dpi': self._dpi_label(request),
+                    'page_routing': analyzed.routing,
+                    'pages': str(request.pages) if request.pages is not None else None,
+                    'preset': request.preset.describe() if request.preset is not None else None,
+                    'cascade': analyzed.cascade,
+                    'partial': analyzed.partial,
+                    'timings': current_timings()
                 }
             )
-            
+
+        except (DeadlineExceeded, PageSelectionException):
+            # Nothing was converted in time or nothing was selected; the caller answers accordingly
+            raise
         except Exception as e:
             return AIConversionResult(
                 success=False,
@@ -104,11 +150,670 @@ class ConvertWithAIUseCase:
                 successful_pages=0,
                 failed_pages=0
             )
-    
-    def _convert_document_to_images(self, file_path: str, extension: str, dpi: int) -> List[bytes]:
+
+    def submit_deferred(self, request: AIConversionRequest) -> BatchJob:
+        """Render the document and submit its model pages as one batch API job, returning the stored job.
+
+        Pages are planned as for an interactive conversion, so text layer, OCR,
+        blank and duplicate pages are settled here and only the vision pages
+        are submitted; multi-page requests and cascade mode do not apply. The
+        job's result is assembled by refresh_deferred once the batch finished.
+        """
+        if self._batch_client is None or self._job_store is None:
+            raise ConversionFailedException("Deferred AI conversion is not available")
+
+        plan = self._plan_document(replace(request, batch_pages=False))
+        now = time.time()
+        job = BatchJob(
+            job_id=uuid.uuid4().hex,
+            filename=request.filename,
+            status=JOB_SUBMITTED,
+            created_at=now,
+            updated_at=now,
+            azure_endpoint=request.azure_endpoint,
+            api_version=self._batch_client.api_version,
+            deployment_name=request.deployment_name,
+            enhance_markdown=request.enhance_markdown,
+            pages=[self._deferred_page(planned) for planned in plan.pages],
+            routing=plan.routing_summary(),
+            metadata={
+                'original_filename': request.filename,
+                'enhanced': request.enhance_markdown,
+                'method': 'ai_batch_analysis',
+                'llm_model': request.deployment_name,
+                'azure_endpoint': request.azure_endpoint,
+                'dpi': self._dpi_label(request),
+                'pages': str(request.pages) if request.pages is not None else None,
+                'preset': request.preset.describe() if request.preset is not None else None
+            }
+        )
+
+        vision_pages = [planned for planned in plan.pages if planned.route == ROUTE_VISION]
+        if vision_pages:
+            client = self._batch_client.create_client(request.azure_endpoint, request.api_key)
+            options = self._vision_options(request)
+            with track_stage('ai_batch_submit', pages=len(vision_pages)):
+                job.batch = self._batch_client.submit(client, [
+                    self._batch_client.page_request(planned.image_bytes, request.deployment_name, planned.page, options)
+                    for planned in vision_pages
+                ])
+            AI_BATCH_JOBS.labels(status=JOB_SUBMITTED).inc()
+        else:
+            # Nothing for the model; the job is complete right away
+            self._finish_deferred(job, {}, {})
+        self._job_store.save(job)
+        return job
+
+    def deferred_job(self, job_id: str) -> Optional[BatchJob]:
+        return self._job_store.get(job_id) if self._job_store is not None else None
+
+    def unfinished_deferred_jobs(self) -> List[BatchJob]:
+        return self._job_store.unfinished() if self._job_store is not None else []
+
+    def refresh_deferred(self, job: BatchJob, api_key: str) -> BatchJob:
+        """Check the job's batch once; when it finished, assemble and store the job's result"""
+        if job.finished:
+            return job
+
+        client = self._batch_client.create_client(job.azure_endpoint, api_key)
+        job.batch = self._batch_client.progress(client, job.batch.batch_id)
+        if job.batch.status == BATCH_COMPLETED:
+            contents, errors = self._batch_client.results(client, job.batch, job.deployment_name)
+            self._finish_deferred(job, contents, errors)
+        elif job.batch.finished:
+            job.status = JOB_FAILED
+            job.error = job.batch.error or f"Batch {job.batch.batch_id} ended as {job.batch.status}"
+            AI_BATCH_JOBS.labels(status=JOB_FAILED).inc()
+            logger.warning(f"Deferred job {job.job_id} failed: {job.error}")
+
+        job.updated_at = time.time()
+        self._job_store.save(job)
+        return job
+
+    def stream(self, request: AIConversionRequest, stream_pages: bool = True) -> Iterator[Any]:
+        """Convert the document page by page, yielding conversion events.
+
+        Rendering failures and a page selection that matches no page of the
+        document raise; a page that fails is reported in its
+        PageFinished event and the remaining pages still run. Under a request
+        deadline, model pages that would not finish in time are skipped and a
+        page cut off by it is reported as 'timeout', so the pages done so far
+        still make a (partial) document; DeadlineExceeded only escapes when
+        the deadline passes while rendering.
+
+        With a preset allowing more than one concurrent page, the model calls
+        of the next single vision pages start ahead of their turn; such a page
+        still comes out in order, as one chunk.
+
+        In cascade mode a single vision page is first analyzed, unstreamed, on
+        request.cascade_deployment, and only an answer the cascade finds weak
+        is analyzed again on request.deployment_name. Batches go to
+        deployment_name directly.
+        """
+        azure_client = self._ai_client.create_client(
+            request.azure_endpoint,
+            request.api_key,
+            request.api_version
+        )
+
+        plan = self._plan_document(request)
+        yield DocumentRendered(plan.total_pages, plan.routing_summary())
+
+        options = self._vision_options(request)
+        concurrency = request.preset.page_concurrency if request.preset is not None else 1
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='ai-page') if concurrency > 1 else None
+        # Model calls started ahead of their page's turn
+        prefetched: Dict[int, Future] = {}
+
+        try:
+            yield from self._analyze_plan(
+                plan, request, azure_client, stream_pages, options, executor, concurrency, prefetched
+            )
+        finally:
+            if executor is not None:
+                for future in prefetched.values():
+                    future.cancel()
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _analyze_plan(
+        self,
+        plan: DocumentPlan,
+        request: AIConversionRequest,
+        azure_client: Any,
+        stream_pages: bool,
+        options: Optional[VisionOptions],
+        executor: Optional[ThreadPoolExecutor],
+        concurrency: int,
+        prefetched: Dict[int, Future]
+    ) -> Iterator[Any]:
+        analysis_results = []
+        # Analyses of pages that later pages repeat
+        originals = {planned.duplicate_of for planned in plan.pages if planned.duplicate_of is not None}
+        contents = {}
+        batch_contents = {}
+        emitted = 0
+        token = current_cancellation()
+        # Durations of the model calls so far, to tell whether another one still fits
+        call_seconds = []
+        out_of_time = False
+
+        for index, planned in enumerate(plan.pages):
+            if planned.route == ROUTE_BLANK:
+                result = AIAnalysisResult(page=planned.page, status='skipped', content_length=0, route=ROUTE_BLANK)
+                analysis_results.append(result)
+                PAGE_ROUTES.labels(route=ROUTE_BLANK).inc()
+                yield PageFinished(result)
+                continue
+
+            if planned.route == ROUTE_DUPLICATE and planned.duplicate_of not in contents:
+                # The original failed, so this page gets its own analysis
+                planned.route, planned.reason, planned.duplicate_of = ROUTE_VISION, 'original_failed', None
+
+            # Pages of a batch that already came back need no call of their own
+            model_call = planned.route == ROUTE_VISION and planned.page not in batch_contents
+            # A call already under way is waited for
+            if model_call and planned.page not in prefetched:
+                out_of_time = out_of_time or not self._call_fits(token, call_seconds)
+                if out_of_time:
+                    result = AIAnalysisResult(page=planned.page, status='skipped', route=planned.route, reason=REASON_DEADLINE)
+                    analysis_results.append(result)
+                    PAGES_PROCESSED.labels(status='skipped').inc()
+                    yield PageFinished(result)
+                    continue
+
+            if executor is not None and model_call:
+                self._prefetch_pages(
+                    executor, concurrency, plan.pages[index:], prefetched, azure_client, request, options, token,
+                    call_seconds
+                )
+
+            yield PageStarted(planned.page, emitted, plan.total_pages, planned.route)
+            emitted += 1
+
+            started = time.perf_counter()
+            call_time = None
+            content = ''
+            try:
+                if planned.route == ROUTE_DUPLICATE:
+                    content = contents[planned.duplicate_of]
+                    yield PageChunk(planned.page, content, planned.route)
+                elif planned.route != ROUTE_VISION:
+                    content = planned.text
+                    yield PageChunk(planned.page, content, planned.route)
+                elif planned.page in prefetched:
+                    content, call_time = prefetched.pop(planned.page).result()
+                    yield PageChunk(planned.page, content, planned.route)
+                elif planned.batch is not None and self._run_batch(plan, planned, azure_client, request, batch_contents, options):
+                    content = batch_contents.pop(planned.page)
+                    yield PageChunk(planned.page, content, planned.route)
+                else:
+                    with track_stage('ai_page', page=planned.page):
+                        for chunk in self._analyze_vision_page(planned, azure_client, request, stream_pages, options):
+                            content += chunk
+                            yield PageChunk(planned.page, chunk, planned.route)
+
+                if model_call:
+                    call_seconds.append(call_time if call_time is not None else time.perf_counter() - started)
+                if planned.page in originals:
+                    contents[planned.page] = content
+                    for duplicate in plan.pages:
+                        if duplicate.duplicate_of == planned.page:
+                            duplicate.image_bytes = None
+
+                result = AIAnalysisResult(
+                    page=planned.page,
+                    status='success',
+                    content_length=len(content),
+                    route=planned.route,
+                    reason=planned.reason,
+                    ocr_confidence=planned.ocr_confidence,
+                    duplicate_of=planned.duplicate_of,
+                    batch=planned.batch,
+                    dpi=planned.dpi,
+                    deployment=self._kept_deployment(planned, request),
+                    escalation=planned.escalation or None
+                )
+                analysis_results.append(result)
+                PAGES_PROCESSED.labels(status='success').inc()
+                PAGE_ROUTES.labels(route=planned.route).inc()
+                logger.info(f"Successfully converted page {planned.page} ({planned.route})")
+                yield PageFinished(result)
+
+            except DeadlineExceeded as e:
+                out_of_time = True
+                result = AIAnalysisResult(
+                    page=planned.page,
+                    status='timeout',
+                    content_length=len(content),
+                    error=str(e),
+                    route=planned.route,
+                    reason=REASON_DEADLINE
+                )
+                analysis_results.append(result)
+                PAGES_PROCESSED.labels(status='timeout').inc()
+                logger.warning(f"Page {planned.page} was cut off by the request deadline")
+                yield PageFinished(
+                    result,
+                    error_markdown=f"\n\n[Timeout: Analysis of page {planned.page} was cut off by the request deadline]\n\n"
+                )
+
+            except Exception as e:
+                result = AIAnalysisResult(
+                    page=planned.page,
+                    status='error',
+                    error=str(e),
+                    route=planned.route,
+                    reason=planned.reason,
+                    dpi=planned.dpi
+                )
+                analysis_results.append(result)
+                PAGES_PROCESSED.labels(status='error').inc()
+                logger.error(f"Failed to analyze page {planned.page}: {str(e)}")
+                yield PageFinished(
+                    result,
+                    error_markdown=f"# Page {planned.page}\n\n[Error: Failed to analyze this page - {str(e)}]\n\n"
+                )
+
+        cascade = None
+        if request.cascade_deployment:
+            cascade = self._model_cascade.summarize(plan.pages, request.cascade_deployment, request.deployment_name)
+        yield DocumentAnalyzed(analysis_results, plan.routing_summary(), partial=out_of_time, cascade=cascade)
+
+    def _deferred_page(self, planned: PlannedPage) -> dict:
+        """What assembling a deferred job needs of a planned page; rendered images are not kept"""
+        return {
+            'page': planned.page,
+            'route': planned.route,
+            'reason': planned.reason,
+            'text': planned.text if planned.route not in (ROUTE_VISION, ROUTE_DUPLICATE) else None,
+            'ocr_confidence': planned.ocr_confidence,
+            'duplicate_of': planned.duplicate_of,
+            'dpi': planned.dpi
+        }
+
+    def _finish_deferred(self, job: BatchJob, contents: Dict[int, str], errors: Dict[int, str]) -> None:
+        markdown_pages = []
+        analysis_results = []
+        page_contents = {}
+
+        for page in job.pages:
+            number, route = page['page'], page['route']
+            if route == ROUTE_BLANK:
+                analysis_results.append(AIAnalysisResult(page=number, status='skipped', content_length=0, route=ROUTE_BLANK))
+                PAGE_ROUTES.labels(route=ROUTE_BLANK).inc()
+                continue
+
+            error = None
+            if route == ROUTE_VISION:
+                content = contents.get(number)
+                if content is None:
+                    error = errors.get(number, 'The batch returned no result for this page')
+            elif route == ROUTE_DUPLICATE:
+                content = page_contents.get(page['duplicate_of'])
+                if content is None:
+                    error = f"Page {page['duplicate_of']}, which this page repeats, failed"
+            else:
+                content = page['text']
+
+            if error is not None:
+                analysis_results.append(AIAnalysisResult(
+                    page=number, status='error', error=error, route=route, reason=page['reason'], dpi=page['dpi']
+                ))
+                PAGES_PROCESSED.labels(status='error').inc()
+                markdown_pages.append(f"# Page {number}\n\n[Error: Failed to analyze this page - {error}]\n\n")
+                continue
+
+            page_contents[number] = content
+            markdown_pages.append(content)
+            analysis_results.append(AIAnalysisResult(
+                page=number,
+                status='success',
+                content_length=len(content),
+                route=route,
+                reason=page['reason'],
+                ocr_confidence=page['ocr_confidence'],
+                duplicate_of=page['duplicate_of'],
+                dpi=page['dpi']
+            ))
+            PAGES_PROCESSED.labels(status='success').inc()
+            PAGE_ROUTES.labels(route=route).inc()
+
+        markdown = "\n\n---\n\n".join(markdown_pages)
+        if job.enhance_markdown:
+            with track_stage('enhance'):
+                markdown = self._markdown_enhancer.enhance_markdown_structure(markdown, job.filename)
+
+        job.result = {
+            'markdown': markdown,
+            'analysis_results': [asdict(result) for result in analysis_results],
+            'pages_processed': len(analysis_results),
+            'successful_pages': len([r for r in analysis_results if r.status == 'success']),
+            'failed_pages': len([r for r in analysis_results if r.status == 'error'])
+        }
+        job.status = JOB_COMPLETED
+        AI_BATCH_JOBS.labels(status=JOB_COMPLETED).inc()
+        logger.info(f"Deferred job {job.job_id} completed: {job.result['successful_pages']} of {len(job.pages)} pages")
+
+    def _call_fits(self, token: Optional[CancellationToken], call_seconds: List[float]) -> bool:
+        """Whether a model call can still finish before the deadline, judged by the calls so far"""
+        remaining = token.remaining() if token is not None else None
+        if remaining is None:
+            return True
+        if not call_seconds:
+            return remaining > 0
+        return remaining >= sum(call_seconds) / len(call_seconds)
+
+    def _prefetch_pages(
+        self,
+        executor: ThreadPoolExecutor,
+        concurrency: int,
+        upcoming: List[PlannedPage],
+        prefetched: Dict[int, Future],
+        azure_client: Any,
+        request: AIConversionRequest,
+        options: Optional[VisionOptions],
+        token: Optional[CancellationToken],
+        call_seconds: List[float]
+    ) -> None:
+        """Start the model calls of the next single vision pages, up to concurrency calls under way"""
+        for planned in upcoming:
+            if len(prefetched) >= concurrency:
+                return
+            if planned.route != ROUTE_VISION or planned.batch is not None or planned.page in prefetched:
+                continue
+            # Pages left out here are skipped, or not, when their turn comes
+            if not self._call_fits(token, call_seconds):
+                return
+            # Each call runs in its own copy of the request's context, with its cancellation and timings
+            context = contextvars.copy_context()
+            prefetched[planned.page] = executor.submit(
+                context.run, profiled(self._analyze_whole_page), planned, azure_client, request, options
+            )
+
+    def _analyze_whole_page(self, planned: PlannedPage, azure_client: Any, request: AIConversionRequest, options: Optional[VisionOptions]) -> Tuple[str, float]:
+        """The page's markdown and the seconds its model calls took"""
+        started = time.perf_counter()
+        with track_stage('ai_page', page=planned.page):
+            content = ''.join(self._analyze_vision_page(planned, azure_client, request, False, options))
+        return content, time.perf_counter() - started
+
+    def _analyze_vision_page(
+        self,
+        planned: PlannedPage,
+        azure_client: Any,
+        request: AIConversionRequest,
+        stream_pages: bool,
+        options: Optional[VisionOptions]
+    ) -> Iterator[str]:
+        """The page's markdown from the model, tried on the cascade's small deployment first if there is one"""
+        if request.cascade_deployment:
+            started = time.perf_counter()
+            with capture_reply() as reply:
+                content = ''.join(self._analyze_page(planned, azure_client, request.cascade_deployment, False, options))
+            planned.small_seconds = time.perf_counter() - started
+            self._model_cascade.record_latency(request.cascade_deployment, planned.small_seconds)
+
+            planned.escalation = self._model_cascade.weaknesses(content, reply)
+            if not planned.escalation:
+                AI_CASCADE_PAGES.labels(outcome='kept').inc()
+                yield content
+                return
+            AI_CASCADE_PAGES.labels(outcome='escalated').inc()
+            for reason in planned.escalation:
+                AI_CASCADE_ESCALATIONS.labels(reason=reason).inc()
+            logger.info(
+                f"Page {planned.page} escalated from {request.cascade_deployment} to {request.deployment_name}: "
+                f"{', '.join(planned.escalation)}"
+            )
+
+        started = time.perf_counter()
+        yield from self._analyze_page(planned, azure_client, request.deployment_name, stream_pages, options)
+        # The large deployment's typical latency is what the cascade's kept pages are measured against
+        self._model_cascade.record_latency(request.deployment_name, time.perf_counter() - started)
+
+    def _run_batch(
+        self,
+        plan: DocumentPlan,
+        planned: PlannedPage,
+        azure_client: Any,
+        request: AIConversionRequest,
+        batch_contents: dict,
+        options: Optional[VisionOptions] = None
+    ) -> bool:
+        """Analyze the page's batch on its first page; False sends the page down the per-page path"""
+        if planned.page in batch_contents:
+            return True
+
+        page_nums = plan.batches[planned.batch - 1]
+        pages = [candidate for candidate in plan.pages if candidate.page in page_nums]
+        try:
+            with track_stage('ai_batch', batch=planned.batch, pages=len(pages)):
+                batch_contents.update(self._ai_client.analyze_images(
+                    [candidate.image_bytes for candidate in pages], azure_client, request.deployment_name, page_nums,
+                    options=options
+                ))
+            return True
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.warning(f"Batch {planned.batch} (pages {page_nums}) failed, analyzing its pages one by one: {str(e)}")
+            plan.batch_fallbacks += 1
+            for candidate in pages:
+                candidate.batch = None
+            return False
+
+    def _analyze_page(self, planned: PlannedPage, azure_client: Any, deployment_name: str, stream_pages: bool, options: Optional[VisionOptions] = None) -> Iterator[str]:
+        if stream_pages:
+            yield from self._ai_client.analyze_image_stream(
+                planned.image_bytes, azure_client, deployment_name, planned.page, options=options
+            )
+        else:
+            yield self._ai_client.analyze_image(
+                planned.image_bytes, azure_client, deployment_name, planned.page, options=options
+            )
+
+    def _plan_document(self, request: AIConversionRequest) -> DocumentPlan:
+        plan = self._plan_routes(request)
+        if request.page_filter or request.batch_pages:
+            self._inspect_pages(plan, skip_pages=request.page_filter)
+        if request.ocr:
+            self._apply_ocr(plan)
+        if request.batch_pages:
+            self._apply_batching(plan)
+        return plan
+
+    def _plan_routes(self, request: AIConversionRequest) -> DocumentPlan:
+        extension = self._extension(request)
+
         if extension == '.pdf':
-            return self._image_processor.convert_pdf_to_images(file_path, dpi=dpi)
-        elif extension in ['.pptx', '.ppt', '.docx', '.doc', '.xlsx', '.xls']:
-            return self._image_processor.convert_office_document_to_images(file_path, extension, dpi=dpi)
+            return self._plan_pdf(request, request.file_path, request.page_routing == PAGE_ROUTING_HYBRID)
+
+        if extension in OFFICE_EXTENSIONS and (request.pages is not None or request.adaptive_dpi):
+            # Page selections and per-page DPIs work on the PDF conversion; unlike the whole-document
+            # path there is no placeholder fallback, which would not show the pages asked for
+            pdf_path = self._image_processor.convert_office_to_pdf(request.file_path, extension)
+            try:
+                return self._plan_pdf(request, pdf_path, hybrid=False)
+            finally:
+                self._image_processor.remove_converted_pdf(pdf_path)
+
+        image_bytes_list = self._convert_document_to_images(request.file_path, extension, request.dpi, self._encoding(request))
+        return DocumentPlan(PAGE_ROUTING_VISION, [
+            PlannedPage(page=i + 1, route=ROUTE_VISION, image_bytes=image_bytes)
+            for i, image_bytes in enumerate(image_bytes_list)
+        ])
+
+    def _plan_pdf(self, request: AIConversionRequest, pdf_path: str, hybrid: bool) -> DocumentPlan:
+        # Pages outside the selection are neither read nor rendered
+        page_numbers = None
+        if request.pages is not None:
+            page_numbers = request.pages.resolve(self._image_processor.count_pdf_pages(pdf_path))
+
+        if hybrid:
+            layers = self._extract_text_layers(pdf_path, page_numbers)
+            if layers:
+                return self._plan_hybrid(request, pdf_path, layers)
+
+        if page_numbers is None and not request.adaptive_dpi:
+            image_bytes_list = self._image_processor.convert_pdf_to_images(
+                pdf_path, dpi=request.dpi, encoding=self._encoding(request)
+            )
+            return DocumentPlan(PAGE_ROUTING_VISION, [
+                PlannedPage(page=i + 1, route=ROUTE_VISION, image_bytes=image_bytes)
+                for i, image_bytes in enumerate(image_bytes_list)
+            ])
+
+        if page_numbers is None:
+            page_numbers = list(range(1, self._image_processor.count_pdf_pages(pdf_path) + 1))
+        plan = DocumentPlan(PAGE_ROUTING_VISION, [PlannedPage(page=page, route=ROUTE_VISION) for page in page_numbers])
+        self._render_pages(request, pdf_path, plan.pages)
+        return plan
+
+    def _render_pages(self, request: AIConversionRequest, pdf_path: str, pages: List[PlannedPage]) -> None:
+        page_numbers = [planned.page for planned in pages]
+        dpis = self._choose_dpis(pdf_path, page_numbers) if request.adaptive_dpi else None
+        encoding = self._encoding(request)
+        if dpis is None:
+            image_bytes_list = self._image_processor.convert_pdf_pages_to_images(
+                pdf_path, page_numbers, dpi=request.dpi, encoding=encoding
+            )
+        else:
+            image_bytes_list = self._image_processor.convert_pdf_pages_at_dpis(
+                pdf_path, dict(zip(page_numbers, dpis)), encoding=encoding
+            )
+            for planned, dpi in zip(pages, dpis):
+                planned.dpi = dpi
+
+        for planned, image_bytes in zip(pages, image_bytes_list):
+            planned.image_bytes = image_bytes
+
+    def _choose_dpis(self, pdf_path: str, page_numbers: List[int]) -> Optional[List[int]]:
+        """Per-page DPIs planned from low-resolution previews; None renders at the requested DPI"""
+        if self._page_detail is None:
+            return None
+        try:
+            previews = self._image_processor.convert_pdf_pages_to_images(pdf_path, page_numbers, dpi=PREVIEW_DPI)
+            details = self._page_detail.measure_pages(previews, PREVIEW_DPI)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.warning(f"Page measurement failed, rendering at the requested DPI: {str(e)}")
+            return None
+
+        dpis = self._dpi_planner.plan(details)
+        logger.info(f"Adaptive DPI for pages {page_numbers[0]}-{page_numbers[-1]}: {dpis}")
+        return dpis
+
+    def _inspect_pages(self, plan: DocumentPlan, skip_pages: bool) -> None:
+        candidates = [planned for planned in plan.pages if planned.route == ROUTE_VISION]
+        if not candidates or self._page_filter is None:
+            return
+
+        try:
+            inspections = self._page_filter.inspect_pages([planned.image_bytes for planned in candidates])
+        except Exception as e:
+            logger.warning(f"Page inspection failed, analyzing every page: {str(e)}")
+            return
+
+        for planned, inspection in zip(candidates, inspections):
+            planned.ink_ratio = inspection.ink_ratio
+            if not skip_pages:
+                continue
+            if inspection.blank:
+                planned.route, planned.reason = ROUTE_BLANK, 'blank_page'
+                planned.image_bytes = None
+                logger.info(f"Skipping page {planned.page} as blank (ink ratio {inspection.ink_ratio})")
+            elif inspection.duplicate_of is not None:
+                # The image stays until the original succeeded, in case this page needs its own analysis
+                planned.route, planned.reason = ROUTE_DUPLICATE, 'near_duplicate'
+                planned.duplicate_of = candidates[inspection.duplicate_of].page
+                logger.info(f"Page {planned.page} repeats page {planned.duplicate_of}, reusing its analysis")
+
+    def _apply_batching(self, plan: DocumentPlan) -> None:
+        for number, batch in enumerate(self._page_batcher.batch(plan.pages), start=1):
+            for planned in batch:
+                planned.batch = number
+            plan.batches.append([planned.page for planned in batch])
+
+    def _apply_ocr(self, plan: DocumentPlan) -> None:
+        candidates = [
+            planned for planned in plan.pages
+            if planned.route == ROUTE_VISION and planned.reason in OCR_ELIGIBLE_REASONS
+        ]
+        if not candidates or self._ocr_engine is None:
+            return
+
+        try:
+            ocr_results = self._ocr_engine.recognize_pages([planned.image_bytes for planned in candidates])
+        except Exception as e:
+            # OCR only saves model calls; without it the pages go to the model as planned
+            logger.warning(f"Local OCR failed, keeping vision routing: {str(e)}")
+            return
+
+        plan.ocr = True
+        for planned, ocr in zip(candidates, ocr_results):
+            route = self._page_router.route_ocr(planned.page, ocr)
+            planned.route = route.route
+            planned.reason = route.reason
+            planned.ocr_confidence = ocr.confidence
+            if route.route != ROUTE_VISION:
+                planned.text = ocr.text
+                planned.image_bytes = None
+
+    def _plan_hybrid(self, request: AIConversionRequest, pdf_path: str, layers: List[PageTextLayer]) -> DocumentPlan:
+        plan = DocumentPlan(PAGE_ROUTING_HYBRID)
+        for layer in layers:
+            route = self._page_router.route(layer)
+            plan.pages.append(PlannedPage(
+                page=layer.page,
+                route=route.route,
+                reason=route.reason,
+                text=layer.text if route.route == ROUTE_TEXT else None
+            ))
+
+        # Only the pages the text layer cannot stand in for are rasterized
+        vision_pages = [planned for planned in plan.pages if planned.route == ROUTE_VISION]
+        if vision_pages:
+            self._render_pages(request, pdf_path, vision_pages)
+
+        logger.info(
+            f"Hybrid routing for {request.filename}: {len(plan.pages) - len(vision_pages)} text pages, "
+            f"{len(vision_pages)} vision pages"
+        )
+        return plan
+
+    def _extract_text_layers(self, file_path: str, pages: Optional[List[int]] = None) -> Optional[List[PageTextLayer]]:
+        if self._text_layer is None:
+            return None
+        try:
+            return self._text_layer.extract_pages(file_path, pages)
+        except Exception as e:
+            # Without a readable text layer every page simply goes to the vision model
+            logger.warning(f"Text layer extraction failed, routing all pages to vision: {str(e)}")
+            return None
+
+    def _extension(self, request: AIConversionRequest) -> str:
+        return f".{request.filename.lower().split('.')[-1]}"
+
+    def _encoding(self, request: AIConversionRequest) -> Optional[ImageEncoding]:
+        return request.preset.encoding if request.preset is not None else None
+
+    def _kept_deployment(self, planned: PlannedPage, request: AIConversionRequest) -> Optional[str]:
+        """The deployment whose answer a page analyzed in cascade mode ended up with"""
+        if planned.small_seconds is None:
+            return None
+        return request.deployment_name if planned.escalation else request.cascade_deployment
+
+    def _vision_options(self, request: AIConversionRequest) -> Optional[VisionOptions]:
+        return request.preset.vision if request.preset is not None else None
+
+    def _dpi_label(self, request: AIConversionRequest) -> Any:
+        if request.adaptive_dpi:
+            return 'auto'
+        return request.dpi if self._extension(request) == '.pdf' else None
+
+    def _convert_document_to_images(self, file_path: str, extension: str, dpi: int, encoding: Optional[ImageEncoding] = None) -> List[bytes]:
+        if extension in OFFICE_EXTENSIONS:
+            return self._image_processor.convert_office_document_to_images(file_path, extension, dpi=dpi, encoding=encoding)
         else:
-            return self._image_processor.convert_document_to_images_basic(file_path)
\ No newline at end of file
+            return self._image_processor.convert_document_to_images_basic(file_path)
@@ -25,4 +25,18 @@ class ImageConversionException(ConversionException):
 
 class FileProcessingException(ConversionException):
     """Exception for file processing errors"""
-    pass
\ No newline at end of file
+    pass
+
+class TextExtractionException(ConversionException):
+    """Exception for text layer extraction errors"""
+    pass
+
+
+class OCRException(ConversionException):
+    """Exception for local OCR errors"""
+    pass
+
+
+class PageSelectionException(ConversionException):
+    """Exception for page selections that are invalid or match no page"""
+    pass
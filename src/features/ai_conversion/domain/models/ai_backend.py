@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class AIBackend:
+    """One Azure OpenAI endpoint and deployment vision calls can be routed to"""
+    name: str
+    endpoint: str
+    api_key: str
+    deployment: str
+    # Model family requests select by; deployments of the same model may be named differently per region
+    model: str
+    api_version: str = '2024-02-01'
+    weight: float = 1.0
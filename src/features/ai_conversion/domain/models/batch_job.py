@@ -0,0 +1,65 @@
+from dataclasses import asdict, dataclass, field, fields
+from typing import List, Optional
+
+JOB_SUBMITTED = 'submitted'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+BATCH_COMPLETED = 'completed'
+# Batch API statuses after which the batch no longer changes
+BATCH_FINAL_STATUSES = (BATCH_COMPLETED, 'failed', 'expired', 'cancelled')
+
+
+@dataclass
+class BatchProgress:
+    """Where a submitted batch is, as the provider reports it"""
+    batch_id: str
+    # validating, in_progress, finalizing, completed, failed, expired, cancelling, cancelled
+    status: str
+    output_file_id: Optional[str] = None
+    error_file_id: Optional[str] = None
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in BATCH_FINAL_STATUSES
+
+
+@dataclass
+class BatchJob:
+    """A deferred AI conversion: its rendered pages went to the batch API and its result comes later"""
+    job_id: str
+    filename: str
+    status: str
+    created_at: float
+    updated_at: float
+    azure_endpoint: str
+    api_version: str
+    deployment_name: str
+    enhance_markdown: bool = True
+    # Routing of every page, with the text of pages that need no model call
+    pages: List[dict] = field(default_factory=list)
+    routing: Optional[dict] = None
+    metadata: Optional[dict] = None
+    batch: Optional[BatchProgress] = None
+    # Set once the job completed: markdown, analysis_results and page counts
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_COMPLETED, JOB_FAILED)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'BatchJob':
+        known = {f.name for f in fields(cls)}
+        values = {key: value for key, value in data.items() if key in known}
+        if values.get('batch') is not None:
+            values['batch'] = BatchProgress(**values['batch'])
+        return cls(**values)
@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+from typing import List, Optional
+from .conversion_result import AIAnalysisResult
+
+
+@dataclass
+class DocumentRendered:
+    total_pages: int
+    routing: dict
+
+
+@dataclass
+class PageStarted:
+    page: int
+    index: int
+    total_pages: int
+    route: str
+
+
+@dataclass
+class PageChunk:
+    page: int
+    content: str
+    route: str
+
+
+@dataclass
+class PageFinished:
+    result: AIAnalysisResult
+    # Markdown placed in the document instead of a page that failed
+    error_markdown: Optional[str] = None
+
+
+@dataclass
+class DocumentAnalyzed:
+    analysis_results: List[AIAnalysisResult]
+    routing: dict
+    # Pages were skipped or cut off because the request ran out of time
+    partial: bool = False
+    # Escalation summary of cascade mode
+    cascade: Optional[dict] = None
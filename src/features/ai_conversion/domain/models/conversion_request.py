@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional
+from .....shared.domain.models.conversion_preset import ConversionPreset
+from .page_selection import PageSelection
 
 
 @dataclass
@@ -18,4 +20,22 @@ class AIConversionRequest:
     deployment_name: str
     enhance_markdown: bool = True
     api_version: str = "2024-02-01"
-    dpi: int = 200
\ No newline at end of file
+    dpi: int = 200
+    # Choose each page's DPI from a low-resolution preview, within the document's pixel budget
+    adaptive_dpi: bool = False
+    # 'vision' sends every page to the model, 'hybrid' uses the PDF text layer where it suffices
+    page_routing: str = "vision"
+    # Try local OCR before sending a rendered page to the model
+    ocr: bool = False
+    # Skip blank pages and reuse the analysis of repeated pages
+    page_filter: bool = True
+    # Pack sparse pages into shared multi-image requests
+    batch_pages: bool = False
+    # Convert only these pages; None converts the whole document
+    pages: Optional[PageSelection] = None
+    # Image encoding, vision detail, max_tokens and page concurrency of the chosen preset;
+    # its dpi and deployment are already resolved into the fields above
+    preset: Optional[ConversionPreset] = None
+    # Cascade mode: analyze single pages on this smaller deployment first and re-run only
+    # the weak answers on deployment_name
+    cascade_deployment: Optional[str] = None
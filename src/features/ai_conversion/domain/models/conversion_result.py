@@ -1,6 +1,9 @@
 from dataclasses import dataclass
 from typing import Optional, List, Any
 
+# Reason of pages the request's deadline left out or cut off
+REASON_DEADLINE = 'deadline'
+
 
 @dataclass
 class ConversionResult:
@@ -18,6 +21,19 @@ class AIAnalysisResult:
     status: str
     content_length: Optional[int] = None
     error: Optional[str] = None
+    # How the page was converted ('text' layer or 'vision' model) and why
+    route: Optional[str] = None
+    reason: Optional[str] = None
+    ocr_confidence: Optional[float] = None
+    # Page whose analysis was reused for this repeated page
+    duplicate_of: Optional[int] = None
+    # Multi-page request the page was analyzed in
+    batch: Optional[int] = None
+    # Render DPI chosen for the page when dpi is 'auto'
+    dpi: Optional[int] = None
+    # Cascade mode: deployment whose answer was kept, and why the small one's was not
+    deployment: Optional[str] = None
+    escalation: Optional[List[str]] = None
 
 
 @dataclass
@@ -25,4 +41,5 @@ class AIConversionResult(ConversionResult):
     analysis_results: List[AIAnalysisResult] = None
     pages_processed: int = 0
     successful_pages: int = 0
-    failed_pages: int = 0
\ No newline at end of file
+    failed_pages: int = 0
+    partial: bool = False
\ No newline at end of file
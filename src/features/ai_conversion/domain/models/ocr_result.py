@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class OCRPageResult:
+    text: str
+    # Mean word confidence reported by the OCR engine, 0-100
+    confidence: float
+    word_count: int
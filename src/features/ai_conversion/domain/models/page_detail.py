@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class PageDetail:
+    """Size and fineness of a page, measured on a low-resolution preview"""
+    width_inches: float
+    height_inches: float
+    # Typical ink height of a text line; None when no text lines were found
+    line_height_points: Optional[float] = None
+    # Share of pixels at a sharp intensity change, high for dense tables and diagrams
+    edge_density: float = 0.0
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class PageInspection:
+    """Cheap pixel-level facts about a rendered page, taken before any analysis"""
+    # Share of the page darker than its background
+    ink_ratio: float
+    blank: bool = False
+    # Position (in the inspected list) of an earlier page this one repeats
+    duplicate_of: Optional[int] = None
@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+from ..services.page_router import ROUTE_BLANK, ROUTE_DUPLICATE, ROUTE_OCR, ROUTE_TEXT, ROUTE_VISION
+
+
+@dataclass
+class PlannedPage:
+    page: int
+    route: str
+    reason: Optional[str] = None
+    text: Optional[str] = None
+    image_bytes: Optional[bytes] = None
+    ocr_confidence: Optional[float] = None
+    duplicate_of: Optional[int] = None
+    ink_ratio: Optional[float] = None
+    # 1-based number of the multi-page request this page is packed into
+    batch: Optional[int] = None
+    # Render DPI chosen for this page in adaptive mode
+    dpi: Optional[int] = None
+    # Cascade mode: why the small deployment's answer was not kept, and how long it took
+    escalation: Optional[List[str]] = None
+    small_seconds: Optional[float] = None
+
+
+@dataclass
+class DocumentPlan:
+    mode: str
+    pages: List[PlannedPage] = field(default_factory=list)
+    # Whether local OCR ran on the vision-bound pages
+    ocr: bool = False
+    # Page numbers packed into each multi-page request, as planned
+    batches: List[List[int]] = field(default_factory=list)
+    # Batches whose reply could not be used, so their pages were analyzed one by one
+    batch_fallbacks: int = 0
+
+    @property
+    def total_pages(self) -> int:
+        return len(self.pages)
+
+    def pages_routed(self, route: str) -> List[int]:
+        return [planned.page for planned in self.pages if planned.route == route]
+
+    def routing_summary(self) -> dict:
+        text_pages = self.pages_routed(ROUTE_TEXT)
+        ocr_pages = self.pages_routed(ROUTE_OCR)
+        vision_pages = self.pages_routed(ROUTE_VISION)
+        blank_pages = self.pages_routed(ROUTE_BLANK)
+        duplicate_pages = self.pages_routed(ROUTE_DUPLICATE)
+        # Batches that fell back to single-page requests no longer count
+        batches = [
+            [planned.page for planned in self.pages if planned.batch == number]
+            for number in range(1, len(self.batches) + 1)
+        ]
+        batches = [pages for pages in batches if pages]
+        batched_pages = sum(len(batch) for batch in batches)
+        return {
+            'mode': self.mode,
+            'ocr': self.ocr,
+            'text_pages': text_pages,
+            'ocr_pages': ocr_pages,
+            'vision_pages': vision_pages,
+            'blank_pages': blank_pages,
+            'duplicate_pages': duplicate_pages,
+            'batches': batches,
+            'batch_fallbacks': self.batch_fallbacks,
+            'model_calls': len(vision_pages) - batched_pages + len(batches),
+            'model_calls_saved': (
+                len(text_pages) + len(ocr_pages) + len(blank_pages) + len(duplicate_pages)
+                + batched_pages - len(batches)
+            )
+        }
@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from ..exceptions.conversion_exceptions import PageSelectionException
+
+
+@dataclass(frozen=True)
+class PageSelection:
+    """1-based pages of a document to convert, e.g. "1-3,5,10-" (open end: to the last page)"""
+    ranges: Tuple[Tuple[int, Optional[int]], ...]
+
+    @classmethod
+    def parse(cls, spec: str) -> 'PageSelection':
+        ranges = []
+        for part in spec.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            first, dash, last = part.partition('-')
+            try:
+                first = int(first)
+                last = (int(last) if last.strip() else None) if dash else first
+            except ValueError:
+                raise PageSelectionException(f"Invalid page range {part!r}, expected e.g. \"1-3,5,10-\"")
+            if first < 1:
+                raise PageSelectionException(f"Invalid page range {part!r}, pages are numbered from 1")
+            if last is not None and last < first:
+                raise PageSelectionException(f"Invalid page range {part!r}, the last page comes before the first")
+            ranges.append((first, last))
+
+        if not ranges:
+            raise PageSelectionException("No pages selected")
+        return cls(tuple(ranges))
+
+    def resolve(self, total_pages: int) -> List[int]:
+        """Selected page numbers that exist in a document of total_pages, in ascending order"""
+        pages = set()
+        for first, last in self.ranges:
+            pages.update(range(first, min(last or total_pages, total_pages) + 1))
+        if not pages:
+            raise PageSelectionException(f"No selected page exists, the document has {total_pages} pages")
+        return sorted(pages)
+
+    def __str__(self) -> str:
+        return ','.join(
+            str(first) if first == last else f"{first}-{last if last is not None else ''}"
+            for first, last in self.ranges
+        )
@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class PageTextLayer:
+    """Text layer of one PDF page with the layout signals used for routing"""
+    page: int
+    text: str
+    char_count: int
+    # Share of the page covered by embedded images (1.0 for a full-page scan)
+    image_area_ratio: float = 0.0
+    # Ruling lines and rectangles, which mostly come from table borders
+    rule_count: int = 0
+    # Share of text rows split into three or more columns (borderless tables)
+    tabular_row_ratio: float = 0.0
+    # Share of characters the font could not map to text ((cid:x) and U+FFFD)
+    garbled_ratio: float = 0.0
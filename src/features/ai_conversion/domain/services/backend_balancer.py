@@ -0,0 +1,190 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+from ..models.ai_backend import AIBackend
+
+BREAKER_CLOSED = 'closed'
+BREAKER_OPEN = 'open'
+BREAKER_HALF_OPEN = 'half_open'
+
+# Remaining quota below these levels scales a backend's share down proportionally
+LOW_REMAINING_REQUESTS = 10
+LOW_REMAINING_TOKENS = 20000
+# Share kept by a backend reporting no quota left, so it is seen again once the window resets
+MIN_QUOTA_FACTOR = 0.05
+
+
+@dataclass
+class BackendHealth:
+    latency: Optional[float] = None
+    error_rate: float = 0.0
+    in_flight: int = 0
+    remaining_requests: Optional[int] = None
+    remaining_tokens: Optional[int] = None
+    throttled_until: float = 0.0
+    consecutive_failures: int = 0
+    state: str = BREAKER_CLOSED
+    opened_at: float = 0.0
+    probing: bool = False
+
+
+class BackendBalancer:
+    """Chooses the backend for each AI call from what earlier calls observed.
+
+    Backends are drawn at random, weighted by their configured weight over the
+    EWMA latency, discounted by the EWMA error rate, the calls already in
+    flight and the remaining quota they reported, so load spreads instead of
+    piling onto the fastest one. A 429 benches a backend until its retry-after
+    passes; consecutive failures open its circuit breaker, and after
+    open_seconds a single probe call decides whether it closes again.
+    """
+
+    def __init__(
+        self,
+        backends: Iterable[AIBackend],
+        failure_threshold: int = 5,
+        open_seconds: float = 30.0,
+        latency_alpha: float = 0.3,
+        error_alpha: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random = None
+    ):
+        self._backends = list(backends)
+        self._health: Dict[str, BackendHealth] = {backend.name: BackendHealth() for backend in self._backends}
+        self._failure_threshold = failure_threshold
+        self._open_seconds = open_seconds
+        self._latency_alpha = latency_alpha
+        self._error_alpha = error_alpha
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+
+    @property
+    def backends(self) -> List[AIBackend]:
+        return list(self._backends)
+
+    def acquire(self, model: Optional[str] = None, exclude: Iterable[str] = ()) -> Optional[AIBackend]:
+        """Pick a backend for one call and count it in flight; None when none can take it now"""
+        excluded = set(exclude)
+        with self._lock:
+            now = self._clock()
+            candidates = [
+                backend for backend in self._serving(model)
+                if backend.name not in excluded and self._available(self._health[backend.name], now)
+            ]
+            if not candidates:
+                return None
+
+            known = [self._health[b.name].latency for b in candidates if self._health[b.name].latency is not None]
+            # Backends without measurements yet compete at the average latency
+            default_latency = sum(known) / len(known) if known else 1.0
+            scores = [self._score(backend, default_latency) for backend in candidates]
+            backend = self._rng.choices(candidates, weights=scores)[0]
+
+            health = self._health[backend.name]
+            health.in_flight += 1
+            if health.state == BREAKER_OPEN:
+                health.state, health.probing = BREAKER_HALF_OPEN, True
+            return backend
+
+    def state(self, backend: AIBackend) -> str:
+        with self._lock:
+            return self._health[backend.name].state
+
+    def release(self, backend: AIBackend) -> None:
+        with self._lock:
+            health = self._health[backend.name]
+            health.in_flight = max(health.in_flight - 1, 0)
+
+    def record_success(self, backend: AIBackend, latency: float) -> None:
+        with self._lock:
+            health = self._health[backend.name]
+            health.latency = latency if health.latency is None else (
+                self._latency_alpha * latency + (1 - self._latency_alpha) * health.latency
+            )
+            health.error_rate *= 1 - self._error_alpha
+            health.consecutive_failures = 0
+            health.state, health.probing = BREAKER_CLOSED, False
+
+    def record_failure(self, backend: AIBackend) -> None:
+        with self._lock:
+            health = self._health[backend.name]
+            health.error_rate = self._error_alpha + (1 - self._error_alpha) * health.error_rate
+            health.consecutive_failures += 1
+            if health.state == BREAKER_HALF_OPEN or health.consecutive_failures >= self._failure_threshold:
+                health.state, health.opened_at, health.probing = BREAKER_OPEN, self._clock(), False
+
+    def record_throttle(self, backend: AIBackend, retry_after: float) -> None:
+        with self._lock:
+            health = self._health[backend.name]
+            health.throttled_until = max(health.throttled_until, self._clock() + retry_after)
+            if health.state == BREAKER_HALF_OPEN:
+                # The probe was answered, so the backend is reachable again
+                health.state, health.probing = BREAKER_CLOSED, False
+
+    def record_quota(self, backend: AIBackend, remaining_requests: Optional[int], remaining_tokens: Optional[int]) -> None:
+        with self._lock:
+            health = self._health[backend.name]
+            if remaining_requests is not None:
+                health.remaining_requests = remaining_requests
+            if remaining_tokens is not None:
+                health.remaining_tokens = remaining_tokens
+
+    def wait_time(self, model: Optional[str] = None) -> Optional[float]:
+        """Seconds until the first throttled backend frees up; None when only open circuits remain"""
+        with self._lock:
+            now = self._clock()
+            waits = [
+                self._health[backend.name].throttled_until - now
+                for backend in self._serving(model)
+                if self._health[backend.name].state == BREAKER_CLOSED
+            ]
+            return max(min(waits), 0.0) if waits else None
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            now = self._clock()
+            states = []
+            for backend in self._backends:
+                health = self._health[backend.name]
+                states.append({
+                    'name': backend.name,
+                    'model': backend.model,
+                    'deployment': backend.deployment,
+                    'state': health.state,
+                    'latency_ms': round(health.latency * 1000, 1) if health.latency is not None else None,
+                    'error_rate': round(health.error_rate, 3),
+                    'in_flight': health.in_flight,
+                    'remaining_requests': health.remaining_requests,
+                    'remaining_tokens': health.remaining_tokens,
+                    'throttled_for_s': round(max(health.throttled_until - now, 0.0), 1)
+                })
+            return states
+
+    def _serving(self, model: Optional[str]) -> List[AIBackend]:
+        return [backend for backend in self._backends if not model or model in (backend.model, backend.deployment)]
+
+    def _available(self, health: BackendHealth, now: float) -> bool:
+        if health.throttled_until > now:
+            return False
+        if health.state == BREAKER_OPEN:
+            return now - health.opened_at >= self._open_seconds
+        if health.state == BREAKER_HALF_OPEN:
+            return not health.probing
+        return True
+
+    def _score(self, backend: AIBackend, default_latency: float) -> float:
+        health = self._health[backend.name]
+        latency = health.latency if health.latency is not None else default_latency
+        quota = 1.0
+        if health.remaining_requests is not None:
+            quota = min(quota, health.remaining_requests / LOW_REMAINING_REQUESTS)
+        if health.remaining_tokens is not None:
+            quota = min(quota, health.remaining_tokens / LOW_REMAINING_TOKENS)
+        return (
+            backend.weight / (max(latency, 0.001) * (1 + health.in_flight))
+            * (1 - health.error_rate) ** 2
+            * max(quota, MIN_QUOTA_FACTOR)
+        )
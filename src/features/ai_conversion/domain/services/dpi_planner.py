@@ -0,0 +1,65 @@
+import heapq
+from typing import List
+from ..models.page_detail import PageDetail
+
+# Resolution of the previews the page details are measured on
+PREVIEW_DPI = 72
+
+# Edge density at which a page without text lines gets max_dpi
+DENSE_EDGE_DENSITY = 0.08
+
+
+class DpiPlanner:
+    """Chooses the render DPI of each page of a document.
+
+    A page with text lines gets the DPI at which its typical line is
+    target_line_pixels tall, so large slide type renders small and dense
+    spreadsheet cells render sharp; other pages scale with their edge density.
+    No page gets more pixels than fit in max_long_side, the box the vision
+    model scales larger images down to. While the document exceeds
+    pixel_budget, the page with the highest DPI is lowered a step, down to
+    min_dpi at most.
+    """
+
+    def __init__(self, pixel_budget: float = 150e6, min_dpi: int = 100, max_dpi: int = 300, step: int = 25,
+                 target_line_pixels: float = 20.0, max_long_side: int = 2048):
+        self._pixel_budget = pixel_budget
+        self._min_dpi = min_dpi
+        self._max_dpi = max_dpi
+        self._step = step
+        self._target_line_pixels = target_line_pixels
+        self._max_long_side = max_long_side
+
+    def plan(self, details: List[PageDetail]) -> List[int]:
+        dpis = [self._page_dpi(detail) for detail in details]
+        total = sum(_pixels(detail, dpi) for detail, dpi in zip(details, dpis))
+
+        highest = [(-dpi, index) for index, dpi in enumerate(dpis)]
+        heapq.heapify(highest)
+        while total > self._pixel_budget and highest:
+            _, index = heapq.heappop(highest)
+            if dpis[index] <= self._min_dpi:
+                break
+            lowered = max(dpis[index] - self._step, self._min_dpi)
+            total += _pixels(details[index], lowered) - _pixels(details[index], dpis[index])
+            dpis[index] = lowered
+            heapq.heappush(highest, (-lowered, index))
+        return dpis
+
+    def _page_dpi(self, detail: PageDetail) -> int:
+        if detail.line_height_points:
+            dpi = self._target_line_pixels * 72 / detail.line_height_points
+        else:
+            dpi = self._min_dpi + (self._max_dpi - self._min_dpi) * min(detail.edge_density / DENSE_EDGE_DENSITY, 1.0)
+
+        long_side = max(detail.width_inches, detail.height_inches)
+        if long_side > 0:
+            dpi = min(dpi, self._max_long_side / long_side)
+
+        # Whole steps, so neighbouring pages share a DPI and render in one run
+        dpi = round(dpi / self._step) * self._step
+        return int(min(max(dpi, self._min_dpi), self._max_dpi))
+
+
+def _pixels(detail: PageDetail, dpi: int) -> float:
+    return detail.width_inches * detail.height_inches * dpi * dpi
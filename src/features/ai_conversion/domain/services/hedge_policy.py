@@ -0,0 +1,49 @@
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+# Hedges that can be spent at once after a quiet period
+HEDGE_BURST = 10.0
+
+
+class HedgePolicy:
+    """Decides when a slow AI call gets a duplicate ("hedged") request.
+
+    The time to first chunk is tracked per deployment over its last `window`
+    calls. A call still waiting past the configured percentile of that
+    distribution is hedged, once at least min_samples calls were seen. Every
+    call earns max_rate of a hedge and every hedge spends one, so hedges stay
+    below that share of all calls however slow the backends get.
+    """
+
+    def __init__(self, percentile: float = 95.0, max_rate: float = 0.1, window: int = 200, min_samples: int = 20):
+        self._percentile = percentile
+        self._max_rate = max_rate
+        self._window = window
+        self._min_samples = min_samples
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._budget = 0.0
+        self._lock = threading.Lock()
+
+    def delay(self, deployment: str) -> Optional[float]:
+        """Seconds to wait for the first chunk before hedging; None until enough calls were seen"""
+        with self._lock:
+            self._budget = min(self._budget + self._max_rate, HEDGE_BURST)
+            samples = sorted(self._latencies.get(deployment, ()))
+        if len(samples) < self._min_samples:
+            return None
+        # Nearest-rank percentile
+        rank = max(1, -(-len(samples) * self._percentile // 100))
+        return samples[int(rank) - 1]
+
+    def record_latency(self, deployment: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(deployment, deque(maxlen=self._window)).append(seconds)
+
+    def try_hedge(self) -> bool:
+        """Spend one hedge from the budget; False when hedging now would exceed max_rate"""
+        with self._lock:
+            if self._budget < 1.0:
+                return False
+            self._budget -= 1.0
+            return True
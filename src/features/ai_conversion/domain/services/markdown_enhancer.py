@@ -1,4 +1,5 @@
 import re
+from typing import List
 
 
 class MarkdownEnhancerService:
@@ -11,39 +12,7 @@ class MarkdownEnhancerService:
         enhanced_lines = []
         
         for i, line in enumerate(lines):
-            line = line.strip()
-            
-            if not line:
-                enhanced_lines.append('')
-                continue
-                
-            if '<' in line and '@' in line and '>' in line:
-                email_pattern = r'<([^@]+@[^>]+)>'
-                line = re.sub(email_pattern, r'[\1](mailto:\1)', line)
-                enhanced_lines.append(line)
-                continue
-            
-            if (i == 0 and len(line) > 10) or any(keyword in line for keyword in ['확인서', '증명서', '참가', 'Conference', 'Certificate']):
-                enhanced_lines.append(f'# {line}')
-                enhanced_lines.append('')
-                continue
-                
-            if re.search(r'\d{4}년\s*\d{1,2}월\s*\d{1,2}일', line) or re.search(r'\d{1,2}월\s*\d{1,2}일', line):
-                enhanced_lines.append(f'**{line}**')
-                continue
-                
-            if ':' in line and len(line.split(':')) == 2:
-                parts = line.split(':', 1)
-                key = parts[0].strip()
-                value = parts[1].strip()
-                enhanced_lines.append(f'**{key}**: {value}')
-                continue
-                
-            if len(line) < 20 and any(keyword in line for keyword in ['성명', '이름', '날짜', '시간', '장소']):
-                enhanced_lines.append(f'**{line}**')
-                continue
-                
-            enhanced_lines.append(line)
+            enhanced_lines.extend(self._enhance_line(line, i))
         
         result_lines = []
         prev_empty = False
@@ -54,4 +23,78 @@ class MarkdownEnhancerService:
                 result_lines.append(line)
             prev_empty = is_empty
         
-        return '\n'.join(result_lines)
\ No newline at end of file
+        return '\n'.join(result_lines)
+    
+    def create_incremental_enhancer(self) -> 'IncrementalMarkdownEnhancer':
+        return IncrementalMarkdownEnhancer(self)
+    
+    def _enhance_line(self, line: str, index: int) -> List[str]:
+        line = line.strip()
+        
+        if not line:
+            return ['']
+            
+        if '<' in line and '@' in line and '>' in line:
+            email_pattern = r'<([^@]+@[^>]+)>'
+            return [re.sub(email_pattern, r'[\1](mailto:\1)', line)]
+        
+        if (index == 0 and len(line) > 10) or any(keyword in line for keyword in ['확인서', '증명서', '참가', 'Conference', 'Certificate']):
+            return [f'# {line}', '']
+            
+        if re.search(r'\d{4}년\s*\d{1,2}월\s*\d{1,2}일', line) or re.search(r'\d{1,2}월\s*\d{1,2}일', line):
+            return [f'**{line}**']
+            
+        if ':' in line and len(line.split(':')) == 2:
+            parts = line.split(':', 1)
+            key = parts[0].strip()
+            value = parts[1].strip()
+            return [f'**{key}**: {value}']
+            
+        if len(line) < 20 and any(keyword in line for keyword in ['성명', '이름', '날짜', '시간', '장소']):
+            return [f'**{line}**']
+            
+        return [line]
+
+
+class IncrementalMarkdownEnhancer:
+    """Enhances streamed markdown one complete line at a time.
+
+    Concatenating everything returned by feed() and finish() gives the same text
+    as enhance_markdown_structure() on the whole document.
+    """
+    
+    def __init__(self, enhancer: MarkdownEnhancerService):
+        self._enhancer = enhancer
+        self._pending = ''
+        self._line_index = 0
+        self._prev_empty = False
+        self._started = False
+    
+    def feed(self, chunk: str) -> str:
+        if not chunk:
+            return ''
+        
+        self._pending += chunk
+        if '\n' not in self._pending:
+            return ''
+        
+        *complete_lines, self._pending = self._pending.split('\n')
+        return self._emit(complete_lines)
+    
+    def finish(self) -> str:
+        last_line, self._pending = self._pending, ''
+        return self._emit([last_line])
+    
+    def _emit(self, lines: List[str]) -> str:
+        output = []
+        
+        for line in lines:
+            for enhanced in self._enhancer._enhance_line(line, self._line_index):
+                is_empty = not enhanced.strip()
+                if not (is_empty and self._prev_empty):
+                    output.append(f'\n{enhanced}' if self._started else enhanced)
+                    self._started = True
+                self._prev_empty = is_empty
+            self._line_index += 1
+        
+        return ''.join(output)
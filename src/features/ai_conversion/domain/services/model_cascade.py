@@ -0,0 +1,63 @@
+import statistics
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional
+from ..models.page_plan import PlannedPage
+from .....shared.domain.models.vision_reply import VisionReply
+from .output_grader import OutputGrader
+
+
+class ModelCascade:
+    """Runs pages on a small deployment first and picks the ones worth a large one.
+
+    A page whose small-model markdown shows a weakness (see OutputGrader) is
+    analyzed again on the requested deployment; the others keep the cheap
+    answer. Page call latencies are tracked per deployment over the last
+    `window` calls, so a document can report roughly how much time skipping
+    the large model saved.
+    """
+
+    def __init__(self, grader: Optional[OutputGrader] = None, window: int = 200):
+        self._grader = grader or OutputGrader()
+        self._window = window
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def weaknesses(self, content: str, reply: Optional[VisionReply] = None) -> List[str]:
+        """Why the small model's page needs the large one; empty when it can be kept"""
+        return self._grader.weaknesses(content, reply)
+
+    def record_latency(self, deployment: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(deployment, deque(maxlen=self._window)).append(seconds)
+
+    def typical_latency(self, deployment: str) -> Optional[float]:
+        """Median seconds of the deployment's recent page calls; None before any was seen"""
+        with self._lock:
+            samples = list(self._latencies.get(deployment, ()))
+        return statistics.median(samples) if samples else None
+
+    def summarize(self, pages: List[PlannedPage], small_deployment: str, large_deployment: str) -> dict:
+        cascaded = [planned for planned in pages if planned.small_seconds is not None]
+        escalated = [planned for planned in cascaded if planned.escalation]
+        reasons: Dict[str, int] = {}
+        for planned in escalated:
+            for reason in planned.escalation:
+                reasons[reason] = reasons.get(reason, 0) + 1
+
+        # Kept pages saved a large call but spent a small one; escalated pages spent both
+        latency_saved_ms = None
+        large_seconds = self.typical_latency(large_deployment)
+        if large_seconds is not None:
+            saved = sum(large_seconds - planned.small_seconds for planned in cascaded if not planned.escalation)
+            saved -= sum(planned.small_seconds for planned in escalated)
+            latency_saved_ms = round(saved * 1000)
+
+        return {
+            'deployment': small_deployment,
+            'pages': len(cascaded),
+            'escalated_pages': [planned.page for planned in escalated],
+            'escalation_rate': round(len(escalated) / len(cascaded), 3) if cascaded else 0.0,
+            'reasons': reasons,
+            'latency_saved_ms': latency_saved_ms
+        }
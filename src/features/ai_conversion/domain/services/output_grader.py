@@ -0,0 +1,92 @@
+import re
+from typing import List, Optional
+from .....shared.domain.models.vision_reply import VisionReply
+
+WEAKNESS_EMPTY = 'empty'
+WEAKNESS_REFUSAL = 'refusal'
+WEAKNESS_TRUNCATED = 'truncated'
+WEAKNESS_EMPTY_TABLE = 'empty_table'
+WEAKNESS_ERROR_MARKER = 'error_marker'
+WEAKNESS_REPETITION = 'repetition'
+
+# Refusals open the answer; later matches are usually page text quoting such phrases
+REFUSAL_WINDOW = 300
+REFUSAL_PATTERN = re.compile(
+    r"\bI(?:'m| am) (?:sorry|unable)\b"
+    r"|\bI (?:cannot|can't|can not) (?:help|assist|analy[sz]e|see|view|read|process|provide)"
+    r"|\bunable to (?:see|view|analy[sz]e|read|process)"
+    r"|\bas an AI\b"
+    r"|죄송합니다|(?:분석|확인|인식|볼) 수 없",
+    re.IGNORECASE
+)
+# Written by the AI client in place of a page it could not analyze
+ERROR_MARKER_PATTERN = re.compile(r'^\[Error: ', re.MULTILINE)
+TABLE_SEPARATOR_PATTERN = re.compile(r'^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?$')
+
+
+class OutputGrader:
+    """Spots the ways a vision model's page markdown tends to go wrong.
+
+    Cheap models fail in recognizable ways: they refuse, stop at max_tokens,
+    emit table skeletons without cells, loop on a line, or the call fails and
+    leaves the client's error marker. Pages showing any of these are worth
+    another try on a stronger model; the rest are kept.
+    """
+
+    def __init__(self, max_repeated_lines: int = 5):
+        self._max_repeated_lines = max_repeated_lines
+
+    def weaknesses(self, content: str, reply: Optional[VisionReply] = None) -> List[str]:
+        text = (content or '').strip()
+        if not text:
+            return [WEAKNESS_EMPTY]
+
+        found = []
+        if REFUSAL_PATTERN.search(text[:REFUSAL_WINDOW]):
+            found.append(WEAKNESS_REFUSAL)
+        if reply is not None and reply.truncated:
+            found.append(WEAKNESS_TRUNCATED)
+        if ERROR_MARKER_PATTERN.search(text):
+            found.append(WEAKNESS_ERROR_MARKER)
+        if any(_table_is_empty(table) for table in _tables(text)):
+            found.append(WEAKNESS_EMPTY_TABLE)
+        if _longest_run(text) > self._max_repeated_lines:
+            found.append(WEAKNESS_REPETITION)
+        return found
+
+
+def _tables(text: str) -> List[List[str]]:
+    """Blocks of consecutive pipe-table lines"""
+    tables, current = [], []
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith('|'):
+            current.append(line)
+        elif current:
+            tables.append(current)
+            current = []
+    if current:
+        tables.append(current)
+    return tables
+
+
+def _table_is_empty(lines: List[str]) -> bool:
+    separators = [i for i, line in enumerate(lines) if TABLE_SEPARATOR_PATTERN.match(line)]
+    if not separators:
+        return False
+    rows = lines[separators[0] + 1:]
+    # A header without rows, or rows whose cells are all blank
+    return all(not cell.strip() for row in rows for cell in row.strip('|').split('|'))
+
+
+def _longest_run(text: str) -> int:
+    longest, run, previous = 0, 0, None
+    for line in text.splitlines():
+        line = line.strip()
+        # Blank lines and rules separate repeats rather than being them
+        if not line or set(line) <= set('-|:= '):
+            continue
+        run = run + 1 if line == previous else 1
+        previous = line
+        longest = max(longest, run)
+    return longest
@@ -0,0 +1,36 @@
+from typing import List
+from ..models.page_plan import PlannedPage
+from .page_router import ROUTE_VISION
+
+
+class PageBatcher:
+    """Packs low-content pages into shared multi-image requests.
+
+    Content is estimated from each page's ink ratio: only pages below
+    max_ink_ratio are packed, and a batch closes once it holds max_batch_size
+    pages or its summed ink would exceed ink_budget, so nearly empty title
+    slides travel in large batches and busier sparse pages in small ones.
+    """
+
+    def __init__(self, max_ink_ratio: float = 0.03, ink_budget: float = 0.08, max_batch_size: int = 6):
+        self._max_ink_ratio = max_ink_ratio
+        self._ink_budget = ink_budget
+        self._max_batch_size = max_batch_size
+
+    def batch(self, pages: List[PlannedPage]) -> List[List[PlannedPage]]:
+        batches = []
+        current = []
+        current_ink = 0.0
+
+        for planned in pages:
+            if planned.route != ROUTE_VISION or planned.ink_ratio is None or planned.ink_ratio > self._max_ink_ratio:
+                continue
+            if current and (len(current) >= self._max_batch_size or current_ink + planned.ink_ratio > self._ink_budget):
+                batches.append(current)
+                current, current_ink = [], 0.0
+            current.append(planned)
+            current_ink += planned.ink_ratio
+
+        batches.append(current)
+        # A single page gains nothing from the batched prompt
+        return [batch for batch in batches if len(batch) > 1]
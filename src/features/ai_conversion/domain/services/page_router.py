@@ -0,0 +1,69 @@
+from dataclasses import dataclass
+from typing import Optional
+from ..models.ocr_result import OCRPageResult
+from ..models.page_text import PageTextLayer
+
+ROUTE_TEXT = 'text'
+ROUTE_OCR = 'ocr'
+ROUTE_VISION = 'vision'
+# Pages dropped before analysis: nothing on them, or a repeat of an earlier page
+ROUTE_BLANK = 'blank'
+ROUTE_DUPLICATE = 'duplicate'
+
+# Vision-bound pages that local OCR may stand in for; image- and table-heavy
+# pages lose too much of their structure in plain OCR text
+OCR_ELIGIBLE_REASONS = (None, 'no_text_layer', 'garbled_text')
+
+PAGE_ROUTING_VISION = 'vision'
+PAGE_ROUTING_HYBRID = 'hybrid'
+PAGE_ROUTING_MODES = (PAGE_ROUTING_VISION, PAGE_ROUTING_HYBRID)
+
+
+@dataclass
+class PageRoute:
+    page: int
+    route: str
+    reason: Optional[str] = None
+
+
+class PageRouter:
+    """Decides whether a page's text layer is good enough to skip the vision model.
+
+    Pages without a usable text layer (scans, outlined or badly encoded fonts),
+    pages dominated by images and pages laid out as tables still go to the
+    vision model, which is the only way to keep their content and structure.
+    """
+
+    def __init__(
+        self,
+        min_chars: int = 200,
+        max_image_area_ratio: float = 0.3,
+        max_rule_count: int = 20,
+        max_tabular_row_ratio: float = 0.3,
+        max_garbled_ratio: float = 0.05,
+        min_ocr_confidence: float = 80.0,
+        min_ocr_words: int = 10
+    ):
+        self._min_chars = min_chars
+        self._max_image_area_ratio = max_image_area_ratio
+        self._max_rule_count = max_rule_count
+        self._max_tabular_row_ratio = max_tabular_row_ratio
+        self._max_garbled_ratio = max_garbled_ratio
+        self._min_ocr_confidence = min_ocr_confidence
+        self._min_ocr_words = min_ocr_words
+
+    def route(self, layer: PageTextLayer) -> PageRoute:
+        if layer.char_count < self._min_chars:
+            return PageRoute(layer.page, ROUTE_VISION, 'no_text_layer')
+        if layer.garbled_ratio > self._max_garbled_ratio:
+            return PageRoute(layer.page, ROUTE_VISION, 'garbled_text')
+        if layer.image_area_ratio > self._max_image_area_ratio:
+            return PageRoute(layer.page, ROUTE_VISION, 'image_heavy')
+        if layer.rule_count > self._max_rule_count or layer.tabular_row_ratio > self._max_tabular_row_ratio:
+            return PageRoute(layer.page, ROUTE_VISION, 'table_heavy')
+        return PageRoute(layer.page, ROUTE_TEXT, 'text_layer')
+
+    def route_ocr(self, page: int, ocr: OCRPageResult) -> PageRoute:
+        if ocr.word_count >= self._min_ocr_words and ocr.confidence >= self._min_ocr_confidence:
+            return PageRoute(page, ROUTE_OCR, 'ocr_confident')
+        return PageRoute(page, ROUTE_VISION, 'low_ocr_confidence')
@@ -0,0 +1,111 @@
+import json
+import logging
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+from ...application.ports.batch_client import BatchClientPort
+from ...domain.models.batch_job import BatchProgress
+from .....shared.domain.models.conversion_preset import VisionOptions
+from ...domain.exceptions.conversion_exceptions import AIClientException
+from .....shared.infrastructure.monitoring.metrics import record_ai_usage, record_error
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = '/chat/completions'
+CUSTOM_ID_PREFIX = 'page-'
+
+
+class AzureBatchAdapter(BatchClientPort):
+    """Analyzes pages through the Azure OpenAI batch API.
+
+    The pages' chat completions requests, exactly as AzureOpenAIAdapter would
+    send them one by one, are uploaded as a JSONL file and run as one batch
+    job on a Global Batch deployment, at batch prices and outside the
+    deployment's interactive rate limits. Results arrive as an output file
+    (and an error file for the lines that failed) once the job completes.
+    """
+
+    def __init__(self, inner: Any, api_version: str = '2024-10-21', completion_window: str = '24h'):
+        self._inner = inner
+        self._api_version = api_version
+        self._completion_window = completion_window
+
+    @property
+    def api_version(self) -> str:
+        return self._api_version
+
+    def create_client(self, endpoint: str, api_key: str) -> Any:
+        return self._inner.create_client(endpoint, api_key, self._api_version)
+
+    def page_request(self, image_bytes: bytes, deployment_name: str, page_num: int, options: VisionOptions = None) -> dict:
+        return {
+            'custom_id': f'{CUSTOM_ID_PREFIX}{page_num}',
+            'method': 'POST',
+            'url': BATCH_ENDPOINT,
+            'body': self._inner.page_request_body(image_bytes, deployment_name, page_num, options=options)
+        }
+
+    def submit(self, client: Any, requests: List[dict]) -> BatchProgress:
+        submission = '\n'.join(json.dumps(line, ensure_ascii=False) for line in requests).encode('utf-8')
+        try:
+            input_file = client.files.create(file=('pages.jsonl', submission), purpose='batch')
+            batch = client.batches.create(
+                input_file_id=input_file.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window=self._completion_window
+            )
+        except Exception as e:
+            raise AIClientException(f"Batch submission failed: {str(e)}")
+        logger.info(f"Submitted batch {batch.id} with {len(requests)} pages ({len(submission)} bytes)")
+        return _progress(batch)
+
+    def progress(self, client: Any, batch_id: str) -> BatchProgress:
+        try:
+            return _progress(client.batches.retrieve(batch_id))
+        except Exception as e:
+            record_error('ai_batch', e)
+            raise AIClientException(f"Batch {batch_id} could not be checked: {str(e)}")
+
+    def results(self, client: Any, progress: BatchProgress, deployment_name: str) -> Tuple[Dict[int, str], Dict[int, str]]:
+        contents, errors = {}, {}
+        for file_id in (progress.output_file_id, progress.error_file_id):
+            if not file_id:
+                continue
+            try:
+                text = client.files.content(file_id).text
+            except Exception as e:
+                record_error('ai_batch', e)
+                raise AIClientException(f"Batch {progress.batch_id} results could not be read: {str(e)}")
+
+            for line in text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                custom_id = entry.get('custom_id') or ''
+                if not custom_id.startswith(CUSTOM_ID_PREFIX):
+                    continue
+                page = int(custom_id[len(CUSTOM_ID_PREFIX):])
+                response = entry.get('response') or {}
+                body = response.get('body') or {}
+                if entry.get('error') or response.get('status_code') != 200:
+                    error = entry.get('error') or body.get('error') or {}
+                    errors[page] = error.get('message') or f"status {response.get('status_code')}"
+                    continue
+                record_ai_usage(deployment_name, SimpleNamespace(**(body.get('usage') or {})))
+                contents[page] = body['choices'][0]['message'].get('content') or ''
+        return contents, errors
+
+
+def _progress(batch: Any) -> BatchProgress:
+    counts = getattr(batch, 'request_counts', None)
+    errors = getattr(batch, 'errors', None)
+    messages = [error.message for error in (getattr(errors, 'data', None) or []) if getattr(error, 'message', None)]
+    return BatchProgress(
+        batch_id=batch.id,
+        status=batch.status,
+        output_file_id=getattr(batch, 'output_file_id', None),
+        error_file_id=getattr(batch, 'error_file_id', None),
+        total=getattr(counts, 'total', 0) or 0,
+        completed=getattr(counts, 'completed', 0) or 0,
+        failed=getattr(counts, 'failed', 0) or 0,
+        error='; '.join(messages) or None
+    )
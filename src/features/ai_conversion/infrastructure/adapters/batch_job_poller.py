@@ -0,0 +1,68 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from ...application.use_cases.convert_with_ai import ConvertWithAIUseCase
+from ...domain.models.batch_job import BatchJob
+
+logger = logging.getLogger(__name__)
+
+
+class BatchJobPoller:
+    """Checks the deferred jobs this process submitted until their batches finish.
+
+    API keys are only held in memory, never written to the job store, so a
+    job whose worker went away is picked up again when its status is asked
+    for with the key (see refresh).
+    """
+
+    def __init__(self, use_case: ConvertWithAIUseCase, interval_seconds: float = 60.0):
+        self._use_case = use_case
+        self._interval = interval_seconds
+        self._api_keys: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, job_id: str, api_key: str) -> None:
+        with self._lock:
+            self._api_keys[job_id] = api_key
+            # Started on first use, so a preloading master never runs it
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='ai-batch-poller', daemon=True)
+                self._thread.start()
+
+    def watching(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._api_keys
+
+    def refresh(self, job_id: str, api_key: str) -> Optional[BatchJob]:
+        """Check the job's batch now, e.g. for a job no poller is watching any more"""
+        job = self._use_case.deferred_job(job_id)
+        if job is None or job.finished:
+            return job
+        job = self._use_case.refresh_deferred(job, api_key)
+        if not job.finished:
+            self.watch(job_id, api_key)
+        return job
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self._interval)
+            with self._lock:
+                watched = dict(self._api_keys)
+            for job_id, api_key in watched.items():
+                if self._poll(job_id, api_key):
+                    with self._lock:
+                        self._api_keys.pop(job_id, None)
+
+    def _poll(self, job_id: str, api_key: str) -> bool:
+        """Whether the job needs no more checks"""
+        try:
+            job = self._use_case.deferred_job(job_id)
+            if job is None or job.finished:
+                return True
+            return self._use_case.refresh_deferred(job, api_key).finished
+        except Exception as e:
+            # Checked again on the next round; the batch keeps running at the provider
+            logger.warning(f"Checking deferred job {job_id} failed: {str(e)}")
+            return False
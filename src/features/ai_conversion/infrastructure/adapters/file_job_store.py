@@ -0,0 +1,63 @@
+import json
+import logging
+import os
+import re
+import tempfile
+from typing import List, Optional
+from ...application.ports.job_store import JobStorePort
+from ...domain.models.batch_job import BatchJob
+
+logger = logging.getLogger(__name__)
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class FileJobStore(JobStorePort):
+    """Jobs as JSON files in a directory, so every worker process sees every job"""
+
+    def __init__(self, directory: str):
+        self._directory = directory
+
+    def save(self, job: BatchJob) -> None:
+        os.makedirs(self._directory, exist_ok=True)
+        # Readers never see a half-written job
+        fd, temp_path = tempfile.mkstemp(dir=self._directory, prefix='.job_', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(job.to_dict(), f, ensure_ascii=False)
+            os.replace(temp_path, self._path(job.job_id))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        try:
+            with open(self._path(job_id), encoding='utf-8') as f:
+                return BatchJob.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def unfinished(self) -> List[BatchJob]:
+        try:
+            names = os.listdir(self._directory)
+        except FileNotFoundError:
+            return []
+
+        jobs = []
+        for name in names:
+            job_id, extension = os.path.splitext(name)
+            if extension != '.json':
+                continue
+            try:
+                job = self.get(job_id)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable job file {name}: {str(e)}")
+                continue
+            if job is not None and not job.finished:
+                jobs.append(job)
+        return jobs
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self._directory, f'{job_id}.json')
@@ -3,37 +3,137 @@ import tempfile
 import subprocess
 import shutil
 import logging
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from io import BytesIO
 from ...application.ports.image_processor import ImageProcessorPort
 from ...domain.exceptions.conversion_exceptions import ImageConversionException
+from .....shared.domain.models.conversion_preset import ImageEncoding
+from .....shared.infrastructure.monitoring.metrics import track_stage
+from .....shared.infrastructure.utils.cancellation import (
+    DeadlineExceeded, current_cancellation, current_timeout, raise_if_cancelled
+)
+from .....shared.infrastructure.utils.process_utils import run_cancellable
 
 logger = logging.getLogger(__name__)
 
+# Pages per pdftoppm run when the request can be cancelled
+CANCELLABLE_RENDER_PAGES = 8
+
+PNG = ImageEncoding()
+
 
 class ImageConverterAdapter(ImageProcessorPort):
     
-    def convert_pdf_to_images(self, pdf_path: str, dpi: int = 200) -> List[bytes]:
+    def warmup(self) -> None:
         try:
-            from pdf2image import convert_from_path
+            import pdf2image
             from PIL import Image
             
-            images = convert_from_path(pdf_path, dpi=dpi)
+            Image.init()
+            Image.new('RGB', (8, 8), color='white').save(BytesIO(), format='PNG')
+        except ImportError as e:
+            logger.warning(f"Image converter warmup skipped: {str(e)}")
+    
+    def convert_pdf_to_images(self, pdf_path: str, dpi: int = 200, encoding: ImageEncoding = None) -> List[bytes]:
+        try:
+            from pdf2image import convert_from_path, pdfinfo_from_path
             
-            image_bytes_list = []
-            for i, image in enumerate(images):
-                img_byte_arr = BytesIO()
-                image.save(img_byte_arr, format='PNG')
-                image_bytes_list.append(img_byte_arr.getvalue())
-                logger.info(f"Converted page {i+1} to image")
+            if current_cancellation() is not None:
+                # pdf2image gives no handle on its pdftoppm process to kill, so a cancellable
+                # request renders in short runs and stops between them
+                total_pages = pdfinfo_from_path(pdf_path, timeout=current_timeout())['Pages']
+                return self._render_runs(
+                    pdf_path, _consecutive_runs(range(1, total_pages + 1), CANCELLABLE_RENDER_PAGES), dpi, encoding
+                )
             
-            return image_bytes_list
+            with track_stage('pdf_render'):
+                images = convert_from_path(pdf_path, dpi=dpi)
+            
+            return self._encode_pages(images, range(1, len(images) + 1), encoding)
         
         except ImportError:
             raise ImageConversionException("pdf2image package is required. Install with: pip install pdf2image")
+        except DeadlineExceeded:
+            raise
         except Exception as e:
+            # pdftoppm stopped at the deadline is reported as such
+            raise_if_cancelled()
             raise ImageConversionException(f"Failed to convert PDF to images: {str(e)}")
     
+    def convert_pdf_pages_to_images(self, pdf_path: str, pages: List[int], dpi: int = 200, encoding: ImageEncoding = None) -> List[bytes]:
+        try:
+            # One pdftoppm run per run of consecutive pages
+            max_run = CANCELLABLE_RENDER_PAGES if current_cancellation() is not None else None
+            return self._render_runs(pdf_path, _consecutive_runs(pages, max_run), dpi, encoding)
+        
+        except ImportError:
+            raise ImageConversionException("pdf2image package is required. Install with: pip install pdf2image")
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            raise_if_cancelled()
+            raise ImageConversionException(f"Failed to convert PDF pages to images: {str(e)}")
+    
+    def convert_pdf_pages_at_dpis(self, pdf_path: str, page_dpis: Dict[int, int], encoding: ImageEncoding = None) -> List[bytes]:
+        try:
+            # One pdftoppm run per run of consecutive pages sharing a DPI
+            max_run = CANCELLABLE_RENDER_PAGES if current_cancellation() is not None else None
+            rendered = {}
+            for dpi in sorted(set(page_dpis.values())):
+                pages = sorted(page for page, page_dpi in page_dpis.items() if page_dpi == dpi)
+                rendered.update(zip(pages, self._render_runs(pdf_path, _consecutive_runs(pages, max_run), dpi, encoding)))
+            return [rendered[page] for page in sorted(rendered)]
+        
+        except ImportError:
+            raise ImageConversionException("pdf2image package is required. Install with: pip install pdf2image")
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            raise_if_cancelled()
+            raise ImageConversionException(f"Failed to convert PDF pages to images: {str(e)}")
+    
+    def count_pdf_pages(self, pdf_path: str) -> int:
+        try:
+            from pdf2image import pdfinfo_from_path
+            
+            return pdfinfo_from_path(pdf_path, timeout=current_timeout())['Pages']
+        
+        except ImportError:
+            raise ImageConversionException("pdf2image package is required. Install with: pip install pdf2image")
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            raise_if_cancelled()
+            raise ImageConversionException(f"Failed to read PDF page count: {str(e)}")
+    
+    def _render_runs(self, pdf_path: str, runs: Iterable[Tuple[int, int]], dpi: int, encoding: ImageEncoding = None) -> List[bytes]:
+        from pdf2image import convert_from_path
+        
+        image_bytes_list = []
+        for first, last in runs:
+            raise_if_cancelled()
+            with track_stage('pdf_render'):
+                images = convert_from_path(
+                    pdf_path, dpi=dpi, first_page=first, last_page=last, timeout=current_timeout()
+                )
+            image_bytes_list.extend(self._encode_pages(images, range(first, last + 1), encoding))
+        return image_bytes_list
+    
+    def _encode_pages(self, images, page_numbers, encoding: ImageEncoding = None) -> List[bytes]:
+        encoding = encoding or PNG
+        image_bytes_list = []
+        for page_num, image in zip(page_numbers, images):
+            img_byte_arr = BytesIO()
+            if encoding.format == 'jpeg':
+                with track_stage('jpeg_encode'):
+                    image.convert('RGB').save(img_byte_arr, format='JPEG', quality=encoding.quality)
+            else:
+                with track_stage('png_encode'):
+                    image.save(img_byte_arr, format='PNG')
+            image_bytes_list.append(img_byte_arr.getvalue())
+            logger.info(f"Converted page {page_num} to image")
+        return image_bytes_list
+    
     def convert_office_to_pdf(self, file_path: str, file_extension: str) -> str:
         try:
             temp_dir = tempfile.mkdtemp()
@@ -43,7 +143,8 @@ class ImageConverterAdapter(ImageProcessorPort):
                     '--outdir', temp_dir, file_path
                 ]
                 
-                result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+                with track_stage('libreoffice_convert'):
+                    result = run_cancellable(cmd, text=True)
                 logger.info(f"LibreOffice PDF conversion output: {result.stdout}")
                 
                 pdf_files = [f for f in os.listdir(temp_dir) if f.endswith('.pdf')]
@@ -57,40 +158,53 @@ class ImageConverterAdapter(ImageProcessorPort):
                 return pdf_path
             
             except subprocess.CalledProcessError as e:
+                shutil.rmtree(temp_dir, ignore_errors=True)
                 logger.error(f"LibreOffice PDF conversion failed: {e.stderr}")
                 raise ImageConversionException(f"Failed to convert {file_extension} to PDF: {e.stderr}")
+            except BaseException:
+                # Also reached when the request is cancelled and LibreOffice was killed
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                raise
                 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Office to PDF conversion error: {str(e)}")
             raise ImageConversionException(f"Failed to convert {file_extension} to PDF: {str(e)}")
     
-    def convert_office_document_to_images(self, file_path: str, file_extension: str, dpi: int = 200) -> List[bytes]:
+    def remove_converted_pdf(self, pdf_path: str) -> None:
+        temp_dir = os.path.dirname(pdf_path)
+        if temp_dir and os.path.exists(temp_dir):
+            try:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                logger.info(f"Cleaned up temporary directory: {temp_dir}")
+            except Exception as e:
+                logger.warning(f"Could not clean up temporary directory {temp_dir}: {e}")
+    
+    def convert_office_document_to_images(self, file_path: str, file_extension: str, dpi: int = 200, encoding: ImageEncoding = None) -> List[bytes]:
         temp_pdf_path = None
-        temp_dir = None
         
         try:
             logger.info(f"Converting {file_extension} to PDF first...")
             temp_pdf_path = self.convert_office_to_pdf(file_path, file_extension)
-            temp_dir = os.path.dirname(temp_pdf_path)
             
             logger.info(f"Converting PDF to images with DPI {dpi}...")
-            image_bytes_list = self.convert_pdf_to_images(temp_pdf_path, dpi=dpi)
+            image_bytes_list = self.convert_pdf_to_images(temp_pdf_path, dpi=dpi, encoding=encoding)
             
             logger.info(f"Successfully converted {file_extension} → PDF → {len(image_bytes_list)} images")
             return image_bytes_list
-            
+        
+        except DeadlineExceeded:
+            # A placeholder image is no use to a request that is out of time
+            raise
         except Exception as e:
             logger.error(f"Office document conversion failed: {str(e)}")
             logger.info("Falling back to basic image generation...")
             return self.convert_document_to_images_basic(file_path)
             
         finally:
-            if temp_dir and os.path.exists(temp_dir):
-                try:
-                    shutil.rmtree(temp_dir, ignore_errors=True)
-                    logger.info(f"Cleaned up temporary directory: {temp_dir}")
-                except Exception as e:
-                    logger.warning(f"Could not clean up temporary directory {temp_dir}: {e}")
+            if temp_pdf_path:
+                self.remove_converted_pdf(temp_pdf_path)
     
     def convert_document_to_images_basic(self, file_path: str) -> List[bytes]:
         try:
@@ -113,4 +227,17 @@ class ImageConverterAdapter(ImageProcessorPort):
             return [img_byte_arr.getvalue()]
         
         except Exception as e:
-            raise ImageConversionException(f"Failed basic image conversion: {str(e)}")
\ No newline at end of file
+            raise ImageConversionException(f"Failed basic image conversion: {str(e)}")
+
+
+def _consecutive_runs(pages: Iterable[int], max_length: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+    first = last = None
+    for page in pages:
+        if first is not None and page == last + 1 and (max_length is None or page - first < max_length):
+            last = page
+            continue
+        if first is not None:
+            yield first, last
+        first = last = page
+    if first is not None:
+        yield first, last
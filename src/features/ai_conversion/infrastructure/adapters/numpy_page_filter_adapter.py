@@ -0,0 +1,164 @@
+import logging
+from io import BytesIO
+from typing import List
+from ...application.ports.page_filter import PageFilterPort
+from ...domain.models.page_inspection import PageInspection
+from .....shared.infrastructure.monitoring.metrics import track_stage
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = 256
+HASH_SIZE = 32
+CORRELATION_SIZE = 64
+# Pixels this much darker than the page's median brightness count as ink
+INK_CONTRAST = 40
+# A page that looks blank in its thumbnail still holds content if any 8x8
+# block at full resolution has this much ink: a short heading does, specks do not
+CONTENT_BLOCK = 8
+MIN_BLOCK_INK = 8
+
+
+class NumpyPageFilterAdapter(PageFilterPort):
+    """Blank and near-duplicate detection over downsampled page bitmaps.
+
+    All pages are processed as one array. The ink ratio of the thumbnails
+    finds pages that may be blank; they count as blank only if no inked block
+    shows up at full resolution either. A DCT perceptual hash and the
+    correlation of 64x64 thumbnails find candidate repeats cheaply, and
+    full-resolution crops of the inked area confirm them. Cropping aligns the
+    pages, so copies shifted by a few pixels are found, while different text
+    in the same layout is not; rotated or rescaled copies are not detected.
+    """
+
+    def __init__(self, max_blank_ink_ratio: float = 0.001, max_hash_distance: int = 10, min_correlation: float = 0.8,
+                 min_crop_correlation: float = 0.9):
+        self._max_blank_ink_ratio = max_blank_ink_ratio
+        self._max_hash_distance = max_hash_distance
+        self._min_correlation = min_correlation
+        self._min_crop_correlation = min_crop_correlation
+
+    def inspect_pages(self, images: List[bytes]) -> List[PageInspection]:
+        import numpy as np
+
+        if not images:
+            return []
+
+        with track_stage('page_filter'):
+            thumbnails = np.stack([self._thumbnail(image_bytes) for image_bytes in images])
+            count = len(thumbnails)
+
+            background = np.median(thumbnails.reshape(count, -1), axis=1)
+            ink_ratios = (thumbnails < (background[:, None, None] - INK_CONTRAST)).mean(axis=(1, 2))
+            blank = ink_ratios <= self._max_blank_ink_ratio
+            for i in np.flatnonzero(blank):
+                blank[i] = not _has_inked_block(images[i])
+
+            hashes = self._perceptual_hashes(_downsample(thumbnails, HASH_SIZE))
+            hash_distances = (hashes[:, None, :] != hashes[None, :, :]).sum(axis=2)
+            correlations = _correlations(_downsample(thumbnails, CORRELATION_SIZE))
+            candidates = (hash_distances <= self._max_hash_distance) & (correlations >= self._min_correlation)
+
+            inspections = []
+            crops = {}
+            for i in range(count):
+                inspection = PageInspection(ink_ratio=round(float(ink_ratios[i]), 5), blank=bool(blank[i]))
+                if not inspection.blank:
+                    for j in np.flatnonzero(candidates[i, :i] & ~blank[:i]):
+                        # Point at the first occurrence, never at another repeat
+                        if inspections[j].duplicate_of is None and self._same_ink(images, crops, int(j), i):
+                            inspection.duplicate_of = int(j)
+                            break
+                inspections.append(inspection)
+        return inspections
+
+    def _thumbnail(self, image_bytes: bytes):
+        import numpy as np
+        from PIL import Image
+
+        with Image.open(BytesIO(image_bytes)) as image:
+            image.draft('L', (THUMBNAIL_SIZE * 2, THUMBNAIL_SIZE * 2))
+            grayscale = image.convert('L').resize((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.BOX)
+        return np.asarray(grayscale, dtype=np.float32)
+
+    def _same_ink(self, images: List[bytes], crops: dict, first: int, second: int) -> bool:
+        import numpy as np
+        from PIL import Image
+
+        for index in (first, second):
+            if index not in crops:
+                crops[index] = _ink_crop(images[index])
+        crop_a, crop_b = crops[first], crops[second]
+        if crop_a is None or crop_b is None:
+            return False
+
+        (width_a, height_a), (width_b, height_b) = crop_a.size, crop_b.size
+        if not (_close(width_a, width_b) and _close(height_a, height_b)):
+            return False
+
+        # Aspect-preserving downscale keeps single text lines legible
+        width = min(THUMBNAIL_SIZE, width_a)
+        size = (width, max(1, round(height_a * width / width_a)))
+        a = np.asarray(crop_a.resize(size, Image.BOX), dtype=np.float32).ravel()
+        b = np.asarray(crop_b.resize(size, Image.BOX), dtype=np.float32).ravel()
+        a -= a.mean()
+        b -= b.mean()
+        norm = float(np.linalg.norm(a) * np.linalg.norm(b))
+        return norm > 0 and float(a @ b) / norm >= self._min_crop_correlation
+
+    def _perceptual_hashes(self, pixels):
+        import numpy as np
+
+        # 2D DCT-II of every page at once; the low 8x8 frequencies (without the
+        # DC term) against their median form a 63-bit hash
+        n = np.arange(HASH_SIZE)
+        basis = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * HASH_SIZE))
+        coefficients = np.einsum('kn,bnm,lm->bkl', basis, pixels, basis)[:, :8, :8].reshape(len(pixels), -1)[:, 1:]
+        return coefficients > np.median(coefficients, axis=1, keepdims=True)
+
+
+def _downsample(thumbnails, size: int):
+    factor = THUMBNAIL_SIZE // size
+    return thumbnails.reshape(len(thumbnails), size, factor, size, factor).mean(axis=(2, 4))
+
+
+def _correlations(pixels):
+    import numpy as np
+
+    flat = pixels.reshape(len(pixels), -1)
+    centered = flat - flat.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(centered, axis=1)
+    norms[norms == 0] = 1.0
+    return (centered @ centered.T) / np.outer(norms, norms)
+
+
+def _close(a: int, b: int) -> bool:
+    return abs(a - b) <= 0.05 * max(a, b) + 4
+
+
+def _has_inked_block(image_bytes: bytes) -> bool:
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(BytesIO(image_bytes)) as image:
+        pixels = np.asarray(image.convert('L'))
+    ink = pixels < (np.median(pixels[::8, ::8]) - INK_CONTRAST)
+    height = ink.shape[0] - ink.shape[0] % CONTENT_BLOCK
+    width = ink.shape[1] - ink.shape[1] % CONTENT_BLOCK
+    blocks = ink[:height, :width].reshape(height // CONTENT_BLOCK, CONTENT_BLOCK, width // CONTENT_BLOCK, CONTENT_BLOCK)
+    return bool((blocks.sum(axis=(1, 3)) >= MIN_BLOCK_INK).any())
+
+
+def _ink_crop(image_bytes: bytes):
+    """The page cropped to its inked area, ignoring stray specks"""
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(BytesIO(image_bytes)) as image:
+        grayscale = image.convert('L')
+    pixels = np.asarray(grayscale)
+    ink = pixels < (np.median(pixels[::8, ::8]) - INK_CONTRAST)
+    rows = np.flatnonzero(ink.sum(axis=1) > 2)
+    columns = np.flatnonzero(ink.sum(axis=0) > 2)
+    if not rows.size or not columns.size:
+        return None
+    return grayscale.crop((int(columns[0]), int(rows[0]), int(columns[-1]) + 1, int(rows[-1]) + 1))
@@ -0,0 +1,82 @@
+import logging
+import re
+from collections import defaultdict
+from typing import List, Optional
+from ...application.ports.text_layer import TextLayerPort
+from ...domain.models.page_text import PageTextLayer
+from ...domain.exceptions.conversion_exceptions import TextExtractionException
+from .....shared.infrastructure.monitoring.metrics import track_stage
+
+logger = logging.getLogger(__name__)
+
+# pdfminer writes glyphs it cannot map to unicode as "(cid:123)"
+CID_PATTERN = re.compile(r'\(cid:\d+\)')
+
+# Text lines whose baselines are this close (in points) share a row
+ROW_TOLERANCE = 2.0
+
+
+class PdfMinerTextLayerAdapter(TextLayerPort):
+    """Reads each page's text layer and layout with pdfminer, without rendering"""
+
+    def extract_pages(self, pdf_path: str, pages: Optional[List[int]] = None) -> List[PageTextLayer]:
+        try:
+            from pdfminer.high_level import extract_pages
+            from pdfminer.layout import LAParams
+        except ImportError:
+            raise TextExtractionException("pdfminer.six package is required. Install with: pip install pdfminer.six")
+
+        try:
+            with track_stage('text_extract'):
+                if pages is None:
+                    layouts = enumerate(extract_pages(pdf_path, laparams=LAParams()), start=1)
+                else:
+                    # pdfminer skips the layout analysis of pages it is not asked for
+                    layouts = zip(pages, extract_pages(
+                        pdf_path, page_numbers={page - 1 for page in pages}, laparams=LAParams()
+                    ))
+                return [self._measure_page(page_num, page_layout) for page_num, page_layout in layouts]
+        except Exception as e:
+            raise TextExtractionException(f"Failed to extract PDF text layer: {str(e)}")
+
+    def _measure_page(self, page_num: int, page_layout) -> PageTextLayer:
+        from pdfminer.layout import LTCurve, LTFigure, LTImage, LTTextBox, LTTextLine
+
+        page_area = max(page_layout.width * page_layout.height, 1.0)
+        text_parts = []
+        rows = defaultdict(int)
+        image_area = 0.0
+        rule_count = 0
+
+        def walk(element):
+            nonlocal image_area, rule_count
+            if isinstance(element, LTTextBox):
+                text_parts.append(element.get_text().strip())
+                for line in element:
+                    if isinstance(line, LTTextLine):
+                        rows[round(line.y0 / ROW_TOLERANCE)] += 1
+            elif isinstance(element, LTImage):
+                image_area += element.width * element.height
+            elif isinstance(element, LTCurve):
+                rule_count += 1
+            elif isinstance(element, LTFigure):
+                for child in element:
+                    walk(child)
+
+        for element in page_layout:
+            walk(element)
+
+        text = '\n\n'.join(part for part in text_parts if part)
+        garbled = sum(len(match) for match in CID_PATTERN.findall(text)) + text.count('�')
+        char_count = sum(1 for char in text if not char.isspace())
+        tabular_rows = sum(1 for count in rows.values() if count >= 3)
+
+        return PageTextLayer(
+            page=page_num,
+            text=text,
+            char_count=char_count,
+            image_area_ratio=min(image_area / page_area, 1.0),
+            rule_count=rule_count,
+            tabular_row_ratio=tabular_rows / len(rows) if rows else 0.0,
+            garbled_ratio=garbled / char_count if char_count else 0.0
+        )
@@ -0,0 +1,26 @@
+import json
+from dataclasses import replace
+from typing import Dict, Optional
+from .....shared.domain.models.conversion_preset import DEFAULT_PRESETS, ConversionPreset
+
+
+def parse_conversion_presets(value: Optional[str]) -> Dict[str, ConversionPreset]:
+    """The built-in presets, changed and extended by a JSON object or the JSON file the value points to.
+
+    The object maps preset names to the settings that differ: a built-in
+    name keeps its other settings, a new name starts from "accurate".
+    """
+    presets = dict(DEFAULT_PRESETS)
+    if not value or not value.strip():
+        return presets
+    text = value.strip()
+    if not text.startswith('{'):
+        with open(text, encoding='utf-8') as f:
+            text = f.read()
+
+    for name, values in json.loads(text).items():
+        if not isinstance(values, dict):
+            raise ValueError(f"AI preset {name} must be an object of settings")
+        base = presets.get(name) or replace(DEFAULT_PRESETS['accurate'], name=name)
+        presets[name] = base.with_values(values)
+    return presets
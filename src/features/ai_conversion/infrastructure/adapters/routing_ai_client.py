@@ -0,0 +1,427 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+from ...application.ports.ai_client import AIClientPort
+from ...domain.models.ai_backend import AIBackend
+from .....shared.domain.models.conversion_preset import VisionOptions
+from ...domain.services.backend_balancer import BREAKER_OPEN, BackendBalancer
+from ...domain.services.hedge_policy import HedgePolicy
+from ...domain.exceptions.conversion_exceptions import AIClientException
+from .....shared.infrastructure.monitoring.metrics import (
+    AI_BACKEND_CALLS, AI_BACKEND_CIRCUIT_OPEN, AI_FAILOVERS, AI_HEDGES
+)
+from .....shared.infrastructure.monitoring.profiler import profiled
+from .....shared.infrastructure.utils.cancellation import (
+    DeadlineExceeded, current_cancellation, current_timeout, raise_if_cancelled
+)
+
+logger = logging.getLogger(__name__)
+
+OUTCOME_SUCCESS = 'success'
+OUTCOME_THROTTLED = 'throttled'
+OUTCOME_FAILED = 'failed'
+OUTCOME_REJECTED = 'rejected'
+
+# Status codes that say more about the backend than about the request
+BACKEND_FAULT_STATUSES = (401, 403, 404, 408)
+DEFAULT_RETRY_AFTER = 1.0
+
+
+class PooledClient:
+    """Stands in for an Azure OpenAI client when a request uses the configured backends"""
+
+
+def parse_ai_backends(value: Optional[str]) -> List[AIBackend]:
+    """Backends from a JSON list, or from the JSON file the value points to"""
+    if not value or not value.strip():
+        return []
+    text = value.strip()
+    if not text.startswith('['):
+        with open(text, encoding='utf-8') as f:
+            text = f.read()
+
+    backends = []
+    for entry in json.loads(text):
+        api_key = entry.get('api_key') or os.getenv(entry.get('api_key_env', ''), '')
+        if not entry.get('endpoint') or not entry.get('deployment') or not api_key:
+            raise ValueError(f"AI endpoint entries need endpoint, deployment and api_key (or api_key_env): {entry.get('name') or entry.get('endpoint')}")
+        backends.append(AIBackend(
+            name=entry.get('name') or f"{urlparse(entry['endpoint']).hostname}/{entry['deployment']}",
+            endpoint=entry['endpoint'],
+            api_key=api_key,
+            deployment=entry['deployment'],
+            model=entry.get('model') or entry['deployment'],
+            api_version=entry.get('api_version', '2024-02-01'),
+            weight=float(entry.get('weight', 1.0))
+        ))
+    if len({backend.name for backend in backends}) != len(backends):
+        raise ValueError("AI endpoint names must be unique")
+    return backends
+
+
+class RoutingAIClient(AIClientPort):
+    """Routes vision calls over the configured Azure OpenAI backends.
+
+    A request that brings its own azure_endpoint stays pinned to it, exactly
+    as before. A request without one is served by the backend pool: each call
+    goes to the backend the balancer picks, and a 429, 5xx, timeout or
+    connection error moves the call to another backend (up to max_attempts)
+    instead of surfacing, without the SDK's own retries against the same
+    backend. Streams fail over only until their first chunk; after that the
+    content is already on its way to the caller.
+
+    With a hedge policy, page calls of both kinds of requests run as streams
+    and one that is still waiting for its first chunk past the policy's delay
+    gets a duplicate request, on another backend when pooled. The first to
+    answer is used and the other is closed.
+    """
+
+    def __init__(self, inner: Any, balancer: BackendBalancer, max_attempts: int = 3, max_wait: float = 5.0, hedge_policy: Optional[HedgePolicy] = None):
+        self._inner = inner
+        self._balancer = balancer
+        self._max_attempts = max_attempts
+        self._max_wait = max_wait
+        self._hedge_policy = hedge_policy
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def has_backends(self) -> bool:
+        return bool(self._balancer.backends)
+
+    def describe(self) -> List[dict]:
+        return self._balancer.snapshot()
+
+    def create_client(self, endpoint: str, api_key: str, api_version: str) -> Any:
+        if endpoint:
+            return self._inner.create_client(endpoint, api_key, api_version)
+        if not self.has_backends:
+            raise AIClientException("azure_endpoint is required when no AI_ENDPOINTS are configured")
+        return PooledClient()
+
+    def warmup(self) -> None:
+        self._inner.warmup()
+
+    def analyze_image(self, image_bytes: bytes, client: Any, deployment_name: str, page_num: int = None, options: VisionOptions = None) -> str:
+        if self._hedge_policy is not None:
+            # Hedged calls run as streams, the only calls a losing attempt can be cut off from
+            return ''.join(self.analyze_image_stream(image_bytes, client, deployment_name, page_num, options))
+        if not isinstance(client, PooledClient):
+            return self._inner.analyze_image(image_bytes, client, deployment_name, page_num, options=options)
+
+        page_info = f"Page {page_num}" if page_num is not None else "Image"
+        try:
+            return self._call(deployment_name, lambda backend, backend_client: self._inner.complete_image(
+                image_bytes, backend_client, backend.deployment, page_num, options=options
+            ))
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"AI analysis failed for {page_info}: {str(e)}")
+            return f"# {page_info}\n\n[Error: Failed to analyze this page - {str(e)}]\n\n"
+
+    def analyze_image_stream(self, image_bytes: bytes, client: Any, deployment_name: str, page_num: int = None, options: VisionOptions = None) -> Iterator[str]:
+        if self._hedge_policy is None and not isinstance(client, PooledClient):
+            yield from self._inner.analyze_image_stream(image_bytes, client, deployment_name, page_num, options=options)
+            return
+
+        page_info = f"Page {page_num}" if page_num is not None else "Image"
+
+        def open_attempt(avoid: Set[str] = frozenset(), on_backend: Callable[[AIBackend], None] = None) -> _OpenedStream:
+            return self._open_stream(image_bytes, client, deployment_name, page_num, options, avoid, on_backend)
+
+        try:
+            opened = open_attempt() if self._hedge_policy is None else self._race(deployment_name, open_attempt)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"AI streaming analysis failed for {page_info}: {str(e)}")
+            yield f"# {page_info}\n\n[Error: Failed to analyze this page - {str(e)}]\n\n"
+            return
+
+        failed = False
+        try:
+            if opened.first_chunk is not None:
+                yield opened.first_chunk
+            yield from opened.chunks
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            failed = True
+            logger.error(f"AI streaming analysis failed midway for {page_info}: {str(e)}")
+            yield f"# {page_info}\n\n[Error: Failed to analyze this page - {str(e)}]\n\n"
+        finally:
+            self._finish(opened, failed)
+
+    def analyze_images(self, images: List[bytes], client: Any, deployment_name: str, page_nums: List[int], options: VisionOptions = None) -> Dict[int, str]:
+        if not isinstance(client, PooledClient):
+            return self._inner.analyze_images(images, client, deployment_name, page_nums, options)
+        return self._call(deployment_name, lambda backend, backend_client: self._inner.analyze_images(
+            images, backend_client, backend.deployment, page_nums, options
+        ))
+
+    def _call(self, model: Optional[str], call: Callable[[AIBackend, Any], Any], hold: bool = False, avoid: Iterable[str] = ()) -> Any:
+        """Run call on balancer-chosen backends until one succeeds.
+
+        With hold the winning backend stays counted in flight; the caller
+        releases it once it is done with the result. Backends in avoid are
+        only used when no other one is available.
+        """
+        tried = set(avoid)
+        last_error = None
+
+        for attempt in range(self._max_attempts):
+            # A cancelled or timed out request neither fails over nor waits out a throttle
+            raise_if_cancelled()
+            backend = self._balancer.acquire(model, exclude=tried) or self._balancer.acquire(model)
+            if backend is None:
+                wait = self._balancer.wait_time(model)
+                if wait is None or wait > current_timeout(self._max_wait):
+                    break
+                time.sleep(wait)
+                backend = self._balancer.acquire(model)
+                if backend is None:
+                    break
+
+            if attempt:
+                AI_FAILOVERS.labels(backend=backend.name).inc()
+            tried.add(backend.name)
+            start = time.perf_counter()
+            try:
+                result = call(backend, self._client_for(backend))
+            except DeadlineExceeded:
+                # Says nothing about the backend, and there is no time left to try another
+                self._balancer.release(backend)
+                raise
+            except Exception as e:
+                self._balancer.release(backend)
+                if not self._handle_error(backend, e):
+                    raise
+                last_error = e
+                continue
+            except BaseException:
+                self._balancer.release(backend)
+                raise
+
+            self._balancer.record_success(backend, time.perf_counter() - start)
+            self._count(backend, OUTCOME_SUCCESS)
+            if not hold:
+                self._balancer.release(backend)
+            return result
+
+        if last_error is None:
+            raise AIClientException(f"No AI endpoint is available{f' for {model}' if model else ''}")
+        raise AIClientException(f"All AI endpoints failed, last error: {str(last_error)}")
+
+    def _open_stream(
+        self,
+        image_bytes: bytes,
+        client: Any,
+        deployment_name: str,
+        page_num: Optional[int],
+        options: Optional[VisionOptions] = None,
+        avoid: Iterable[str] = (),
+        on_backend: Callable[[AIBackend], None] = None
+    ) -> '_OpenedStream':
+        """Start a streamed analysis and wait for its first chunk.
+
+        Pulling the first chunk here makes throttling and errors surface while
+        failing over is still possible; the balancer then sees the time to
+        first chunk as the stream's latency.
+        """
+        if not isinstance(client, PooledClient):
+            chunks = self._inner.stream_image(image_bytes, client, deployment_name, page_num, options=options)
+            return _OpenedStream(next(chunks, None), chunks)
+
+        def start_stream(backend: AIBackend, backend_client: Any) -> _OpenedStream:
+            if on_backend is not None:
+                on_backend(backend)
+            chunks = self._inner.stream_image(image_bytes, backend_client, backend.deployment, page_num, options=options)
+            return _OpenedStream(next(chunks, None), chunks, backend)
+
+        return self._call(deployment_name, start_stream, hold=True, avoid=avoid)
+
+    def _finish(self, opened: '_OpenedStream', failed: bool = False) -> None:
+        # Closing the generator closes the HTTP stream of an unfinished attempt
+        opened.chunks.close()
+        if opened.backend is not None:
+            if failed:
+                self._balancer.record_failure(opened.backend)
+            self._balancer.release(opened.backend)
+
+    def _race(self, deployment_name: str, open_attempt: Callable[..., '_OpenedStream']) -> '_OpenedStream':
+        """Open the stream, hedging with a second attempt when the first one is slow"""
+        key = deployment_name or '*'
+        race = _HedgeRace(open_attempt, lambda seconds: self._hedge_policy.record_latency(key, seconds), self._finish)
+        race.start(hedge=False)
+
+        delay = self._hedge_policy.delay(key)
+        winner = race.wait(delay) if delay is not None else race.wait()
+        token = current_cancellation()
+        if winner is None and race.pending and not (token is not None and (token.cancelled or token.expired)):
+            if self._hedge_policy.try_hedge():
+                logger.info(f"No first chunk from {key} after {delay:.2f}s, sending a hedged request")
+                race.start(hedge=True)
+            else:
+                AI_HEDGES.labels(outcome='skipped').inc()
+            winner = race.wait()
+
+        if winner is None:
+            raise race.error
+        opened, hedge = winner
+        if race.hedged:
+            AI_HEDGES.labels(outcome='won' if hedge else 'lost').inc()
+        return opened
+
+    def _handle_error(self, backend: AIBackend, error: Exception) -> bool:
+        """Record a failed call; False when the request itself is at fault and must not be retried"""
+        status = getattr(error, 'status_code', None)
+        if status == 429:
+            retry_after = _retry_after(error)
+            self._balancer.record_throttle(backend, retry_after)
+            self._count(backend, OUTCOME_THROTTLED)
+            logger.warning(f"AI endpoint {backend.name} throttled for {retry_after:.1f}s, failing over")
+            return True
+
+        if (status is not None and (status >= 500 or status in BACKEND_FAULT_STATUSES)) or _is_connection_error(error):
+            self._balancer.record_failure(backend)
+            self._count(backend, OUTCOME_FAILED)
+            logger.warning(f"AI endpoint {backend.name} failed, failing over: {str(error)}")
+            return True
+
+        self._count(backend, OUTCOME_REJECTED)
+        return False
+
+    def _count(self, backend: AIBackend, outcome: str) -> None:
+        AI_BACKEND_CALLS.labels(backend=backend.name, outcome=outcome).inc()
+        AI_BACKEND_CIRCUIT_OPEN.labels(backend=backend.name).set(1 if self._balancer.state(backend) == BREAKER_OPEN else 0)
+
+    def _client_for(self, backend: AIBackend) -> Any:
+        with self._lock:
+            if backend.name not in self._clients:
+                self._clients[backend.name] = self._inner.create_client(
+                    backend.endpoint,
+                    backend.api_key,
+                    backend.api_version,
+                    max_retries=0,
+                    response_hook=lambda response: self._read_quota(backend, response)
+                )
+            return self._clients[backend.name]
+
+    def _read_quota(self, backend: AIBackend, response: Any) -> None:
+        self._balancer.record_quota(
+            backend,
+            _int_header(response.headers, 'x-ratelimit-remaining-requests'),
+            _int_header(response.headers, 'x-ratelimit-remaining-tokens')
+        )
+
+
+@dataclass
+class _OpenedStream:
+    first_chunk: Optional[str]
+    chunks: Iterator[str]
+    backend: Optional[AIBackend] = None
+
+
+class _HedgeRace:
+    """Attempts at one streamed call, each on its own thread.
+
+    The first attempt to deliver its first chunk wins; an attempt that gets
+    there later is closed right away, so a losing hedge stops generating.
+    """
+
+    def __init__(self, open_attempt: Callable[..., _OpenedStream], record_latency: Callable[[float], None], discard: Callable[[_OpenedStream], None]):
+        self._open_attempt = open_attempt
+        self._record_latency = record_latency
+        self._discard = discard
+        self._condition = threading.Condition()
+        self._backends = set()
+        self._started = 0
+        self._errors = []
+        self._winner = None
+        self.hedged = False
+
+    @property
+    def pending(self) -> bool:
+        with self._condition:
+            return self._winner is None and len(self._errors) < self._started
+
+    @property
+    def error(self) -> Exception:
+        return self._errors[-1]
+
+    def start(self, hedge: bool) -> None:
+        with self._condition:
+            self._started += 1
+            self.hedged = self.hedged or hedge
+            # A hedge goes to another backend than the attempts before it, when there is one
+            avoid = frozenset(self._backends)
+        # The attempt runs in the request's context, so it sees the request's cancellation
+        context = contextvars.copy_context()
+        threading.Thread(
+            target=context.run, args=(profiled(self._run), avoid, hedge), name='ai-hedge' if hedge else 'ai-call', daemon=True
+        ).start()
+
+    def wait(self, timeout: float = None) -> Optional[Tuple[_OpenedStream, bool]]:
+        """The winning attempt and whether it was a hedge; None if none won within timeout or all failed"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._winner is not None or len(self._errors) >= self._started, timeout)
+            return self._winner
+
+    def _run(self, avoid: FrozenSet[str], hedge: bool) -> None:
+        start = time.perf_counter()
+        try:
+            opened = self._open_attempt(avoid, self._add_backend)
+        except BaseException as e:
+            # Including the request's cancellation, which wait() then hands to the caller
+            with self._condition:
+                self._errors.append(e)
+                self._condition.notify_all()
+            return
+
+        self._record_latency(time.perf_counter() - start)
+        with self._condition:
+            won = self._winner is None
+            if won:
+                self._winner = (opened, hedge)
+                self._condition.notify_all()
+        if not won:
+            self._discard(opened)
+
+    def _add_backend(self, backend: AIBackend) -> None:
+        with self._condition:
+            self._backends.add(backend.name)
+
+
+def _retry_after(error: Exception) -> float:
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except ValueError:
+        pass
+    return DEFAULT_RETRY_AFTER
+
+
+def _int_header(headers: Any, name: str) -> Optional[int]:
+    try:
+        return int(headers[name]) if headers.get(name) else None
+    except ValueError:
+        return None
+
+
+def _is_connection_error(error: Exception) -> bool:
+    try:
+        from openai import APIConnectionError
+    except ImportError:
+        return False
+    # Also covers APITimeoutError
+    return isinstance(error, APIConnectionError)
@@ -0,0 +1,99 @@
+import csv
+import logging
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from ...application.ports.ocr_engine import OCREnginePort
+from ...domain.models.ocr_result import OCRPageResult
+from ...domain.exceptions.conversion_exceptions import OCRException
+from .....shared.infrastructure.monitoring.metrics import track_stage
+from .....shared.infrastructure.utils.cancellation import CancellationToken, current_cancellation
+from .....shared.infrastructure.utils.process_utils import run_cancellable
+
+logger = logging.getLogger(__name__)
+
+# Row level of single words in tesseract's TSV output
+TSV_WORD_LEVEL = '5'
+
+
+class TesseractOCRAdapter(OCREnginePort):
+    """Runs the tesseract CLI on page images, several pages at a time.
+
+    Each page is a separate tesseract process, so a small thread pool feeding
+    them is enough for real parallelism; tesseract's own OpenMP threading is
+    turned off to keep one CPU per page.
+    """
+
+    def __init__(self, languages: str = 'eng+kor', workers: Optional[int] = None, timeout: int = 60):
+        self._languages = languages
+        self._workers = workers or os.cpu_count() or 1
+        self._timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        return shutil.which('tesseract') is not None
+
+    def recognize_pages(self, images: List[bytes]) -> List[OCRPageResult]:
+        if not self.is_available():
+            raise OCRException("tesseract is not installed. Install the tesseract-ocr package")
+
+        with track_stage('ocr'):
+            # Created on first use so that gunicorn workers, not the master, own the pool
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix='ocr')
+            # The pool threads do not see the request's context, so its cancellation is handed over
+            token = current_cancellation()
+            return list(self._executor.map(lambda image_bytes: self._recognize(image_bytes, token), images))
+
+    def _recognize(self, image_bytes: bytes, token: Optional[CancellationToken] = None) -> OCRPageResult:
+        cmd = ['tesseract', 'stdin', 'stdout', '-l', self._languages, 'tsv']
+        env = dict(os.environ, OMP_THREAD_LIMIT='1')
+        try:
+            result = run_cancellable(cmd, input=image_bytes, timeout=self._timeout, env=env, token=token)
+        except subprocess.CalledProcessError as e:
+            raise OCRException(f"tesseract failed: {e.stderr.decode('utf-8', 'replace').strip()}")
+        except subprocess.TimeoutExpired:
+            raise OCRException(f"tesseract timed out after {self._timeout}s")
+
+        return parse_tsv(result.stdout.decode('utf-8', 'replace'))
+
+
+def parse_tsv(tsv: str) -> OCRPageResult:
+    lines = {}
+    total_confidence = 0.0
+    total_weight = 0
+
+    reader = csv.DictReader(tsv.splitlines(), delimiter='\t', quoting=csv.QUOTE_NONE)
+    for row in reader:
+        text = (row.get('text') or '').strip()
+        if row.get('level') != TSV_WORD_LEVEL or not text:
+            continue
+        confidence = float(row['conf'])
+        if confidence < 0:
+            continue
+        key = (int(row['block_num']), int(row['par_num']), int(row['line_num']))
+        lines.setdefault(key, []).append(text)
+        # Longer words weigh more, so stray single-character noise cannot dominate
+        total_confidence += confidence * len(text)
+        total_weight += len(text)
+
+    paragraphs = []
+    previous_paragraph = None
+    for (block, paragraph, _), words in sorted(lines.items()):
+        line = ' '.join(words)
+        if (block, paragraph) == previous_paragraph:
+            paragraphs[-1] += '\n' + line
+        else:
+            paragraphs.append(line)
+        previous_paragraph = (block, paragraph)
+
+    return OCRPageResult(
+        text='\n\n'.join(paragraphs),
+        confidence=round(total_confidence / total_weight, 1) if total_weight else 0.0,
+        word_count=sum(len(words) for words in lines.values())
+    )
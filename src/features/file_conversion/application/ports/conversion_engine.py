@@ -7,10 +7,18 @@ class ConversionEnginePort(ABC):
     @abstractmethod
     def convert(self, file_path: str) -> Any:
         pass
+    
+    def warmup(self) -> None:
+        """Load lazily imported backends ahead of the first request"""
+        pass
+    
+    def version(self) -> str:
+        """Changes whenever the same file could convert differently, e.g. after an upgrade"""
+        return ''
 
 
 class LLMConversionEnginePort(ABC):
     
     @abstractmethod
-    def convert_with_llm(self, file_path: str, llm_client: Any, llm_model: str) -> Any:
+    def convert_with_llm(self, file_path: str, llm_client: Any, llm_model: str, options: Any = None) -> Any:
         pass
\ No newline at end of file
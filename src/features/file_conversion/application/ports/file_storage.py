@@ -13,6 +13,10 @@ class FileStoragePort(ABC):
     def save_uploaded_file(self, file: BinaryIO, temp_file_path: str) -> None:
         pass
     
+    @abstractmethod
+    def file_sha256(self, file_path: str) -> str:
+        pass
+    
     @abstractmethod
     def cleanup_temp_file(self, file_path: str) -> None:
         pass
\ No newline at end of file
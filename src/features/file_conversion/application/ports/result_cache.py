@@ -0,0 +1,13 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class ResultCachePort(ABC):
+    
+    @abstractmethod
+    def get(self, key: str) -> Optional[dict]:
+        pass
+    
+    @abstractmethod
+    def put(self, key: str, entry: dict) -> None:
+        pass
@@ -1,9 +1,17 @@
+import hashlib
+import logging
+import os
+from typing import Optional
 from ..ports.conversion_engine import ConversionEnginePort
 from ..ports.file_storage import FileStoragePort
+from ..ports.result_cache import ResultCachePort
 from ...domain.models.conversion_request import ConversionRequest
 from ...domain.models.conversion_result import ConversionResult
 from ...domain.services.markdown_enhancer import MarkdownEnhancerService
 from ...domain.exceptions.conversion_exceptions import ConversionFailedException
+from .....shared.infrastructure.monitoring.metrics import CONVERT_CACHE, track_stage
+
+logger = logging.getLogger(__name__)
 
 
 class ConvertFileUseCase:
@@ -12,11 +20,40 @@ class ConvertFileUseCase:
         self,
         conversion_engine: ConversionEnginePort,
         file_storage: FileStoragePort,
-        markdown_enhancer: MarkdownEnhancerService
+        markdown_enhancer: MarkdownEnhancerService,
+        result_cache: Optional[ResultCachePort] = None
     ):
         self._conversion_engine = conversion_engine
         self._file_storage = file_storage
         self._markdown_enhancer = markdown_enhancer
+        self._result_cache = result_cache
+    
+    def cached(self, sha256: str, filename: str, enhance_markdown: bool) -> Optional[ConversionResult]:
+        """The result of an earlier conversion of the same content and options, if still cached"""
+        if self._result_cache is None:
+            return None
+        entry = self._result_cache.get(self._result_key(sha256, filename, enhance_markdown))
+        CONVERT_CACHE.labels(outcome='hit' if entry is not None else 'miss').inc()
+        if entry is None:
+            return None
+        return ConversionResult(
+            success=True,
+            markdown=entry['markdown'],
+            original_markdown=entry['original_markdown'],
+            title=entry['title'],
+            metadata={'original_filename': filename, **entry['metadata']}
+        )
+    
+    def entity_tag(self, sha256: str, filename: str, enhance_markdown: bool, response_format: str) -> str:
+        """Strong ETag of the response converting this content with these options.
+        
+        Conversion is deterministic for a given converter version, so the tag
+        is known before converting. The filename is part of it because it
+        appears in the response; per-request details such as timings go out
+        as headers, keeping equal tags on equal bodies.
+        """
+        key = self._result_key(sha256, filename, enhance_markdown)
+        return hashlib.sha256(f'{key}:{response_format}:{filename}'.encode('utf-8')).hexdigest()[:32]
     
     def execute(self, request: ConversionRequest) -> ConversionResult:
         try:
@@ -27,21 +64,30 @@ class ConvertFileUseCase:
             
             markdown_content = result.text_content
             if request.enhance_markdown:
-                markdown_content = self._markdown_enhancer.enhance_markdown_structure(
-                    markdown_content, request.filename
-                )
+                with track_stage('enhance'):
+                    markdown_content = self._markdown_enhancer.enhance_markdown_structure(
+                        markdown_content, request.filename
+                    )
+            
+            metadata = {
+                'converted_size': len(markdown_content),
+                'original_size': len(result.text_content),
+                'enhanced': request.enhance_markdown
+            }
+            if request.sha256:
+                self._store(self._result_key(request.sha256, request.filename, request.enhance_markdown), {
+                    'markdown': markdown_content,
+                    'original_markdown': result.text_content,
+                    'title': getattr(result, 'title', None),
+                    'metadata': metadata
+                })
             
             return ConversionResult(
                 success=True,
                 markdown=markdown_content,
                 original_markdown=result.text_content,
                 title=getattr(result, 'title', None),
-                metadata={
-                    'original_filename': request.filename,
-                    'converted_size': len(markdown_content),
-                    'original_size': len(result.text_content),
-                    'enhanced': request.enhance_markdown
-                }
+                metadata={'original_filename': request.filename, **metadata}
             )
             
         except Exception as e:
@@ -49,4 +95,19 @@ class ConvertFileUseCase:
                 success=False,
                 markdown="",
                 error_message=str(e)
-            )
\ No newline at end of file
+            )
+    
+    def _store(self, key: str, entry: dict) -> None:
+        if self._result_cache is None:
+            return
+        try:
+            self._result_cache.put(key, entry)
+        except OSError as e:
+            # The conversion itself succeeded; only later repeats miss out
+            logger.warning(f"Could not cache conversion result: {str(e)}")
+    
+    def _result_key(self, sha256: str, filename: str, enhance_markdown: bool) -> str:
+        # The converter is chosen by extension, so the same bytes under another extension convert differently
+        extension = os.path.splitext(filename.lower())[1]
+        identity = f'{self._conversion_engine.version()}:{sha256.lower()}:{extension}:{enhance_markdown}'
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
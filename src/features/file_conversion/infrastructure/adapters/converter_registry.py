@@ -0,0 +1,184 @@
+import logging
+import sys
+import threading
+from contextlib import contextmanager
+import time
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, Optional, Tuple
+from ...domain.exceptions.conversion_exceptions import UnsupportedFileFormatException
+
+logger = logging.getLogger(__name__)
+
+# MarkItDown converter classes handling each extension, and the optional
+# packages that only those converters import
+CONVERTER_BACKENDS: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    '.docx': (('DocxConverter',), ('mammoth',)),
+    '.doc': ((), ()),
+    '.pptx': (('PptxConverter',), ('pptx',)),
+    '.ppt': ((), ()),
+    '.xlsx': (('XlsxConverter',), ('pandas', 'openpyxl')),
+    '.xls': (('XlsConverter',), ('pandas', 'xlrd')),
+    '.pdf': (('PdfConverter',), ('pdfminer',)),
+    '.jpg': (('ImageConverter',), ()),
+    '.jpeg': (('ImageConverter',), ()),
+    '.png': (('ImageConverter',), ()),
+    '.gif': ((), ()),
+    '.bmp': ((), ()),
+    '.tiff': ((), ()),
+    '.webp': ((), ()),
+    '.wav': (('AudioConverter',), ('pydub', 'speech_recognition')),
+    '.mp3': (('AudioConverter',), ('pydub', 'speech_recognition')),
+    '.txt': (('PlainTextConverter',), ()),
+    '.csv': (('PlainTextConverter',), ()),
+    '.json': (('PlainTextConverter',), ()),
+    '.xml': (('PlainTextConverter', 'RssConverter'), ()),
+    '.html': (('HtmlConverter',), ()),
+    '.htm': (('HtmlConverter',), ()),
+    '.zip': (('ZipConverter',), ()),
+    '.epub': (('EpubConverter',), ()),
+    '.msg': (('OutlookMsgConverter',), ('olefile',)),
+}
+
+# Registered behind the specific converters, as MarkItDown does for its builtins
+GENERIC_CONVERTERS = {'PlainTextConverter', 'HtmlConverter', 'ZipConverter'}
+
+# Optional packages of builtin converters this server never registers
+UNUSED_DEPENDENCIES = ('azure.ai.documentintelligence', 'youtube_transcript_api')
+
+# Converter dependencies other features import themselves, never kept out
+SHARED_DEPENDENCIES = frozenset({'pdfminer'})
+
+
+def parse_allowlist(value: Optional[str]) -> Optional[FrozenSet[str]]:
+    if not value or not value.strip():
+        return None
+    extensions = (item.strip().lower() for item in value.split(','))
+    return frozenset(ext if ext.startswith('.') else f'.{ext}' for ext in extensions if ext)
+
+
+class ConverterRegistry:
+    """Loads MarkItDown and its converter backends on first use.
+
+    Without an allowlist every builtin converter is enabled, as before. With an
+    allowlist ("slim" profile) only the converters for those extensions are
+    registered, each on the first request for one of its extensions, and
+    MarkItDown is imported without the optional packages only the other
+    converters need: it imports them eagerly but tolerates their absence,
+    which is where most of its import time and memory goes.
+    """
+
+    def __init__(self, allowlist: Optional[Iterable[str]] = None):
+        self._allowlist = frozenset(allowlist) if allowlist else None
+        if self._allowlist is not None:
+            unconvertible = sorted(ext for ext in self._allowlist if not CONVERTER_BACKENDS.get(ext, ((), ()))[0])
+            if unconvertible:
+                raise ValueError(f"CONVERTER_ALLOWLIST: no converter handles {', '.join(unconvertible)}")
+        self._skipped_dependencies = []
+        self._converter = None
+        self._loaded_extensions = set()
+        self._registered_converters = set()
+        self._load_times_ms: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def is_slim(self) -> bool:
+        return self._allowlist is not None
+
+    @property
+    def enabled_extensions(self) -> FrozenSet[str]:
+        return self._allowlist if self.is_slim else frozenset(CONVERTER_BACKENDS)
+
+    def supports(self, extension: str) -> bool:
+        return extension.lower() in self.enabled_extensions
+
+    def get_converter(self, extension: str) -> Any:
+        extension = extension.lower()
+        if not self.supports(extension):
+            raise UnsupportedFileFormatException(
+                f"File extension {extension} is not enabled on this server"
+            )
+
+        with self._lock:
+            if self._converter is None:
+                self._converter = self._create_converter()
+            if self.is_slim and extension not in self._loaded_extensions:
+                self._register_backend(extension)
+        return self._converter
+
+    def load_all(self) -> None:
+        for extension in sorted(self.enabled_extensions):
+            self.get_converter(extension)
+
+    def describe(self) -> dict:
+        return {
+            'profile': 'slim' if self.is_slim else 'full',
+            'enabled_extensions': sorted(self.enabled_extensions),
+            'skipped_dependencies': list(self._skipped_dependencies),
+            'load_times_ms': dict(self._load_times_ms)
+        }
+
+    def _create_converter(self) -> Any:
+        start = time.perf_counter()
+        with self._without_unused_dependencies():
+            from markitdown import MarkItDown
+        self._record_load_time('import_markitdown', start)
+
+        start = time.perf_counter()
+        converter = MarkItDown(enable_builtins=not self.is_slim, enable_plugins=False)
+        self._record_load_time('create_markitdown', start)
+        return converter
+
+    def _register_backend(self, extension: str) -> None:
+        from markitdown import PRIORITY_GENERIC_FILE_FORMAT, PRIORITY_SPECIFIC_FILE_FORMAT
+        from markitdown import converters
+
+        start = time.perf_counter()
+        converter_names, _ = CONVERTER_BACKENDS.get(extension, ((), ()))
+
+        for name in converter_names:
+            if name in self._registered_converters:
+                continue
+            converter_class = getattr(converters, name)
+            instance = converter_class(markitdown=self._converter) if name == 'ZipConverter' else converter_class()
+            priority = PRIORITY_GENERIC_FILE_FORMAT if name in GENERIC_CONVERTERS else PRIORITY_SPECIFIC_FILE_FORMAT
+            self._converter.register_converter(instance, priority=priority)
+            self._registered_converters.add(name)
+
+        self._loaded_extensions.add(extension)
+        self._record_load_time(extension, start)
+
+    @contextmanager
+    def _without_unused_dependencies(self) -> Iterator[None]:
+        """Keep the packages only unregistered converters need out of MarkItDown's import.
+
+        The blocking lasts for the import only, so any later import of those
+        packages, by this or another feature, loads them as usual.
+        """
+        if not self.is_slim or 'markitdown' in sys.modules:
+            yield
+            return
+
+        needed = set(SHARED_DEPENDENCIES)
+        for extension in self._allowlist:
+            needed.update(CONVERTER_BACKENDS[extension][1])
+        unused = set(UNUSED_DEPENDENCIES)
+        for _, dependencies in CONVERTER_BACKENDS.values():
+            unused.update(dependencies)
+
+        blocked = [name for name in sorted(unused - needed) if name not in sys.modules]
+        for name in blocked:
+            # A None entry makes an import of the module raise ImportError
+            sys.modules[name] = None
+        try:
+            yield
+        finally:
+            for name in blocked:
+                if sys.modules.get(name, False) is None:
+                    del sys.modules[name]
+        self._skipped_dependencies = blocked
+        if blocked:
+            logger.info(f"Slim converter profile, MarkItDown loaded without: {', '.join(blocked)}")
+
+    def _record_load_time(self, name: str, start: float) -> None:
+        duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        self._load_times_ms[name] = duration_ms
+        logger.info(f"Loaded converter backend '{name}' in {duration_ms:.1f} ms")
@@ -0,0 +1,75 @@
+import json
+import logging
+import os
+import re
+import tempfile
+from typing import Optional
+from ...application.ports.result_cache import ResultCachePort
+
+logger = logging.getLogger(__name__)
+
+KEY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+class FileResultCache(ResultCachePort):
+    """Conversion results as JSON files in a directory shared by all workers.
+
+    Holds at most max_entries results; the least recently used go first.
+    0 disables the cache.
+    """
+    
+    def __init__(self, directory: str, max_entries: int = 1000):
+        self._directory = directory
+        self._max_entries = max_entries
+    
+    def get(self, key: str) -> Optional[dict]:
+        if self._max_entries <= 0 or not KEY_PATTERN.match(key):
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+            # The modification time doubles as the last use, for eviction
+            os.utime(path)
+            return entry
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cached result {key}: {str(e)}")
+            return None
+    
+    def put(self, key: str, entry: dict) -> None:
+        if self._max_entries <= 0 or not KEY_PATTERN.match(key):
+            return
+        os.makedirs(self._directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self._directory, prefix='.result_', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self._evict()
+    
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self._directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                entries.append((os.path.getmtime(os.path.join(self._directory, name)), name))
+            except OSError:
+                # Evicted by another worker meanwhile
+                continue
+        if len(entries) <= self._max_entries:
+            return
+        entries.sort()
+        for _, name in entries[:len(entries) - self._max_entries]:
+            try:
+                os.unlink(os.path.join(self._directory, name))
+            except OSError:
+                pass
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, f'{key}.json')
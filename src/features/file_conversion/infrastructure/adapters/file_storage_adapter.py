@@ -1,8 +1,10 @@
+import hashlib
 import os
 import tempfile
 import logging
 from typing import BinaryIO
 from ...application.ports.file_storage import FileStoragePort
+from .....shared.infrastructure.monitoring.metrics import track_stage
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +19,16 @@ class FileStorageAdapter(FileStoragePort):
         )
     
     def save_uploaded_file(self, file: BinaryIO, temp_file_path: str) -> None:
-        file.save(temp_file_path)
+        with track_stage('upload_save'):
+            file.save(temp_file_path)
+    
+    def file_sha256(self, file_path: str) -> str:
+        digest = hashlib.sha256()
+        with track_stage('upload_hash'):
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+        return digest.hexdigest()
     
     def cleanup_temp_file(self, file_path: str) -> None:
         try:
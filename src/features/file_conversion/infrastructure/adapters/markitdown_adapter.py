@@ -1,22 +1,158 @@
-from markitdown import MarkItDown
+import io
+import os
+import logging
+import zipfile
+from .converter_registry import ConverterRegistry
 from ...application.ports.conversion_engine import ConversionEnginePort, LLMConversionEnginePort
+from .....shared.infrastructure.monitoring.metrics import track_stage
 from typing import Any
 
+logger = logging.getLogger(__name__)
+
+WARMUP_SAMPLES = {
+    '.html': b'<html><body><h1>Warmup</h1><table><tr><th>a</th></tr><tr><td>1</td></tr></table></body></html>',
+    '.csv': b'a,b\n1,2\n',
+    '.json': b'{"warmup": true}',
+}
+
 
 class MarkItDownAdapter(ConversionEnginePort):
     
-    def __init__(self):
-        self._converter = MarkItDown(enable_plugins=False)
+    def __init__(self, registry: ConverterRegistry = None):
+        self._registry = registry or ConverterRegistry()
     
     def convert(self, file_path: str) -> Any:
-        return self._converter.convert(file_path)
+        extension = os.path.splitext(file_path.lower())[1]
+        with track_stage('converter_load'):
+            converter = self._registry.get_converter(extension)
+        with track_stage('markitdown_convert'):
+            return converter.convert(file_path)
+    
+    def version(self) -> str:
+        try:
+            from importlib.metadata import PackageNotFoundError, version
+            return f"markitdown-{version('markitdown')}"
+        except PackageNotFoundError:
+            return 'markitdown'
+    
+    def warmup(self) -> None:
+        # Loading the registry first lets a slim profile keep unused
+        # dependencies out before anything imports MarkItDown
+        self._registry.load_all()
+        from markitdown import StreamInfo
+        
+        samples = dict(WARMUP_SAMPLES)
+        samples.update(self._office_warmup_samples())
+        
+        for extension, sample in samples.items():
+            if not self._registry.supports(extension):
+                continue
+            try:
+                converter = self._registry.get_converter(extension)
+                converter.convert_stream(io.BytesIO(sample), stream_info=StreamInfo(extension=extension))
+            except Exception as e:
+                logger.warning(f"Converter warmup failed for {extension}: {str(e)}")
+    
+    def _office_warmup_samples(self) -> dict:
+        # Only libraries MarkItDown has already imported are used to build these,
+        # so warming up does not add new modules to the master process
+        samples = {}
+        if self._registry.supports('.pdf'):
+            samples['.pdf'] = _pdf_warmup_sample()
+        if self._registry.supports('.docx'):
+            samples['.docx'] = _docx_warmup_sample()
+        if self._registry.supports('.xlsx'):
+            try:
+                from openpyxl import Workbook
+                workbook = Workbook()
+                workbook.active.append(['a', 'b'])
+                buffer = io.BytesIO()
+                workbook.save(buffer)
+                samples['.xlsx'] = buffer.getvalue()
+            except Exception as e:
+                logger.debug(f"Skipping .xlsx warmup sample: {str(e)}")
+        if self._registry.supports('.pptx'):
+            try:
+                from pptx import Presentation
+                presentation = Presentation()
+                slide = presentation.slides.add_slide(presentation.slide_layouts[0])
+                slide.shapes.title.text = 'Warmup'
+                buffer = io.BytesIO()
+                presentation.save(buffer)
+                samples['.pptx'] = buffer.getvalue()
+            except Exception as e:
+                logger.debug(f"Skipping .pptx warmup sample: {str(e)}")
+        return samples
+
+
+def _pdf_warmup_sample() -> bytes:
+    """A one page PDF with a line of text, written out by hand"""
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 200 100] '
+        b'/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>',
+        None,
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    content = b'BT /F1 12 Tf 20 50 Td (Warmup) Tj ET'
+    objects[3] = b'<< /Length %d >>\nstream\n%s\nendstream' % (len(content), content)
+    
+    pdf = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(pdf)
+    pdf += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        pdf += b'%010d 00000 n \n' % offset
+    pdf += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+def _docx_warmup_sample() -> bytes:
+    """A DOCX with a heading and a table, built from its minimal parts"""
+    word = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+    parts = {
+        '[Content_Types].xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ),
+        '_rels/.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="word/document.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+            '</Relationships>'
+        ),
+        'word/document.xml': (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document xmlns:w="{word}"><w:body>'
+            '<w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr><w:r><w:t>Warmup</w:t></w:r></w:p>'
+            '<w:tbl><w:tr><w:tc><w:p><w:r><w:t>a</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+            '</w:body></w:document>'
+        ),
+    }
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, xml in parts.items():
+            archive.writestr(name, xml)
+    return buffer.getvalue()
 
 
 class MarkItDownLLMAdapter(LLMConversionEnginePort):
     
-    def convert_with_llm(self, file_path: str, llm_client: Any, llm_model: str) -> Any:
+    def convert_with_llm(self, file_path: str, llm_client: Any, llm_model: str, options: Any = None) -> Any:
+        # MarkItDown builds its own captioning request, so vision options are not applied
+        from markitdown import MarkItDown
+        
         converter = MarkItDown(
             llm_client=llm_client,
             llm_model=llm_model
         )
-        return converter.convert(file_path)
\ No newline at end of file
+        return converter.convert(file_path)
@@ -1,9 +1,23 @@
 import json
 import os
+import re
+from dataclasses import asdict
 from flask import Blueprint, request, Response, current_app, stream_with_context
 from ...domain.models.conversion_request import ConversionRequest, AIConversionRequest
 from .....shared.infrastructure.utils.file_utils import get_file_info, SUPPORTED_EXTENSIONS
+from .....shared.web.common.markdown_stream import MarkdownStream, RESULT_PAYLOAD_ERROR, RESULT_PAYLOADS
+from .....shared.web.common.event_pump import KEEPALIVE, KEEPALIVE_EVENT, cancel_on_disconnect, pump_events
+from .....shared.infrastructure.utils.cancellation import CancellationToken, DeadlineExceeded, current_cancellation
+from .....shared.infrastructure.monitoring.stage_timer import current_timings
+from .....shared.infrastructure.monitoring.metrics import CONVERT_CACHE
 from ...domain.exceptions.conversion_exceptions import UnsupportedFileFormatException
+from ....ai_conversion.domain.models.conversion_events import (
+    DocumentAnalyzed, DocumentRendered, PageChunk, PageFinished, PageStarted
+)
+from ....ai_conversion.domain.services.page_router import PAGE_ROUTING_MODES
+from ....ai_conversion.domain.models.conversion_result import REASON_DEADLINE
+from ....ai_conversion.domain.models.page_selection import PageSelection
+from ....ai_conversion.domain.exceptions.conversion_exceptions import ImageConversionException, PageSelectionException
 
 
 file_conversion_bp = Blueprint('file_conversion', __name__)
@@ -16,6 +30,17 @@ AI_CONVERTIBLE_EXTENSIONS = {
     '.pdf', '.pptx', '.ppt', '.docx', '.doc', '.xlsx', '.xls'
 }
 
+# mode of /convert_with_ai: answer with the document, or submit it to the batch API and answer with a job
+MODE_INTERACTIVE = 'interactive'
+MODE_DEFERRED = 'deferred'
+
+SHA256_PATTERN = re.compile(r'[0-9a-f]{64}')
+
+# Tells whether a /convert result came from the result cache
+CACHE_HEADER = 'X-Cache'
+CACHE_HIT = 'HIT'
+CACHE_MISS = 'MISS'
+
 
 def create_sse_response(data, event_type="message"):
     """Create SSE formatted response"""
@@ -41,12 +66,13 @@ def convert_file():
 
         file_info = get_file_info(file.filename)
         
-        if not file_info.supported:
+        converter_registry = current_app.container.converter_registry
+        if not file_info.supported or not converter_registry.supports(file_info.extension):
             return _error_response(
                 'Unsupported file format', 
                 f'File extension {file_info.extension} is not supported',
                 400,
-                {'supported_formats': list(SUPPORTED_EXTENSIONS), 'file_info': file_info.__dict__}
+                {'supported_formats': sorted(converter_registry.enabled_extensions & SUPPORTED_EXTENSIONS), 'file_info': file_info.__dict__}
             )
 
         temp_file = current_app.container.file_storage_adapter.create_temp_file(
@@ -58,40 +84,26 @@ def convert_file():
             current_app.container.file_storage_adapter.save_uploaded_file(file, temp_file.name)
             temp_file.flush()
             
-            conversion_request = ConversionRequest(
-                file_path=temp_file.name,
-                filename=file.filename,
-                enhance_markdown=enhance_markdown
-            )
+            use_case = current_app.container.convert_file_use_case
+            sha256 = current_app.container.file_storage_adapter.file_sha256(temp_file.name)
+            etag = use_case.entity_tag(sha256, file.filename, enhance_markdown, response_format)
+            if request.if_none_match.contains_weak(etag):
+                return _not_modified(etag)
             
-            result = current_app.container.convert_file_use_case.execute(conversion_request)
+            result = use_case.cached(sha256, file.filename, enhance_markdown)
+            cache_status = CACHE_HIT if result is not None else CACHE_MISS
+            if result is None:
+                result = use_case.execute(ConversionRequest(
+                    file_path=temp_file.name,
+                    filename=file.filename,
+                    enhance_markdown=enhance_markdown,
+                    sha256=sha256
+                ))
             
             if not result.success:
                 return _error_response('Conversion failed', result.error_message, 500, {'file_info': file_info.__dict__})
 
-            if response_format == 'text':
-                return Response(
-                    result.markdown,
-                    mimetype='text/markdown; charset=utf-8',
-                    headers={
-                        'Content-Disposition': f'attachment; filename="{os.path.splitext(file.filename)[0]}.md"'
-                    }
-                )
-            else:
-                response_data = {
-                    'success': True,
-                    'markdown': result.markdown,
-                    'original_markdown': result.original_markdown,
-                    'file_info': file_info.__dict__,
-                    'processing_info': {
-                        'enhanced': enhance_markdown
-                    },
-                    'metadata': result.metadata
-                }
-                return Response(
-                    json.dumps(response_data, ensure_ascii=False, indent=2),
-                    mimetype='application/json; charset=utf-8'
-                )
+            return _conversion_response(result, file.filename, file_info, enhance_markdown, response_format, etag, cache_status)
                 
         finally:
             current_app.container.file_storage_adapter.cleanup_temp_file(temp_file.name)
@@ -100,6 +112,86 @@ def convert_file():
         return _error_response('Internal server error', str(e), 500)
 
 
+@file_conversion_bp.route('/convert/lookup', methods=['GET', 'POST'])
+def lookup_converted_file():
+    """Answer /convert for a file by its SHA-256, without the upload, if its result is cached"""
+    try:
+        sha256 = request.values.get('sha256', '').strip().lower()
+        if not SHA256_PATTERN.fullmatch(sha256):
+            return _error_response('Invalid sha256', 'sha256 must be the hex SHA-256 digest of the file content', 400)
+
+        filename = request.values.get('filename', '')
+        if not filename:
+            return _error_response('No filename provided', 'Please give the name the file would be uploaded under', 400)
+
+        response_format = request.values.get('format', 'json').lower()
+        if response_format not in ['json', 'text']:
+            return _error_response('Invalid format', 'Format must be either "json" or "text"', 400)
+
+        enhance_markdown = request.values.get('enhance_markdown', 'true').lower() == 'true'
+
+        file_info = get_file_info(filename)
+        converter_registry = current_app.container.converter_registry
+        if not file_info.supported or not converter_registry.supports(file_info.extension):
+            return _error_response(
+                'Unsupported file format',
+                f'File extension {file_info.extension} is not supported',
+                400,
+                {'supported_formats': sorted(converter_registry.enabled_extensions & SUPPORTED_EXTENSIONS), 'file_info': file_info.__dict__}
+            )
+
+        use_case = current_app.container.convert_file_use_case
+        etag = use_case.entity_tag(sha256, filename, enhance_markdown, response_format)
+        if request.if_none_match.contains_weak(etag):
+            return _not_modified(etag)
+
+        result = use_case.cached(sha256, filename, enhance_markdown)
+        if result is None:
+            return _error_response('Not cached', 'No conversion of this content is cached; upload the file to /convert', 404)
+
+        return _conversion_response(result, filename, file_info, enhance_markdown, response_format, etag, CACHE_HIT)
+
+    except Exception as e:
+        return _error_response('Internal server error', str(e), 500)
+
+
+def _conversion_response(result, filename: str, file_info, enhance_markdown: bool, response_format: str, etag: str, cache_status: str) -> Response:
+    if response_format == 'text':
+        response = Response(
+            result.markdown,
+            mimetype='text/markdown; charset=utf-8',
+            headers={
+                'Content-Disposition': f'attachment; filename="{os.path.splitext(filename)[0]}.md"'
+            }
+        )
+    else:
+        response_data = {
+            'success': True,
+            'markdown': result.markdown,
+            'original_markdown': result.original_markdown,
+            'file_info': file_info.__dict__,
+            'processing_info': {
+                'enhanced': enhance_markdown
+            },
+            'metadata': result.metadata
+        }
+        response = Response(
+            json.dumps(response_data, ensure_ascii=False, indent=2),
+            mimetype='application/json; charset=utf-8'
+        )
+    # The body is the same for every request with this tag; what differs per request goes in headers
+    response.set_etag(etag)
+    response.headers[CACHE_HEADER] = cache_status
+    return response
+
+
+def _not_modified(etag: str) -> Response:
+    CONVERT_CACHE.labels(outcome='not_modified').inc()
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+
 @file_conversion_bp.route('/convert_image', methods=['POST'])
 def convert_image_with_llm():
     try:
@@ -139,6 +231,7 @@ def convert_image_with_llm():
             return _error_response('Invalid format', 'Format must be either "json" or "text"', 400)
 
         enhance_markdown = request.form.get('enhance_markdown', 'true').lower() == 'true'
+        ocr = _form_flag('ocr', current_app.container.settings.ocr_enabled)
 
         temp_file = current_app.container.file_storage_adapter.create_temp_file(
             suffix=file_info.extension,
@@ -156,7 +249,8 @@ def convert_image_with_llm():
                 azure_endpoint=azure_endpoint,
                 api_key=api_key,
                 deployment_name=deployment_name,
-                api_version=api_version
+                api_version=api_version,
+                ocr=ocr
             )
             
             result = current_app.container.convert_image_use_case.execute(conversion_request)
@@ -223,7 +317,14 @@ def convert_document_with_ai():
         deployment_name = request.form.get('deployment_name', '').strip()
         api_version = request.form.get('api_version', '2024-02-01').strip()
 
-        if not azure_endpoint or not api_key or not deployment_name:
+        try:
+            preset = _preset_field()
+        except ValueError as e:
+            return _error_response('Invalid preset', str(e), 400, {'presets': list(current_app.container.presets)})
+        # An explicit deployment_name wins over the preset's
+        deployment_name = deployment_name or (preset.deployment if preset is not None else None) or ''
+
+        if _missing_ai_config(azure_endpoint, api_key, deployment_name):
             return _error_response(
                 'Missing Azure OpenAI configuration',
                 'azure_endpoint, api_key, and deployment_name are required',
@@ -231,13 +332,47 @@ def convert_document_with_ai():
                 {'required_fields': ['azure_endpoint', 'api_key', 'deployment_name']}
             )
 
-        dpi = int(request.form.get('dpi', 200))
         response_format = request.form.get('format', 'json').lower()
+        mode = request.form.get('mode', MODE_INTERACTIVE).lower()
         enhance_markdown = request.form.get('enhance_markdown', 'true').lower() == 'true'
+        page_routing = request.form.get('page_routing', current_app.container.settings.page_routing).lower()
+        ocr = _form_flag('ocr', current_app.container.settings.ocr_enabled)
+        page_filter = _form_flag('page_filter', current_app.container.settings.page_filter_enabled)
+        batch_pages = _form_flag('batch_pages', current_app.container.settings.batch_pages_enabled)
 
         if response_format not in ['json', 'text']:
             return _error_response('Invalid format', 'Format must be either "json" or "text"', 400)
 
+        if mode not in [MODE_INTERACTIVE, MODE_DEFERRED]:
+            return _error_response('Invalid mode', 'mode must be either "interactive" or "deferred"', 400)
+
+        if mode == MODE_DEFERRED and not azure_endpoint:
+            # Batches run on one resource's Global Batch deployment, not over the AI_ENDPOINTS pool
+            return _error_response(
+                'Missing Azure OpenAI configuration',
+                'mode "deferred" needs azure_endpoint, api_key and a batch deployment_name',
+                400,
+                {'required_fields': ['azure_endpoint', 'api_key', 'deployment_name']}
+            )
+
+        if page_routing not in PAGE_ROUTING_MODES:
+            return _error_response('Invalid page_routing', 'page_routing must be either "vision" or "hybrid"', 400)
+
+        try:
+            pages = _page_selection()
+        except PageSelectionException as e:
+            return _error_response('Invalid pages', str(e), 400)
+
+        try:
+            dpi, adaptive_dpi = _dpi_field(preset)
+        except ValueError as e:
+            return _error_response('Invalid dpi', str(e), 400)
+
+        try:
+            cascade_deployment = _cascade_deployment(deployment_name)
+        except ValueError as e:
+            return _error_response('Invalid cascade', str(e), 400)
+
         temp_file = current_app.container.file_storage_adapter.create_temp_file(
             suffix=file_info.extension,
             prefix='markitdown_ai_'
@@ -255,10 +390,26 @@ def convert_document_with_ai():
                 api_key=api_key,
                 deployment_name=deployment_name,
                 api_version=api_version,
-                dpi=dpi
+                dpi=dpi,
+                adaptive_dpi=adaptive_dpi,
+                page_routing=page_routing,
+                ocr=ocr,
+                page_filter=page_filter,
+                batch_pages=batch_pages,
+                pages=pages,
+                preset=preset,
+                cascade_deployment=cascade_deployment
             )
             
-            result = current_app.container.convert_with_ai_use_case.execute(conversion_request)
+            if mode == MODE_DEFERRED:
+                return _submit_deferred(conversion_request)
+
+            try:
+                result = current_app.container.convert_with_ai_use_case.execute(conversion_request)
+            except DeadlineExceeded as e:
+                return _error_response('Deadline exceeded', f'The document could not be rendered in time: {str(e)}', 504)
+            except PageSelectionException as e:
+                return _error_response('Invalid pages', str(e), 400)
             
             if not result.success:
                 return _error_response('AI conversion failed', result.error_message, 500)
@@ -283,7 +434,9 @@ def convert_document_with_ai():
                         'converted_size': len(result.markdown),
                         'pages_processed': result.pages_processed,
                         'successful_pages': result.successful_pages,
-                        'failed_pages': result.failed_pages
+                        'failed_pages': result.failed_pages,
+                        'pages': str(pages) if pages is not None else None,
+                        'partial': result.partial
                     }
                 }
                 return Response(
@@ -298,10 +451,38 @@ def convert_document_with_ai():
         return _error_response('Internal server error', str(e), 500)
 
 
+@file_conversion_bp.route('/convert_with_ai/jobs/<job_id>', methods=['GET'])
+def get_deferred_job(job_id: str):
+    """Status of a deferred AI conversion, with its result once the batch completed"""
+    try:
+        job = current_app.container.convert_with_ai_use_case.deferred_job(job_id)
+        if job is None:
+            return _error_response('Job not found', f'No deferred AI conversion with id {job_id}', 404)
+
+        # The key is never stored; with it, a job whose worker went away is checked again
+        api_key = request.headers.get('api-key', '').strip()
+        poller = current_app.container.batch_job_poller
+        if not job.finished and api_key and not poller.watching(job_id):
+            try:
+                job = poller.refresh(job_id, api_key)
+            except Exception as e:
+                return _error_response('Batch status unavailable', str(e), 502)
+
+        return Response(
+            json.dumps(_job_document(job), ensure_ascii=False, indent=2),
+            mimetype='application/json; charset=utf-8'
+        )
+
+    except Exception as e:
+        return _error_response('Internal server error', str(e), 500)
+
+
 @file_conversion_bp.route('/convert_with_ai/stream', methods=['POST'])
 def convert_document_with_ai_stream():
     """Stream AI document conversion with SSE"""
     def generate():
+        token = current_cancellation() or CancellationToken()
+        stage = 'upload'
         try:
             # Send initial connection event
             yield create_sse_response({
@@ -341,11 +522,69 @@ def convert_document_with_ai_stream():
             api_key = request.form.get('api_key', '').strip()
             deployment_name = request.form.get('deployment_name', '').strip()
             api_version = request.form.get('api_version', '2024-02-01').strip()
-            dpi = int(request.form.get('dpi', 200))
             enhance_markdown = request.form.get('enhance_markdown', 'true').lower() == 'true'
+            result_payload = request.form.get('result_payload', 'full').lower()
+
+            if result_payload not in RESULT_PAYLOADS:
+                yield create_sse_response({
+                    "status": "error",
+                    "message": RESULT_PAYLOAD_ERROR
+                }, "error")
+                return
+
+            page_routing = request.form.get('page_routing', current_app.container.settings.page_routing).lower()
+            ocr = _form_flag('ocr', current_app.container.settings.ocr_enabled)
+            page_filter = _form_flag('page_filter', current_app.container.settings.page_filter_enabled)
+            batch_pages = _form_flag('batch_pages', current_app.container.settings.batch_pages_enabled)
+
+            if page_routing not in PAGE_ROUTING_MODES:
+                yield create_sse_response({
+                    "status": "error",
+                    "message": "Invalid page_routing. Must be either \"vision\" or \"hybrid\""
+                }, "error")
+                return
+
+            try:
+                pages = _page_selection()
+            except PageSelectionException as e:
+                yield create_sse_response({
+                    "status": "error",
+                    "message": f"Invalid pages: {str(e)}"
+                }, "error")
+                return
+
+            try:
+                preset = _preset_field()
+            except ValueError as e:
+                yield create_sse_response({
+                    "status": "error",
+                    "message": f"Invalid preset: {str(e)}",
+                    "presets": list(current_app.container.presets)
+                }, "error")
+                return
+            # An explicit deployment_name wins over the preset's
+            deployment_name = deployment_name or (preset.deployment if preset is not None else None) or ''
+
+            try:
+                dpi, adaptive_dpi = _dpi_field(preset)
+            except ValueError as e:
+                yield create_sse_response({
+                    "status": "error",
+                    "message": f"Invalid dpi: {str(e)}"
+                }, "error")
+                return
+
+            try:
+                cascade_deployment = _cascade_deployment(deployment_name)
+            except ValueError as e:
+                yield create_sse_response({
+                    "status": "error",
+                    "message": f"Invalid cascade: {str(e)}"
+                }, "error")
+                return
 
             # Validate required parameters
-            if not azure_endpoint or not api_key or not deployment_name:
+            if _missing_ai_config(azure_endpoint, api_key, deployment_name):
                 yield create_sse_response({
                     "status": "error",
                     "message": "Missing Azure OpenAI configuration",
@@ -386,15 +625,15 @@ def convert_document_with_ai_stream():
                     api_key=api_key,
                     deployment_name=deployment_name,
                     api_version=api_version,
-                    dpi=dpi
-                )
-                
-                # Create Azure AI client
-                ai_client = current_app.container.convert_with_ai_use_case._ai_client
-                azure_client = ai_client.create_client(
-                    azure_endpoint,
-                    api_key,
-                    api_version
+                    dpi=dpi,
+                    adaptive_dpi=adaptive_dpi,
+                    page_routing=page_routing,
+                    ocr=ocr,
+                    page_filter=page_filter,
+                    batch_pages=batch_pages,
+                    pages=pages,
+                    preset=preset,
+                    cascade_deployment=cascade_deployment
                 )
                 
                 # Get file extension for conversion type detection
@@ -406,101 +645,128 @@ def convert_document_with_ai_stream():
                     "step": "document_conversion"
                 }, "progress")
                 
-                # Convert document to images
-                image_processor = current_app.container.convert_with_ai_use_case._image_processor
-                try:
-                    if extension == '.pdf':
-                        image_bytes_list = image_processor.convert_pdf_to_images(temp_file.name, dpi=dpi)
-                    elif extension in ['.pptx', '.ppt', '.docx', '.doc', '.xlsx', '.xls']:
-                        image_bytes_list = image_processor.convert_office_document_to_images(temp_file.name, extension, dpi=dpi)
-                    else:
-                        image_bytes_list = image_processor.convert_document_to_images_basic(temp_file.name)
-                except Exception as e:
-                    yield create_sse_response({
-                        "status": "error",
-                        "message": f"Failed to convert document to images: {str(e)}"
-                    }, "error")
-                    return
-                
-                total_pages = len(image_bytes_list)
-                yield create_sse_response({
-                    "status": "processing",
-                    "message": f"Document converted to {total_pages} images. Starting AI analysis...",
-                    "total_pages": total_pages,
-                    "step": "ai_processing_start"
-                }, "progress")
-                
-                # Process each page with streaming
-                markdown_pages = []
-                analysis_results = []
-                successful_pages = 0
-                failed_pages = 0
+                # The final document is built (and enhanced line by line) while the pages arrive
+                use_case = current_app.container.convert_with_ai_use_case
+                markdown_stream = MarkdownStream(use_case.markdown_enhancer if enhance_markdown else None)
+                emit_markdown_chunks = enhance_markdown or result_payload == 'checksum'
+                total_pages = 0
+                # Counted rather than read off the page number, which differs under a page selection
+                finished_pages = 0
+                analyzed = None
+                stage = 'render'
+                events = pump_events(
+                    use_case.stream(conversion_request), token, current_app.container.settings.sse_keepalive_seconds
+                )
                 
-                for i, image_bytes in enumerate(image_bytes_list):
-                    page_num = i + 1
-                    
-                    yield create_sse_response({
-                        "status": "processing",
-                        "message": f"Analyzing page {page_num} of {total_pages}...",
-                        "current_page": page_num,
-                        "total_pages": total_pages,
-                        "step": "ai_page_processing"
-                    }, "progress")
-                    
+                while True:
                     try:
-                        # Stream AI analysis for this page
-                        page_markdown = ""
-                        for chunk in ai_client.analyze_image_stream(
-                            image_bytes, 
-                            azure_client, 
-                            deployment_name,
-                            page_num
-                        ):
-                            page_markdown += chunk
-                            # Send streaming chunk for this page
-                            yield create_sse_response({
-                                "status": "streaming",
-                                "message": f"AI analyzing page {page_num}...",
-                                "page": page_num,
-                                "chunk": chunk
-                            }, "ai_chunk")
-                        
-                        markdown_pages.append(page_markdown)
-                        analysis_results.append({
-                            "page": page_num,
-                            "status": "success",
-                            "content_length": len(page_markdown)
-                        })
-                        successful_pages += 1
-                        
+                        event = next(events)
+                    except StopIteration:
+                        break
+                    except ImageConversionException as e:
                         yield create_sse_response({
-                            "status": "page_completed",
-                            "message": f"Page {page_num} analysis completed",
-                            "page": page_num,
-                            "content_length": len(page_markdown),
-                            "progress": f"{page_num}/{total_pages}"
-                        }, "page_result")
-                        
-                    except Exception as e:
-                        error_markdown = f"# Page {page_num}\n\n[Error: Failed to analyze this page - {str(e)}]\n\n"
-                        markdown_pages.append(error_markdown)
-                        analysis_results.append({
-                            "page": page_num,
                             "status": "error",
-                            "error": str(e)
-                        })
-                        failed_pages += 1
+                            "message": f"Failed to convert document to images: {str(e)}"
+                        }, "error")
+                        return
+                    except DeadlineExceeded as e:
+                        yield create_sse_response({
+                            "status": "error",
+                            "message": f"The document could not be rendered in time: {str(e)}"
+                        }, "error")
+                        return
+                    except PageSelectionException as e:
+                        yield create_sse_response({
+                            "status": "error",
+                            "message": f"Invalid pages: {str(e)}"
+                        }, "error")
+                        return
+                    
+                    if event is KEEPALIVE:
+                        yield KEEPALIVE_EVENT
+                    
+                    elif isinstance(event, DocumentRendered):
+                        stage = 'analysis'
+                        total_pages = event.total_pages
+                        yield create_sse_response({
+                            "status": "processing",
+                            "message": f"Document converted to {total_pages} images. Starting AI analysis...",
+                            "total_pages": total_pages,
+                            "page_routing": event.routing,
+                            "step": "ai_processing_start"
+                        }, "progress")
+                    
+                    elif isinstance(event, PageStarted):
+                        yield create_sse_response({
+                            "status": "processing",
+                            "message": f"Analyzing page {event.page} of {total_pages}...",
+                            "current_page": event.page,
+                            "total_pages": total_pages,
+                            "route": event.route,
+                            "step": "ai_page_processing"
+                        }, "progress")
                         
+                        if event.index > 0:
+                            delta = markdown_stream.push("\n\n---\n\n")
+                            if emit_markdown_chunks and delta:
+                                yield _markdown_chunk_event(delta, event.page)
+                    
+                    elif isinstance(event, PageChunk):
+                        # Send streaming chunk for this page
                         yield create_sse_response({
-                            "status": "page_error",
-                            "message": f"Failed to analyze page {page_num}",
-                            "page": page_num,
-                            "error": str(e),
-                            "progress": f"{page_num}/{total_pages}"
-                        }, "page_error")
+                            "status": "streaming",
+                            "message": f"AI analyzing page {event.page}...",
+                            "page": event.page,
+                            "route": event.route,
+                            "chunk": event.content
+                        }, "ai_chunk")
+                        
+                        delta = markdown_stream.push(event.content)
+                        if emit_markdown_chunks and delta:
+                            yield _markdown_chunk_event(delta, event.page)
+                    
+                    elif isinstance(event, PageFinished):
+                        page_result = event.result
+                        finished_pages += 1
+                        if page_result.status == 'skipped' and page_result.reason == REASON_DEADLINE:
+                            yield create_sse_response({
+                                "status": "page_skipped",
+                                "message": f"Page {page_result.page} skipped, not enough time left before the deadline",
+                                "page": page_result.page,
+                                "reason": page_result.reason,
+                                "progress": f"{finished_pages}/{total_pages}"
+                            }, "page_result")
+                        elif event.error_markdown:
+                            delta = markdown_stream.push(event.error_markdown)
+                            if emit_markdown_chunks and delta:
+                                yield _markdown_chunk_event(delta, page_result.page)
+                            yield create_sse_response({
+                                "status": "page_error",
+                                "message": f"Failed to analyze page {page_result.page}",
+                                "page": page_result.page,
+                                "error": page_result.error,
+                                "progress": f"{finished_pages}/{total_pages}"
+                            }, "page_error")
+                        else:
+                            yield create_sse_response({
+                                "status": "page_completed",
+                                "message": f"Page {page_result.page} analysis completed",
+                                "page": page_result.page,
+                                "content_length": page_result.content_length,
+                                "route": page_result.route,
+                                "progress": f"{finished_pages}/{total_pages}"
+                            }, "page_result")
+                    
+                    elif isinstance(event, DocumentAnalyzed):
+                        analyzed = event
                 
-                # Combine all pages
-                combined_markdown = "\n\n---\n\n".join(markdown_pages)
+                delta = markdown_stream.finish()
+                if emit_markdown_chunks and delta:
+                    yield _markdown_chunk_event(delta, total_pages)
+                
+                analysis_results = analyzed.analysis_results
+                successful_pages = len([r for r in analysis_results if r.status == 'success'])
+                failed_pages = len([r for r in analysis_results if r.status == 'error'])
                 
                 yield create_sse_response({
                     "status": "processing",
@@ -511,40 +777,49 @@ def convert_document_with_ai_stream():
                     "failed_pages": failed_pages
                 }, "progress")
                 
-                # Apply markdown enhancement if requested
-                if enhance_markdown:
-                    markdown_enhancer = current_app.container.convert_with_ai_use_case._markdown_enhancer
-                    combined_markdown = markdown_enhancer.enhance_markdown_structure(
-                        combined_markdown, file.filename
-                    )
+                result = {
+                    "success": True,
+                    "file_info": file_info.__dict__,
+                    "analysis_results": [r.__dict__ for r in analysis_results],
+                    "metadata": {
+                        "original_filename": file.filename,
+                        "converted_size": markdown_stream.size,
+                        "markdown_sha256": markdown_stream.sha256,
+                        "pages_processed": total_pages,
+                        "successful_pages": successful_pages,
+                        "failed_pages": failed_pages,
+                        "enhanced": enhance_markdown,
+                        "method": "ai_image_analysis_streaming",
+                        "llm_model": deployment_name,
+                        "azure_endpoint": azure_endpoint,
+                        "dpi": "auto" if adaptive_dpi else (dpi if extension == '.pdf' else None),
+                        "page_routing": analyzed.routing,
+                        "pages": str(pages) if pages is not None else None,
+                        "preset": preset.describe() if preset is not None else None,
+                        "cascade": analyzed.cascade,
+                        "partial": analyzed.partial,
+                        "result_payload": result_payload,
+                        "timings": current_timings()
+                    }
+                }
+                if result_payload == 'full':
+                    result["markdown"] = markdown_stream.markdown
 
                 # Send final completion event
                 yield create_sse_response({
                     "status": "completed",
                     "message": "AI conversion completed successfully",
-                    "result": {
-                        "success": True,
-                        "markdown": combined_markdown,
-                        "file_info": file_info.__dict__,
-                        "analysis_results": analysis_results,
-                        "metadata": {
-                            "original_filename": file.filename,
-                            "converted_size": len(combined_markdown),
-                            "pages_processed": total_pages,
-                            "successful_pages": successful_pages,
-                            "failed_pages": failed_pages,
-                            "enhanced": enhance_markdown,
-                            "method": "ai_image_analysis_streaming",
-                            "llm_model": deployment_name,
-                            "azure_endpoint": azure_endpoint,
-                            "dpi": dpi if extension == '.pdf' else None
-                        }
-                    }
+                    "result": result
                 }, "result")
                 
             finally:
                 current_app.container.file_storage_adapter.cleanup_temp_file(temp_file.name)
 
+        except GeneratorExit:
+            # The server closes the response when writing to a disconnected client fails
+            cancel_on_disconnect(token, '/convert_with_ai/stream', stage)
+            raise
+
         except Exception as e:
             yield create_sse_response({
                 "status": "error",
@@ -563,6 +838,117 @@ def convert_document_with_ai_stream():
     )
 
 
+def _submit_deferred(conversion_request: AIConversionRequest) -> Response:
+    try:
+        job = current_app.container.convert_with_ai_use_case.submit_deferred(conversion_request)
+    except DeadlineExceeded as e:
+        return _error_response('Deadline exceeded', f'The document could not be rendered in time: {str(e)}', 504)
+    except PageSelectionException as e:
+        return _error_response('Invalid pages', str(e), 400)
+    except Exception as e:
+        return _error_response('Deferred submission failed', str(e), 502)
+
+    if not job.finished:
+        current_app.container.batch_job_poller.watch(job.job_id, conversion_request.api_key)
+    return Response(
+        json.dumps(_job_document(job), ensure_ascii=False, indent=2),
+        mimetype='application/json; charset=utf-8',
+        status=202,
+        headers={'Location': f'/convert_with_ai/jobs/{job.job_id}'}
+    )
+
+
+def _job_document(job) -> dict:
+    document = {
+        'job_id': job.job_id,
+        'status': job.status,
+        'filename': job.filename,
+        'created_at': job.created_at,
+        'updated_at': job.updated_at,
+        'batch': asdict(job.batch) if job.batch is not None else None,
+        'processing_info': dict(job.metadata or {}, page_routing=job.routing),
+        'error': job.error
+    }
+    if job.result is not None:
+        document.update({
+            'success': True,
+            'markdown': job.result['markdown'],
+            'analysis_results': job.result['analysis_results'],
+            'metadata': {
+                'original_filename': job.filename,
+                'converted_size': len(job.result['markdown']),
+                'pages_processed': job.result['pages_processed'],
+                'successful_pages': job.result['successful_pages'],
+                'failed_pages': job.result['failed_pages']
+            }
+        })
+    return document
+
+
+def _markdown_chunk_event(delta: str, page_num: int) -> str:
+    return create_sse_response({
+        "status": "streaming",
+        "page": page_num,
+        "delta": delta
+    }, "markdown_chunk")
+
+
+def _form_flag(name: str, default: bool) -> bool:
+    return request.form.get(name, str(default)).lower() == 'true'
+
+
+def _preset_field():
+    """The ConversionPreset named by the preset form field; None without one"""
+    name = request.form.get('preset', '').strip()
+    if not name:
+        return None
+    presets = current_app.container.presets
+    if name not in presets:
+        raise ValueError(f"preset must be one of {', '.join(presets)}, got {name!r}")
+    return presets[name]
+
+
+def _dpi_field(preset=None):
+    """The dpi form field as (dpi, adaptive); 'auto' chooses each page's DPI.
+
+    Without the field the preset's dpi applies, and without a preset 200.
+    """
+    value = request.form.get('dpi', '').strip().lower() or (str(preset.dpi) if preset is not None else '200')
+    if value == 'auto':
+        return 200, True
+    try:
+        dpi = int(value)
+    except ValueError:
+        raise ValueError(f"dpi must be a number or \"auto\", got {value!r}")
+    if dpi <= 0:
+        raise ValueError("dpi must be positive")
+    return dpi, False
+
+
+def _cascade_deployment(deployment_name: str):
+    """The small deployment pages are tried on first, when the cascade form field turns cascade mode on"""
+    settings = current_app.container.settings
+    if not _form_flag('cascade', settings.ai_cascade):
+        return None
+    cascade_deployment = request.form.get('cascade_deployment', '').strip() or settings.ai_cascade_deployment
+    if not cascade_deployment:
+        raise ValueError("cascade needs a cascade_deployment or AI_CASCADE_DEPLOYMENT")
+    # Trying the same deployment twice would only add a call
+    return cascade_deployment if cascade_deployment != deployment_name else None
+
+
+def _page_selection():
+    spec = request.form.get('pages', '').strip()
+    return PageSelection.parse(spec) if spec else None
+
+
+def _missing_ai_config(azure_endpoint: str, api_key: str, deployment_name: str) -> bool:
+    # Without an endpoint of its own the request is served by the AI_ENDPOINTS backends
+    if not azure_endpoint and current_app.container.ai_router.has_backends:
+        return False
+    return not azure_endpoint or not api_key or not deployment_name
+
+
 def _error_response(error: str, message: str, status_code: int, extra_data: dict = None):
     error_data = {
         'error': error,
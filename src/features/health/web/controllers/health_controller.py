@@ -1,5 +1,5 @@
 import json
-from flask import Blueprint, Response
+from flask import Blueprint, Response, current_app
 from .....shared.infrastructure.utils.file_utils import SUPPORTED_EXTENSIONS
 
 
@@ -15,7 +15,8 @@ def home():
     response_data = {
         'status': 'MarkItDown File Converter Server',
         'version': '1.0.0',
-        'supported_formats': list(SUPPORTED_EXTENSIONS),
+        'supported_formats': sorted(current_app.container.converter_registry.enabled_extensions & SUPPORTED_EXTENSIONS),
+        'converters': current_app.container.converter_registry.describe(),
         'endpoints': {
             'convert': {
                 'method': 'POST',
@@ -27,6 +28,17 @@ def home():
                     'enhance_markdown': 'Enhance markdown structure: "true" or "false" (default: "true")'
                 }
             },
+            'convert_lookup': {
+                'method': 'GET, POST',
+                'url': '/convert/lookup',
+                'description': 'Get a cached /convert result by the SHA-256 of the file, without uploading it',
+                'parameters': {
+                    'sha256': 'Hex SHA-256 of the file content (required)',
+                    'filename': 'Name the file would be uploaded under (required)',
+                    'format': 'Response format: "json" or "text" (default: "json")',
+                    'enhance_markdown': 'Enhance markdown structure: "true" or "false" (default: "true")'
+                }
+            },
             'convert_image': {
                 'method': 'POST',
                 'url': '/convert_image',
@@ -64,10 +76,11 @@ def home():
                     'api_key': 'Azure OpenAI API key (required)',
                     'deployment_name': 'Azure OpenAI deployment name (required)',
                     'api_version': 'Azure OpenAI API version (default: "2024-02-01")',
-                    'enhance_markdown': 'Enhance markdown structure: "true" or "false" (default: "true")'
+                    'enhance_markdown': 'Enhance markdown structure: "true" or "false" (default: "true")',
+                    'result_payload': 'Final result event payload: "full" or "checksum" (default: "full")'
                 },
                 'response_type': 'text/event-stream (Server-Sent Events)',
-                'events': ['connection', 'progress', 'ai_chunk', 'result', 'error']
+                'events': ['connection', 'progress', 'ai_chunk', 'markdown_chunk', 'result', 'error']
             },
             'convert_with_ai': {
                 'method': 'POST',
@@ -100,6 +113,10 @@ def home():
 @health_bp.route('/health', methods=['GET'])
 def health_check():
     response_data = {'status': 'healthy', 'service': 'markitdown-server'}
+    ai_router = current_app.container.ai_router
+    if ai_router.has_backends:
+        # As seen by the worker answering this request
+        response_data['ai_backends'] = ai_router.describe()
     return Response(
         json.dumps(response_data, ensure_ascii=False, indent=2),
         mimetype='application/json; charset=utf-8'
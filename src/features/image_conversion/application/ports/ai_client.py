@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Any
+from .....shared.domain.models.conversion_preset import VisionOptions
 
 
 class AIClientPort(ABC):
@@ -9,5 +10,9 @@ class AIClientPort(ABC):
         pass
     
     @abstractmethod
-    def analyze_image(self, image_bytes: bytes, client: Any, deployment_name: str, page_num: int = None) -> str:
+    def analyze_image(self, image_bytes: bytes, client: Any, deployment_name: str, page_num: int = None, file_path: str = None, options: VisionOptions = None) -> str:
+        pass
+    
+    def warmup(self) -> None:
+        """Load lazily imported backends ahead of the first request"""
         pass
\ No newline at end of file
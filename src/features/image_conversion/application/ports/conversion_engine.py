@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Any
+from .....shared.domain.models.conversion_preset import VisionOptions
 
 
 class ConversionEnginePort(ABC):
@@ -12,5 +13,5 @@ class ConversionEnginePort(ABC):
 class LLMConversionEnginePort(ABC):
     
     @abstractmethod
-    def convert_with_llm(self, file_path: str, llm_client: Any, llm_model: str) -> Any:
+    def convert_with_llm(self, file_path: str, llm_client: Any, llm_model: str, options: VisionOptions = None) -> Any:
         pass
\ No newline at end of file
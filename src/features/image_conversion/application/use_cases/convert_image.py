@@ -1,10 +1,26 @@
+import logging
+from typing import Any, Optional
 from ..ports.conversion_engine import LLMConversionEnginePort
 from ..ports.ai_client import AIClientPort
 from ..ports.file_storage import FileStoragePort
 from ...domain.models.conversion_request import AIConversionRequest
+from .....shared.domain.models.conversion_preset import ConversionPreset
 from ...domain.models.conversion_result import ConversionResult
 from ...domain.services.markdown_enhancer import MarkdownEnhancerService
 from ...domain.exceptions.conversion_exceptions import ConversionFailedException, AIClientException
+from .....shared.infrastructure.monitoring.metrics import track_stage
+from .....shared.infrastructure.monitoring.stage_timer import current_timings
+
+logger = logging.getLogger(__name__)
+
+# Preset settings that apply to an uploaded image; it is neither rendered nor split into pages
+IMAGE_PRESET_SETTINGS = ('name', 'detail', 'max_tokens', 'deployment')
+
+
+def describe_image_preset(preset: Optional[ConversionPreset]) -> Optional[dict]:
+    if preset is None:
+        return None
+    return {key: value for key, value in preset.describe().items() if key in IMAGE_PRESET_SETTINGS}
 
 
 class ConvertImageUseCase:
@@ -14,35 +30,61 @@ class ConvertImageUseCase:
         llm_conversion_engine: LLMConversionEnginePort,
         ai_client: AIClientPort,
         file_storage: FileStoragePort,
-        markdown_enhancer: MarkdownEnhancerService
+        markdown_enhancer: MarkdownEnhancerService,
+        ocr_engine: Any = None,
+        page_router: Any = None
     ):
         self._llm_conversion_engine = llm_conversion_engine
         self._ai_client = ai_client
         self._file_storage = file_storage
         self._markdown_enhancer = markdown_enhancer
+        self._ocr_engine = ocr_engine
+        self._page_router = page_router
+    
+    def recognize_locally(self, file_path: str) -> Optional[Any]:
+        """OCR the image; returns the result only when it is confident enough to skip the model"""
+        if self._ocr_engine is None or self._page_router is None:
+            return None
+        try:
+            with open(file_path, 'rb') as f:
+                ocr = self._ocr_engine.recognize_pages([f.read()])[0]
+        except Exception as e:
+            logger.warning(f"Local OCR failed, using the model: {str(e)}")
+            return None
+        
+        route = self._page_router.route_ocr(1, ocr)
+        logger.info(f"OCR confidence {ocr.confidence:.1f} over {ocr.word_count} words: {route.reason}")
+        return ocr if route.route == 'ocr' else None
     
     def execute(self, request: AIConversionRequest) -> ConversionResult:
         try:
+            ocr = self.recognize_locally(request.file_path) if request.ocr else None
+            if ocr is not None:
+                return self._ocr_result(request, ocr)
+            
             azure_client = self._ai_client.create_client(
                 request.azure_endpoint,
                 request.api_key,
                 request.api_version
             )
             
-            result = self._llm_conversion_engine.convert_with_llm(
-                request.file_path,
-                azure_client,
-                request.deployment_name
-            )
+            with track_stage('llm_convert'):
+                result = self._llm_conversion_engine.convert_with_llm(
+                    request.file_path,
+                    azure_client,
+                    request.deployment_name,
+                    options=request.preset.vision if request.preset is not None else None
+                )
             
             if not result or not result.text_content:
                 raise ConversionFailedException("The image could not be converted to Markdown with LLM")
             
             markdown_content = result.text_content
             if request.enhance_markdown:
-                markdown_content = self._markdown_enhancer.enhance_markdown_structure(
-                    markdown_content, request.filename
-                )
+                with track_stage('enhance'):
+                    markdown_content = self._markdown_enhancer.enhance_markdown_structure(
+                        markdown_content, request.filename
+                    )
             
             return ConversionResult(
                 success=True,
@@ -56,7 +98,10 @@ class ConvertImageUseCase:
                     'enhanced': request.enhance_markdown,
                     'llm_used': True,
                     'llm_model': request.deployment_name,
-                    'azure_endpoint': request.azure_endpoint
+                    'azure_endpoint': request.azure_endpoint,
+                    'route': 'vision',
+                    'preset': describe_image_preset(request.preset),
+                    'timings': current_timings()
                 }
             )
             
@@ -65,4 +110,31 @@ class ConvertImageUseCase:
                 success=False,
                 markdown="",
                 error_message=str(e)
-            )
\ No newline at end of file
+            )
+    
+    def _ocr_result(self, request: AIConversionRequest, ocr: Any) -> ConversionResult:
+        markdown_content = ocr.text
+        if request.enhance_markdown:
+            with track_stage('enhance'):
+                markdown_content = self._markdown_enhancer.enhance_markdown_structure(
+                    markdown_content, request.filename
+                )
+        
+        return ConversionResult(
+            success=True,
+            markdown=markdown_content,
+            original_markdown=ocr.text,
+            metadata={
+                'original_filename': request.filename,
+                'converted_size': len(markdown_content),
+                'original_size': len(ocr.text),
+                'enhanced': request.enhance_markdown,
+                'llm_used': False,
+                'llm_model': None,
+                'azure_endpoint': request.azure_endpoint,
+                'route': 'ocr',
+                'ocr_confidence': ocr.confidence,
+                'preset': describe_image_preset(request.preset),
+                'timings': current_timings()
+            }
+        )
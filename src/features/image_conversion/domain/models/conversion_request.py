@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from typing import Optional
+from .....shared.domain.models.conversion_preset import ConversionPreset
 
 
 @dataclass
@@ -18,4 +19,8 @@ class AIConversionRequest:
     deployment_name: str
     enhance_markdown: bool = True
     api_version: str = "2024-02-01"
-    dpi: int = 200
\ No newline at end of file
+    dpi: int = 200
+    # Try local OCR before sending the image to the model
+    ocr: bool = False
+    # Vision detail and max_tokens of the chosen preset; its deployment is already resolved
+    preset: Optional[ConversionPreset] = None
@@ -1,24 +1,48 @@
 import base64
 import logging
 import mimetypes
-from typing import Any, Iterator
+import re
+import time
+from typing import Any, Callable, Dict, Iterator, List
 from ...application.ports.ai_client import AIClientPort
 from ...application.ports.conversion_engine import LLMConversionEnginePort
 from ...domain.exceptions.conversion_exceptions import AIClientException
+from .....shared.domain.models.conversion_preset import VisionOptions
+from .....shared.domain.models.vision_reply import record_finish_reason
+from .....shared.infrastructure.monitoring.metrics import AI_LATENCY, record_ai_usage, record_error
+from .....shared.infrastructure.utils.cancellation import DeadlineExceeded, current_cancellation, raise_if_cancelled
 
 logger = logging.getLogger(__name__)
 
+# Marker the model writes before each page of a multi-image request
+PAGE_MARKER = '<<<PAGE {}>>>'
+PAGE_MARKER_PATTERN = re.compile(r'^[ \t]*<<<PAGE (\d+)>>>[ \t]*$', re.MULTILINE)
+
+DEFAULT_VISION = VisionOptions()
+
+DEFAULT_API_VERSION = '2024-02-01'
+
+# Never resolved: warmup only builds a client
+WARMUP_ENDPOINT = 'https://warmup.invalid'
+
 
 class AzureOpenAIAdapter(AIClientPort, LLMConversionEnginePort):
     
-    def create_client(self, endpoint: str, api_key: str, api_version: str) -> Any:
+    def create_client(self, endpoint: str, api_key: str, api_version: str, max_retries: int = None, response_hook: Callable = None) -> Any:
+        """response_hook is called with every HTTP response, e.g. to read rate limit headers"""
         try:
-            from openai import AzureOpenAI
+            from openai import AzureOpenAI, DefaultHttpxClient
             
+            options = {}
+            if max_retries is not None:
+                options['max_retries'] = max_retries
+            if response_hook is not None:
+                options['http_client'] = DefaultHttpxClient(event_hooks={'response': [response_hook]})
             client = AzureOpenAI(
                 azure_endpoint=endpoint,
                 api_key=api_key,
-                api_version=api_version
+                api_version=api_version,
+                **options
             )
             return client
         except ImportError:
@@ -26,98 +50,78 @@ class AzureOpenAIAdapter(AIClientPort, LLMConversionEnginePort):
         except Exception as e:
             raise AIClientException(f"Failed to create Azure OpenAI client: {str(e)}")
     
-    def analyze_image(self, image_bytes: bytes, client: Any, deployment_name: str, page_num: int = None, file_path: str = None) -> str:
+    def warmup(self) -> None:
+        # Builds a client the way requests do, with an HTTP client and a response hook,
+        # so the SDK's resources and the httpx transport are set up; nothing is sent
         try:
-            image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-            
-            # Detect image MIME type
-            if file_path:
-                mime_type, _ = mimetypes.guess_type(file_path)
-                if not mime_type or not mime_type.startswith('image/'):
-                    mime_type = 'image/png'  # fallback
-            else:
-                mime_type = 'image/png'  # fallback
-            
-            page_info = f"Page {page_num}" if page_num is not None else "Image"
-            
-            response = client.chat.completions.create(
-                model=deployment_name,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert at analyzing images and converting visual content to markdown format. You have full vision capabilities and can see and analyze images perfectly."
-                    },
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": f"""You MUST analyze the image I'm providing. Do not refuse or say you cannot see images.
-
-Please carefully examine this {page_info.lower()} and:
-
-1. Extract ALL visible text exactly as it appears
-2. Describe visual elements, charts, diagrams, or illustrations in detail
-3. Maintain document structure (headings, lists, tables, etc.)
-4. Convert everything to proper markdown format
-
-Required markdown syntax:
-- # for main headings
-- ## for subheadings  
-- **bold** for emphasis
-- - for bullet points
-- | col1 | col2 | for tables
-- [Image: detailed description] for visual elements
-
-Output requirements:
-- Start with a clear heading
-- Use Korean if content is Korean, otherwise use the original language
-- Include both text content AND visual descriptions
-- Format as clean, well-structured markdown
-
-Begin your analysis now:"""
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:{mime_type};base64,{image_base64}",
-                                    "detail": "high"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=2000,
-                stream=False,
-                temperature=0.1
+            client = self.create_client(
+                WARMUP_ENDPOINT, 'warmup', DEFAULT_API_VERSION, response_hook=lambda response: None
             )
-            
-            return response.choices[0].message.content
-        
+            client.chat.completions
+            client.close()
+        except AIClientException as e:
+            logger.warning(f"Azure OpenAI warmup skipped: {str(e)}")
+    
+    def analyze_image(self, image_bytes: bytes, client: Any, deployment_name: str, page_num: int = None, file_path: str = None, options: VisionOptions = None) -> str:
+        page_info = f"Page {page_num}" if page_num is not None else "Image"
+        try:
+            return self.complete_image(image_bytes, client, deployment_name, page_num, file_path, options)
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Azure OpenAI analysis failed for {page_info}: {str(e)}")
             return f"# {page_info}\n\n[Error: Failed to analyze this page - {str(e)}]\n\n"
     
-    def analyze_image_stream(self, image_bytes: bytes, client: Any, deployment_name: str, page_num: int = None, file_path: str = None) -> Iterator[str]:
+    def analyze_image_stream(self, image_bytes: bytes, client: Any, deployment_name: str, page_num: int = None, file_path: str = None, options: VisionOptions = None) -> Iterator[str]:
         """Stream-enabled image analysis"""
+        page_info = f"Page {page_num}" if page_num is not None else "Image"
         try:
-            image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-            
-            # Detect image MIME type
-            if file_path:
-                mime_type, _ = mimetypes.guess_type(file_path)
-                if not mime_type or not mime_type.startswith('image/'):
-                    mime_type = 'image/png'  # fallback
-            else:
-                mime_type = 'image/png'  # fallback
-            
-            page_info = f"Page {page_num}" if page_num is not None else "Image"
+            yield from self.stream_image(image_bytes, client, deployment_name, page_num, file_path, options)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Azure OpenAI streaming analysis failed for {page_info}: {str(e)}")
+            yield f"# {page_info}\n\n[Error: Failed to analyze this page - {str(e)}]\n\n"
+    
+    def complete_image(self, image_bytes: bytes, client: Any, deployment_name: str, page_num: int = None, file_path: str = None, options: VisionOptions = None) -> str:
+        """analyze_image that raises the client's exception instead of returning error markdown"""
+        try:
+            start = time.perf_counter()
+            response = _within_deadline(client).chat.completions.create(
+                **self.page_request_body(image_bytes, deployment_name, page_num, file_path, options),
+                stream=False
+            )
+            AI_LATENCY.labels(deployment=deployment_name, phase='total').observe(time.perf_counter() - start)
+            record_ai_usage(deployment_name, getattr(response, 'usage', None))
+            record_finish_reason(getattr(response.choices[0], 'finish_reason', None))
             
+            return response.choices[0].message.content
+        
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            record_error('ai_completion', e)
+            # A call cut off by the request's deadline is reported as such
+            raise_if_cancelled()
+            raise
+    
+    def page_request_body(self, image_bytes: bytes, deployment_name: str, page_num: int = None, file_path: str = None, options: VisionOptions = None) -> dict:
+        """The chat completions request complete_image sends, e.g. for a line of a batch API submission"""
+        options = options or DEFAULT_VISION
+        return {
+            'model': deployment_name,
+            'messages': _image_messages(image_bytes, page_num, file_path, options.detail),
+            'max_tokens': options.max_tokens,
+            'temperature': 0.1
+        }
+    
+    def stream_image(self, image_bytes: bytes, client: Any, deployment_name: str, page_num: int = None, file_path: str = None, options: VisionOptions = None) -> Iterator[str]:
+        """analyze_image_stream that raises the client's exception instead of yielding error markdown"""
+        options = options or DEFAULT_VISION
+        try:
             # Debug logging
-            logger.info(f"Image analysis - Size: {len(image_bytes)} bytes, MIME: {mime_type}, Base64 length: {len(image_base64)}")
+            logger.info(f"Image analysis - Size: {len(image_bytes)} bytes")
             logger.info(f"Using deployment: {deployment_name}")
-            logger.info(f"Image URL format: data:{mime_type};base64,[{len(image_base64)} chars]")
-            logger.info(f"Base64 sample: {image_base64[:50]}...")
             
             # Check if model supports vision
             if 'gpt-4' not in deployment_name.lower() and 'vision' not in deployment_name.lower():
@@ -125,85 +129,116 @@ Begin your analysis now:"""
             
             logger.info(f"Making API call to Azure OpenAI with model: {deployment_name}")
             
-            response = client.chat.completions.create(
+            start = time.perf_counter()
+            first_token_seen = False
+            response = _within_deadline(client).chat.completions.create(
                 model=deployment_name,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert at analyzing images and converting visual content to markdown format. You have full vision capabilities and can see and analyze images perfectly."
-                    },
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": f"""You MUST analyze the image I'm providing. Do not refuse or say you cannot see images.
+                messages=_image_messages(image_bytes, page_num, file_path, options.detail),
+                max_tokens=options.max_tokens,
+                stream=True,
+                temperature=0.1
+            )
+            
+            # Yield streaming chunks; closing the generator early closes the HTTP stream,
+            # which stops the generation instead of leaving it to run on
+            try:
+                for chunk in response:
+                    # The read timeout only bounds each wait, a slow but steady stream is stopped here
+                    raise_if_cancelled()
+                    try:
+                        # Safely extract content from chunk
+                        if chunk and chunk.choices:
+                            choice = chunk.choices[0] if len(chunk.choices) > 0 else None
+                            if choice and getattr(choice, 'finish_reason', None):
+                                record_finish_reason(choice.finish_reason)
+                            if choice and choice.delta and choice.delta.content:
+                                if not first_token_seen:
+                                    first_token_seen = True
+                                    AI_LATENCY.labels(deployment=deployment_name, phase='first_token').observe(
+                                        time.perf_counter() - start
+                                    )
+                                yield choice.delta.content
+                    except (IndexError, AttributeError) as chunk_error:
+                        logger.debug(f"Skipping chunk due to: {str(chunk_error)}")
+                        continue
+                    except Exception as chunk_error:
+                        logger.error(f"Unexpected error processing chunk: {str(chunk_error)}")
+                        continue
+            finally:
+                close = getattr(response, 'close', None)
+                if close is not None:
+                    close()
 
-Please carefully examine this {page_info.lower()} and:
+            AI_LATENCY.labels(deployment=deployment_name, phase='total').observe(time.perf_counter() - start)
+            
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            record_error('ai_completion', e)
+            raise_if_cancelled()
+            raise
+    
+    def analyze_images(self, images: List[bytes], client: Any, deployment_name: str, page_nums: List[int], options: VisionOptions = None) -> Dict[int, str]:
+        """Analyze several pages in one request; raises when the reply cannot be split back into pages"""
+        options = options or DEFAULT_VISION
+        content = [{
+            "type": "text",
+            "text": f"""You MUST analyze each of the {len(images)} page images I'm providing. Do not refuse or say you cannot see images.
 
-1. Extract ALL visible text exactly as it appears
-2. Describe visual elements, charts, diagrams, or illustrations in detail
-3. Maintain document structure (headings, lists, tables, etc.)
-4. Convert everything to proper markdown format
+For every page, in the order given:
 
-Required markdown syntax:
-- # for main headings
-- ## for subheadings  
-- **bold** for emphasis
-- - for bullet points
-- | col1 | col2 | for tables
-- [Image: detailed description] for visual elements
+1. Write the page marker given before the image on its own line, exactly as shown (for example {PAGE_MARKER.format(page_nums[0])})
+2. Below it, convert ALL visible text and visual elements of that page to markdown
+3. Maintain the page's structure (headings, lists, tables, etc.)
 
-Output requirements:
-- Start with a clear heading
-- Use Korean if content is Korean, otherwise use the original language
-- Include both text content AND visual descriptions
-- Format as clean, well-structured markdown
+Never merge pages, never skip a marker, and write nothing before the first marker.
+Use Korean if content is Korean, otherwise use the original language."""
+        }]
+        for page_num, image_bytes in zip(page_nums, images):
+            content.append({"type": "text", "text": PAGE_MARKER.format(page_num)})
+            content.append({
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:{_image_mime_type(image_bytes)};base64,{base64.b64encode(image_bytes).decode('utf-8')}",
+                    "detail": options.detail
+                }
+            })
 
-Begin your analysis now:"""
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:{mime_type};base64,{image_base64}",
-                                    "detail": "high"
-                                }
-                            }
-                        ]
-                    }
+        try:
+            start = time.perf_counter()
+            response = _within_deadline(client).chat.completions.create(
+                model=deployment_name,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are an expert at analyzing images and converting visual content to markdown format. You have full vision capabilities and can see and analyze images perfectly."
+                    },
+                    {"role": "user", "content": content}
                 ],
-                max_tokens=2000,
-                stream=True,
+                # Half the per-page allowance each, as batched pages are sparse
+                max_tokens=min(options.max_tokens // 2 * len(images), 4096),
+                stream=False,
                 temperature=0.1
             )
-            
-            # Yield streaming chunks
-            for chunk in response:
-                try:
-                    # Safely extract content from chunk
-                    if chunk and chunk.choices:
-                        choice = chunk.choices[0] if len(chunk.choices) > 0 else None
-                        if choice and choice.delta and choice.delta.content:
-                            yield choice.delta.content
-                except (IndexError, AttributeError) as chunk_error:
-                    logger.debug(f"Skipping chunk due to: {str(chunk_error)}")
-                    continue
-                except Exception as chunk_error:
-                    logger.error(f"Unexpected error processing chunk: {str(chunk_error)}")
-                    continue
-            
+            AI_LATENCY.labels(deployment=deployment_name, phase='total').observe(time.perf_counter() - start)
+            record_ai_usage(deployment_name, getattr(response, 'usage', None))
+        except DeadlineExceeded:
+            raise
         except Exception as e:
-            logger.error(f"Azure OpenAI streaming analysis failed for {page_info}: {str(e)}")
-            yield f"# {page_info}\n\n[Error: Failed to analyze this page - {str(e)}]\n\n"
+            record_error('ai_completion', e)
+            raise_if_cancelled()
+            raise
+
+        return split_pages(response.choices[0].message.content or '', page_nums)
     
-    def convert_with_llm(self, file_path: str, llm_client: Any, llm_model: str) -> Any:
+    def convert_with_llm(self, file_path: str, llm_client: Any, llm_model: str, options: VisionOptions = None) -> Any:
         try:
             # Read image file
             with open(file_path, 'rb') as f:
                 image_bytes = f.read()
             
             # Analyze image using LLM
-            markdown_content = self.analyze_image(image_bytes, llm_client, llm_model, file_path=file_path)
+            markdown_content = self.analyze_image(image_bytes, llm_client, llm_model, file_path=file_path, options=options)
             
             # Return a simple object with text_content attribute (like MarkItDown does)
             class ImageAnalysisResult:
@@ -221,4 +256,93 @@ Begin your analysis now:"""
                     self.text_content = None
                     self.error = error
             
-            return FailedResult(str(e))
\ No newline at end of file
+            return FailedResult(str(e))
+
+
+def _within_deadline(client: Any) -> Any:
+    """The client, bounded by the active request's deadline.
+
+    The SDK would retry a timed out call with the same timeout again, so
+    calls under a deadline are made once and time out when it passes.
+    """
+    token = current_cancellation()
+    if token is None or token.deadline is None:
+        return client
+    token.raise_if_cancelled()
+    return client.with_options(timeout=token.remaining(), max_retries=0)
+
+
+def _image_mime_type(image_bytes: bytes, file_path: str = None) -> str:
+    if file_path:
+        mime_type, _ = mimetypes.guess_type(file_path)
+        if mime_type and mime_type.startswith('image/'):
+            return mime_type
+    # Rendered pages are PNG or, with a preset that asks for it, JPEG
+    if image_bytes[:3] == b'\xff\xd8\xff':
+        return 'image/jpeg'
+    return 'image/png'  # fallback
+
+
+def _image_messages(image_bytes: bytes, page_num: int = None, file_path: str = None, detail: str = 'high') -> list:
+    image_base64 = base64.b64encode(image_bytes).decode('utf-8')
+    mime_type = _image_mime_type(image_bytes, file_path)
+    
+    page_info = f"Page {page_num}" if page_num is not None else "Image"
+    return [
+        {
+            "role": "system",
+            "content": "You are an expert at analyzing images and converting visual content to markdown format. You have full vision capabilities and can see and analyze images perfectly."
+        },
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "text",
+                    "text": f"""You MUST analyze the image I'm providing. Do not refuse or say you cannot see images.
+
+Please carefully examine this {page_info.lower()} and:
+
+1. Extract ALL visible text exactly as it appears
+2. Describe visual elements, charts, diagrams, or illustrations in detail
+3. Maintain document structure (headings, lists, tables, etc.)
+4. Convert everything to proper markdown format
+
+Required markdown syntax:
+- # for main headings
+- ## for subheadings  
+- **bold** for emphasis
+- - for bullet points
+- | col1 | col2 | for tables
+- [Image: detailed description] for visual elements
+
+Output requirements:
+- Start with a clear heading
+- Use Korean if content is Korean, otherwise use the original language
+- Include both text content AND visual descriptions
+- Format as clean, well-structured markdown
+
+Begin your analysis now:"""
+                },
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:{mime_type};base64,{image_base64}",
+                        "detail": detail
+                    }
+                }
+            ]
+        }
+    ]
+
+
+def split_pages(text: str, page_nums: List[int]) -> Dict[int, str]:
+    markers = list(PAGE_MARKER_PATTERN.finditer(text))
+    found = [int(marker.group(1)) for marker in markers]
+    if found != list(page_nums):
+        raise AIClientException(f"Batched reply has page markers {found}, expected {list(page_nums)}")
+
+    pages = {}
+    for marker, following in zip(markers, markers[1:] + [None]):
+        end = following.start() if following else len(text)
+        pages[int(marker.group(1))] = text[marker.end():end].strip()
+    return pages
@@ -1,16 +1,22 @@
 import json
 import asyncio
-from flask import Blueprint, request, Response, jsonify, stream_with_context
+from contextlib import nullcontext
+from flask import Blueprint, request, Response, current_app, jsonify, stream_with_context
 from werkzeug.utils import secure_filename
 import tempfile
 import os
 
-from ...application.use_cases.convert_image import ConvertImageUseCase
+from ...application.use_cases.convert_image import ConvertImageUseCase, describe_image_preset
 from ...infrastructure.adapters.azure_openai_adapter import AzureOpenAIAdapter
 from ...infrastructure.adapters.file_storage_adapter import FileStorageAdapter
 from ...domain.models.conversion_request import AIConversionRequest
 from ...domain.services.markdown_enhancer import MarkdownEnhancerService
 from .....shared.infrastructure.utils.file_utils import allowed_file, get_file_extension, is_image_file
+from .....shared.web.common.markdown_stream import MarkdownStream, RESULT_PAYLOAD_ERROR, RESULT_PAYLOADS
+from .....shared.web.common.event_pump import KEEPALIVE, KEEPALIVE_EVENT, cancel_on_disconnect, pump_events
+from .....shared.infrastructure.utils.cancellation import CancellationToken, current_cancellation
+from .....shared.infrastructure.monitoring.metrics import track_stage
+from .....shared.infrastructure.monitoring.stage_timer import current_timings
 
 
 image_conversion_bp = Blueprint('image_conversion', __name__)
@@ -23,6 +29,8 @@ def create_sse_response(data, event_type="message"):
 @image_conversion_bp.route('/convert-image/stream', methods=['POST'])
 def convert_image_stream():
     def generate():
+        token = current_cancellation() or CancellationToken()
+        stage = 'upload'
         try:
             # Send initial connection event
             yield create_sse_response({
@@ -60,6 +68,19 @@ def convert_image_stream():
             api_version = request.form.get('api_version', '2024-02-01')
             deployment_name = request.form.get('deployment_name')
             enhance_markdown = request.form.get('enhance_markdown', 'false').lower() == 'true'
+            result_payload = request.form.get('result_payload', 'full').lower()
+            ocr = request.form.get('ocr', str(current_app.container.settings.ocr_enabled)).lower() == 'true'
+
+            try:
+                preset = _preset_field()
+            except ValueError as e:
+                yield create_sse_response({
+                    "status": "error",
+                    "message": f"Invalid preset: {str(e)}"
+                }, "error")
+                return
+            # An explicit deployment_name wins over the preset's
+            deployment_name = deployment_name or (preset.deployment if preset is not None else None)
 
             # Validate required parameters
             if not all([azure_endpoint, api_key, deployment_name]):
@@ -69,6 +90,13 @@ def convert_image_stream():
                 }, "error")
                 return
 
+            if result_payload not in RESULT_PAYLOADS:
+                yield create_sse_response({
+                    "status": "error",
+                    "message": RESULT_PAYLOAD_ERROR
+                }, "error")
+                return
+
             yield create_sse_response({
                 "status": "processing",
                 "message": "File uploaded successfully, starting conversion...",
@@ -78,7 +106,8 @@ def convert_image_stream():
             # Save uploaded file temporarily
             filename = secure_filename(file.filename)
             with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{filename}") as temp_file:
-                file.save(temp_file.name)
+                with track_stage('upload_save'):
+                    file.save(temp_file.name)
                 temp_file_path = temp_file.name
 
             try:
@@ -97,40 +126,75 @@ def convert_image_stream():
                     llm_conversion_engine=ai_client,
                     ai_client=ai_client,
                     file_storage=file_storage,
-                    markdown_enhancer=markdown_enhancer
+                    markdown_enhancer=markdown_enhancer,
+                    ocr_engine=current_app.container.ocr_adapter,
+                    page_router=current_app.container.page_router
                 )
 
-                yield create_sse_response({
-                    "status": "processing",
-                    "message": "Sending image to AI for analysis...",
-                    "step": "ai_processing"
-                }, "progress")
+                # A confident local OCR result replaces the model call
+                ocr_result = use_case.recognize_locally(temp_file_path) if ocr else None
 
-                # Create Azure client
-                azure_client = ai_client.create_client(
-                    azure_endpoint,
-                    api_key,
-                    api_version
-                )
+                if ocr_result is not None:
+                    yield create_sse_response({
+                        "status": "processing",
+                        "message": "Text recognized locally, skipping AI analysis...",
+                        "ocr_confidence": ocr_result.confidence,
+                        "step": "ocr"
+                    }, "progress")
+                    chunks = iter([ocr_result.text])
+                    analysis_stage = nullcontext()
+                else:
+                    yield create_sse_response({
+                        "status": "processing",
+                        "message": "Sending image to AI for analysis...",
+                        "step": "ai_processing"
+                    }, "progress")
+
+                    # Create Azure client
+                    azure_client = ai_client.create_client(
+                        azure_endpoint,
+                        api_key,
+                        api_version
+                    )
+                    with open(temp_file_path, 'rb') as f:
+                        image_bytes = f.read()
+                    chunks = ai_client.analyze_image_stream(
+                        image_bytes, 
+                        azure_client, 
+                        deployment_name,
+                        file_path=temp_file_path,
+                        options=preset.vision if preset is not None else None
+                    )
+                    analysis_stage = track_stage('ai_page')
 
-                # Stream AI analysis
+                # Stream AI analysis, enhancing complete lines as they arrive
                 markdown_content = ""
-                with open(temp_file_path, 'rb') as f:
-                    image_bytes = f.read()
+                markdown_stream = MarkdownStream(markdown_enhancer if enhance_markdown else None)
+                emit_markdown_chunks = enhance_markdown or result_payload == 'checksum'
                 
-                for chunk in ai_client.analyze_image_stream(
-                    image_bytes, 
-                    azure_client, 
-                    deployment_name,
-                    file_path=temp_file_path
-                ):
-                    markdown_content += chunk
-                    # Send streaming chunk
-                    yield create_sse_response({
-                        "status": "streaming",
-                        "message": "AI analyzing...",
-                        "chunk": chunk
-                    }, "ai_chunk")
+                stage = 'analysis'
+                chunks = pump_events(chunks, token, current_app.container.settings.sse_keepalive_seconds)
+                with analysis_stage:
+                    for chunk in chunks:
+                        if chunk is KEEPALIVE:
+                            yield KEEPALIVE_EVENT
+                            continue
+                        markdown_content += chunk
+                        # Send streaming chunk
+                        yield create_sse_response({
+                            "status": "streaming",
+                            "message": "AI analyzing...",
+                            "route": "vision" if ocr_result is None else "ocr",
+                            "chunk": chunk
+                        }, "ai_chunk")
+
+                        delta = markdown_stream.push(chunk)
+                        if emit_markdown_chunks and delta:
+                            yield _markdown_chunk_event(delta)
+
+                delta = markdown_stream.finish()
+                if emit_markdown_chunks and delta:
+                    yield _markdown_chunk_event(delta)
 
                 yield create_sse_response({
                     "status": "processing",
@@ -138,41 +202,43 @@ def convert_image_stream():
                     "step": "post_processing"
                 }, "progress")
 
-                # Apply markdown enhancement if requested
-                if enhance_markdown:
-                    markdown_content = markdown_enhancer.enhance_markdown_structure(
-                        markdown_content, filename
-                    )
-
                 # Create result object
                 result = type('Result', (), {
                     'success': True,
-                    'markdown': markdown_content,
+                    'markdown': markdown_stream.markdown,
                     'original_markdown': markdown_content,
                     'title': None,
                     'metadata': {
                         'original_filename': filename,
-                        'converted_size': len(markdown_content),
+                        'converted_size': markdown_stream.size,
                         'original_size': len(markdown_content),
+                        'markdown_sha256': markdown_stream.sha256,
+                        'result_payload': result_payload,
                         'enhanced': enhance_markdown,
-                        'llm_used': True,
-                        'llm_model': deployment_name,
-                        'azure_endpoint': azure_endpoint
+                        'llm_used': ocr_result is None,
+                        'llm_model': deployment_name if ocr_result is None else None,
+                        'azure_endpoint': azure_endpoint,
+                        'route': 'vision' if ocr_result is None else 'ocr',
+                        'ocr_confidence': ocr_result.confidence if ocr_result is not None else None,
+                        'preset': describe_image_preset(preset),
+                        'timings': current_timings()
                     }
                 })()
 
                 if result.success:
+                    result_data = {
+                        "title": result.title,
+                        "metadata": result.metadata
+                    }
+                    if result_payload == 'full':
+                        result_data["markdown"] = result.markdown
+                        result_data["original_markdown"] = result.original_markdown
 
                     # Send completion event
                     yield create_sse_response({
                         "status": "completed",
                         "message": "Conversion completed successfully",
-                        "result": {
-                            "markdown": result.markdown,
-                            "original_markdown": result.original_markdown,
-                            "title": result.title,
-                            "metadata": result.metadata
-                        }
+                        "result": result_data
                     }, "result")
                 else:
                     yield create_sse_response({
@@ -185,6 +251,11 @@ def convert_image_stream():
                 if os.path.exists(temp_file_path):
                     os.unlink(temp_file_path)
 
+        except GeneratorExit:
+            # The server closes the response when writing to a disconnected client fails
+            cancel_on_disconnect(token, '/convert-image/stream', stage)
+            raise
+
         except Exception as e:
             yield create_sse_response({
                 "status": "error",
@@ -203,6 +274,24 @@ def convert_image_stream():
     )
 
 
+def _preset_field():
+    """The ConversionPreset named by the preset form field; None without one"""
+    name = request.form.get('preset', '').strip()
+    if not name:
+        return None
+    presets = current_app.container.presets
+    if name not in presets:
+        raise ValueError(f"preset must be one of {', '.join(presets)}, got {name!r}")
+    return presets[name]
+
+
+def _markdown_chunk_event(delta: str) -> str:
+    return create_sse_response({
+        "status": "streaming",
+        "delta": delta
+    }, "markdown_chunk")
+
+
 @image_conversion_bp.route('/convert-image', methods=['POST'])
 def convert_image():
     """Traditional REST endpoint for image conversion"""
@@ -227,6 +316,14 @@ def convert_image():
         api_version = request.form.get('api_version', '2024-02-01')
         deployment_name = request.form.get('deployment_name')
         enhance_markdown = request.form.get('enhance_markdown', 'false').lower() == 'true'
+        ocr = request.form.get('ocr', str(current_app.container.settings.ocr_enabled)).lower() == 'true'
+
+        try:
+            preset = _preset_field()
+        except ValueError as e:
+            return jsonify({'error': 'Invalid preset', 'message': str(e)}), 400
+        # An explicit deployment_name wins over the preset's
+        deployment_name = deployment_name or (preset.deployment if preset is not None else None)
 
         # Validate required parameters
         if not all([azure_endpoint, api_key, deployment_name]):
@@ -237,7 +334,8 @@ def convert_image():
         # Save uploaded file temporarily
         filename = secure_filename(file.filename)
         with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{filename}") as temp_file:
-            file.save(temp_file.name)
+            with track_stage('upload_save'):
+                file.save(temp_file.name)
             temp_file_path = temp_file.name
 
         try:
@@ -250,7 +348,9 @@ def convert_image():
                 llm_conversion_engine=ai_client,
                 ai_client=ai_client,
                 file_storage=file_storage,
-                markdown_enhancer=markdown_enhancer
+                markdown_enhancer=markdown_enhancer,
+                ocr_engine=current_app.container.ocr_adapter,
+                page_router=current_app.container.page_router
             )
 
             # Create request object
@@ -261,7 +361,9 @@ def convert_image():
                 api_key=api_key,
                 api_version=api_version,
                 deployment_name=deployment_name,
-                enhance_markdown=enhance_markdown
+                enhance_markdown=enhance_markdown,
+                ocr=ocr,
+                preset=preset
             )
 
             # Execute conversion
@@ -0,0 +1,90 @@
+import hmac
+import json
+from flask import Blueprint, Response, current_app, request
+from .....shared.infrastructure.monitoring.memory_tracker import memory_tracker
+from .....shared.infrastructure.utils.process_utils import get_memory_usage
+
+
+memory_debug_bp = Blueprint('memory_debug', __name__, url_prefix='/debug/memory')
+
+GROUP_BY_OPTIONS = ('lineno', 'filename', 'traceback')
+
+
+@memory_debug_bp.before_request
+def require_debug_token():
+    debug_token = current_app.container.settings.debug_token
+    # Without a configured token the debug surface does not exist
+    if not debug_token:
+        return _json_response({'error': 'Endpoint not found'}, 404)
+    
+    token = request.headers.get('X-Debug-Token', '')
+    if not hmac.compare_digest(token, debug_token):
+        return _json_response({'error': 'Forbidden', 'message': 'A valid X-Debug-Token header is required'}, 403)
+
+
+@memory_debug_bp.route('', methods=['GET'])
+def memory_status():
+    return _json_response({
+        'memory': get_memory_usage(),
+        'extensions': memory_tracker.extension_stats(),
+        'tracemalloc': memory_tracker.tracing_status()
+    })
+
+
+@memory_debug_bp.route('/tracemalloc/start', methods=['POST'])
+def start_tracemalloc():
+    try:
+        conversions = int(request.values.get('conversions', 100))
+        frames = int(request.values.get('frames', 5))
+    except ValueError:
+        return _json_response({'error': 'Invalid parameters', 'message': 'conversions and frames must be integers'}, 400)
+    
+    if conversions < 1 or frames < 1:
+        return _json_response({'error': 'Invalid parameters', 'message': 'conversions and frames must be positive'}, 400)
+    
+    if not memory_tracker.start_tracing(conversions, frames):
+        return _json_response({'error': 'Already tracing', 'tracemalloc': memory_tracker.tracing_status()}, 409)
+    
+    return _json_response({'tracemalloc': memory_tracker.tracing_status()})
+
+
+@memory_debug_bp.route('/tracemalloc/report', methods=['GET'])
+def tracemalloc_report():
+    return _allocation_report_response()
+
+
+@memory_debug_bp.route('/tracemalloc/stop', methods=['POST'])
+def stop_tracemalloc():
+    response = _allocation_report_response()
+    if response.status_code == 200:
+        memory_tracker.stop_tracing()
+    return response
+
+
+def _allocation_report_response():
+    group_by = request.values.get('group_by', 'lineno')
+    if group_by not in GROUP_BY_OPTIONS:
+        return _json_response({'error': 'Invalid group_by', 'message': f'Must be one of: {", ".join(GROUP_BY_OPTIONS)}'}, 400)
+    
+    try:
+        limit = int(request.values.get('limit', 20))
+    except ValueError:
+        return _json_response({'error': 'Invalid parameters', 'message': 'limit must be an integer'}, 400)
+    
+    if limit < 1:
+        return _json_response({'error': 'Invalid parameters', 'message': 'limit must be positive'}, 400)
+    
+    status = memory_tracker.tracing_status()
+    top_allocations = memory_tracker.allocation_report(limit, group_by)
+    if top_allocations is None:
+        return _json_response({'error': 'Not tracing', 'message': 'Start tracemalloc first'}, 409)
+    
+    return _json_response({'tracemalloc': status, 'top_allocations': top_allocations})
+
+
+def _json_response(data: dict, status_code: int = 200) -> Response:
+    return Response(
+        json.dumps(data, ensure_ascii=False, indent=2),
+        mimetype='application/json; charset=utf-8',
+        status=status_code
+    )
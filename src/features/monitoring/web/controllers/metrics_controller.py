@@ -0,0 +1,11 @@
+from flask import Blueprint, Response
+from .....shared.infrastructure.monitoring.metrics import render_metrics
+
+
+monitoring_bp = Blueprint('monitoring', __name__)
+
+
+@monitoring_bp.route('/metrics', methods=['GET'])
+def metrics():
+    data, content_type = render_metrics()
+    return Response(data, headers={'Content-Type': content_type})
@@ -0,0 +1,87 @@
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, Dict, Optional, Union
+
+DPI_AUTO = 'auto'
+IMAGE_FORMATS = ('png', 'jpeg')
+DETAIL_LEVELS = ('low', 'high', 'auto')
+MAX_PAGE_CONCURRENCY = 16
+
+
+@dataclass(frozen=True)
+class VisionOptions:
+    """How an image is put to the vision model"""
+    # Image detail level of the chat completions API; 'low' costs a fixed, small number of tokens
+    detail: str = 'high'
+    max_tokens: int = 2000
+
+
+@dataclass(frozen=True)
+class ImageEncoding:
+    """Format rendered pages are sent to the model in"""
+    format: str = 'png'
+    # JPEG only
+    quality: int = 85
+
+
+@dataclass(frozen=True)
+class ConversionPreset:
+    """Named bundle of the settings that trade AI conversion speed against quality"""
+    name: str
+    # Render DPI of document pages, or 'auto' to choose one per page
+    dpi: Union[int, str] = 200
+    image_format: str = 'png'
+    jpeg_quality: int = 85
+    detail: str = 'high'
+    max_tokens: int = 2000
+    # Model calls for separate pages that run at the same time
+    page_concurrency: int = 1
+    # Deployment, or with AI_ENDPOINTS the model, used when the request names none
+    deployment: Optional[str] = None
+
+    def __post_init__(self):
+        if self.dpi != DPI_AUTO and (not isinstance(self.dpi, int) or not 50 <= self.dpi <= 600):
+            raise ValueError(f"Preset {self.name}: dpi must be 'auto' or between 50 and 600")
+        if self.image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Preset {self.name}: image_format must be one of {', '.join(IMAGE_FORMATS)}")
+        if not 1 <= self.jpeg_quality <= 95:
+            raise ValueError(f"Preset {self.name}: jpeg_quality must be between 1 and 95")
+        if self.detail not in DETAIL_LEVELS:
+            raise ValueError(f"Preset {self.name}: detail must be one of {', '.join(DETAIL_LEVELS)}")
+        if self.max_tokens < 1:
+            raise ValueError(f"Preset {self.name}: max_tokens must be positive")
+        if not 1 <= self.page_concurrency <= MAX_PAGE_CONCURRENCY:
+            raise ValueError(f"Preset {self.name}: page_concurrency must be between 1 and {MAX_PAGE_CONCURRENCY}")
+
+    @property
+    def encoding(self) -> ImageEncoding:
+        return ImageEncoding(self.image_format, self.jpeg_quality)
+
+    @property
+    def vision(self) -> VisionOptions:
+        return VisionOptions(self.detail, self.max_tokens)
+
+    def with_values(self, values: Dict[str, Any]) -> 'ConversionPreset':
+        """This preset with the given settings changed; unknown settings raise ValueError"""
+        known = {f.name for f in fields(self)} - {'name'}
+        unknown = set(values) - known
+        if unknown:
+            raise ValueError(f"Preset {self.name}: unknown settings {', '.join(sorted(unknown))}")
+        return replace(self, **values)
+
+    def describe(self) -> dict:
+        return asdict(self)
+
+
+DEFAULT_PRESETS: Dict[str, ConversionPreset] = {
+    preset.name: preset for preset in (
+        ConversionPreset(
+            'fast', dpi=100, image_format='jpeg', jpeg_quality=70, detail='low', max_tokens=1000, page_concurrency=4
+        ),
+        ConversionPreset(
+            'balanced', dpi=DPI_AUTO, image_format='jpeg', jpeg_quality=85, detail='high', max_tokens=2000, page_concurrency=2
+        ),
+        ConversionPreset(
+            'accurate', dpi=200, image_format='png', detail='high', max_tokens=4096, page_concurrency=1
+        ),
+    )
+}
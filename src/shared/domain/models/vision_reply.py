@@ -0,0 +1,40 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+_current_reply: ContextVar[Optional['VisionReply']] = ContextVar('vision_reply', default=None)
+
+FINISH_LENGTH = 'length'
+
+
+@dataclass
+class VisionReply:
+    """What a vision call reported about its answer besides the text"""
+    # 'stop', or 'length' when the answer was cut off at max_tokens
+    finish_reason: Optional[str] = None
+
+    @property
+    def truncated(self) -> bool:
+        return self.finish_reason == FINISH_LENGTH
+
+
+@contextmanager
+def capture_reply() -> Iterator[VisionReply]:
+    """Collect what the vision calls made inside the block report about their answers.
+
+    Like the request's cancellation token, the reply is found through the
+    context, so calls made on threads started with a copy of it report here too.
+    """
+    reply = VisionReply()
+    token = _current_reply.set(reply)
+    try:
+        yield reply
+    finally:
+        _current_reply.reset(token)
+
+
+def record_finish_reason(finish_reason: Optional[str]) -> None:
+    reply = _current_reply.get()
+    if reply is not None and finish_reason:
+        reply.finish_reason = finish_reason
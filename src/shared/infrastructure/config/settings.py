@@ -1,4 +1,9 @@
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() == 'true'
 
 
 @dataclass
@@ -7,4 +12,76 @@ class AppSettings:
     port: int = 5001
     debug: bool = True
     max_content_length: int = 100 * 1024 * 1024  # 100MB
-    json_as_ascii: bool = False
\ No newline at end of file
+    json_as_ascii: bool = False
+    # Import and exercise every converter backend while creating the app, so that
+    # gunicorn workers forked from a preloaded master share them copy-on-write
+    warmup_converters: bool = field(default_factory=lambda: _env_flag('WARMUP_CONVERTERS', False))
+    # Comma-separated extensions /convert accepts (e.g. ".pdf,.docx"); when set only
+    # those converters are registered. Empty means every supported format.
+    converter_allowlist: str = field(default_factory=lambda: os.getenv('CONVERTER_ALLOWLIST', ''))
+    # /convert results are kept by content hash in CONVERT_CACHE_DIR, shared by all workers,
+    # so /convert/lookup can answer repeats without an upload; off (0 entries) unless set
+    convert_cache_dir: str = field(default_factory=lambda: os.getenv('CONVERT_CACHE_DIR', '/tmp/markitdown-convert-cache'))
+    convert_cache_max_entries: int = field(default_factory=lambda: int(os.getenv('CONVERT_CACHE_MAX_ENTRIES', '0')))
+    # Requests slower than this are logged with their full stage breakdown; 0 disables the log
+    slow_request_threshold_ms: int = field(default_factory=lambda: int(os.getenv('SLOW_REQUEST_THRESHOLD_MS', '30000')))
+    # Request profiling: a request carrying this token in X-Profile-Token, or a
+    # PROFILE_SAMPLE_RATE fraction of requests, is run under cProfile and saved to profile_dir
+    profile_token: str = field(default_factory=lambda: os.getenv('PROFILE_TOKEN', ''))
+    profile_sample_rate: float = field(default_factory=lambda: float(os.getenv('PROFILE_SAMPLE_RATE', '0')))
+    profile_dir: str = field(default_factory=lambda: os.getenv('PROFILE_DIR', '/tmp/markitdown-profiles'))
+    # Enables the /debug/memory endpoints for requests carrying it in X-Debug-Token
+    debug_token: str = field(default_factory=lambda: os.getenv('DEBUG_TOKEN', ''))
+    # Default page routing of /convert_with_ai: 'vision' sends every page to the model,
+    # 'hybrid' keeps the PDF text layer of pages that need no vision analysis
+    page_routing: str = field(default_factory=lambda: os.getenv('AI_PAGE_ROUTING', 'vision'))
+    # Local tesseract OCR in front of the vision model: default of the "ocr" form field,
+    # languages, parallel tesseract processes (0 = CPU count) and the mean word
+    # confidence (0-100) a page needs to skip the model
+    ocr_enabled: bool = field(default_factory=lambda: _env_flag('OCR_ENABLED', False))
+    ocr_languages: str = field(default_factory=lambda: os.getenv('OCR_LANGUAGES', 'eng+kor'))
+    ocr_workers: int = field(default_factory=lambda: int(os.getenv('OCR_WORKERS', '0')))
+    ocr_min_confidence: float = field(default_factory=lambda: float(os.getenv('OCR_MIN_CONFIDENCE', '80')))
+    # Default of the "page_filter" form field: skip blank pages and reuse the analysis
+    # of near-duplicate pages in AI conversions
+    page_filter_enabled: bool = field(default_factory=lambda: _env_flag('PAGE_FILTER_ENABLED', False))
+    # Default of the "batch_pages" form field: pack sparse pages into multi-image requests
+    batch_pages_enabled: bool = field(default_factory=lambda: _env_flag('BATCH_SPARSE_PAGES', False))
+    # Pixel budget, in megapixels, of all pages of a document rendered with dpi=auto
+    adaptive_dpi_megapixels: float = field(default_factory=lambda: float(os.getenv('ADAPTIVE_DPI_MEGAPIXELS', '150')))
+    # Changes to the "preset" bundles of AI conversion settings, and additional presets: a
+    # JSON object of {name: {dpi, image_format, jpeg_quality, detail, max_tokens,
+    # page_concurrency, deployment}}, or the path of a file holding it
+    ai_presets: str = field(default_factory=lambda: os.getenv('AI_PRESETS', ''))
+    # Cascade mode of AI conversions: pages go to AI_CASCADE_DEPLOYMENT (a small or mini
+    # deployment) first and only weak answers are re-run on the requested deployment.
+    # AI_CASCADE is the default of the "cascade" form field
+    ai_cascade: bool = field(default_factory=lambda: _env_flag('AI_CASCADE', False))
+    ai_cascade_deployment: str = field(default_factory=lambda: os.getenv('AI_CASCADE_DEPLOYMENT', ''))
+    # Deferred AI conversions (mode=deferred) go to the Azure OpenAI batch API: jobs are
+    # kept as JSON files in AI_BATCH_JOB_DIR, shared by all workers, and their batches
+    # are checked every AI_BATCH_POLL_SECONDS
+    ai_batch_job_dir: str = field(default_factory=lambda: os.getenv('AI_BATCH_JOB_DIR', '/tmp/markitdown-ai-jobs'))
+    ai_batch_poll_seconds: float = field(default_factory=lambda: float(os.getenv('AI_BATCH_POLL_SECONDS', '60')))
+    ai_batch_api_version: str = field(default_factory=lambda: os.getenv('AI_BATCH_API_VERSION', '2024-10-21'))
+    # Azure OpenAI backends that AI conversions without their own azure_endpoint are balanced
+    # over: a JSON list of {name, endpoint, deployment, model, api_key | api_key_env,
+    # api_version, weight}, or the path of a file holding it
+    ai_endpoints: str = field(default_factory=lambda: os.getenv('AI_ENDPOINTS', ''))
+    # Backends one AI call may try before failing, consecutive failures that open a
+    # backend's circuit breaker, and how long it stays open before a probe call
+    ai_max_attempts: int = field(default_factory=lambda: int(os.getenv('AI_MAX_ATTEMPTS', '3')))
+    ai_breaker_failures: int = field(default_factory=lambda: int(os.getenv('AI_BREAKER_FAILURES', '5')))
+    ai_breaker_open_seconds: float = field(default_factory=lambda: float(os.getenv('AI_BREAKER_OPEN_SECONDS', '30')))
+    # Hedged AI page calls: a call still waiting for its first chunk past this percentile
+    # of the deployment's recent times to first chunk gets a duplicate request, with
+    # hedges capped at AI_HEDGE_MAX_RATE of all calls
+    ai_hedging: bool = field(default_factory=lambda: _env_flag('AI_HEDGING', False))
+    ai_hedge_percentile: float = field(default_factory=lambda: float(os.getenv('AI_HEDGE_PERCENTILE', '95')))
+    ai_hedge_max_rate: float = field(default_factory=lambda: float(os.getenv('AI_HEDGE_MAX_RATE', '0.1')))
+    # Seconds of silence after which an SSE conversion writes a keepalive comment, which
+    # is also how a client that went away is noticed while a step blocks
+    sse_keepalive_seconds: float = field(default_factory=lambda: float(os.getenv('SSE_KEEPALIVE_SECONDS', '5')))
+    # Time budget of conversion requests, 0 for none; callers can only shorten it with the
+    # X-Request-Deadline header or "deadline" form field (gunicorn.conf.py sets it below its timeout)
+    request_deadline_seconds: float = field(default_factory=lambda: float(os.getenv('REQUEST_DEADLINE_SECONDS', '0')))
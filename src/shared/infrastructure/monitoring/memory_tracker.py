@@ -0,0 +1,127 @@
+import os
+import threading
+import tracemalloc
+from typing import Dict, List, Optional
+from .metrics import REQUEST_RSS_GROWTH
+
+# Allocations made by the tracer itself or by the import machinery say nothing about leaks
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>')
+)
+
+
+class MemoryTracker:
+    """Per-worker view of where conversion memory goes.
+
+    Every conversion request records how much RSS it left behind and how far it
+    raised the worker's peak RSS, grouped by file extension. On demand,
+    tracemalloc can be started with a baseline snapshot that is compared to a
+    second snapshot taken automatically after N more conversions.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._extensions: Dict[str, dict] = {}
+        self._conversions = 0
+        self._baseline = None
+        self._baseline_conversions = 0
+        self._target_conversions = 0
+        self._final_snapshot = None
+    
+    def record_request(self, extension: str, rss_before: int, rss_after: int, peak_before: int, peak_after: int) -> None:
+        rss_growth = rss_after - rss_before
+        peak_growth = max(0, peak_after - peak_before)
+        REQUEST_RSS_GROWTH.labels(extension=extension).observe(max(0, rss_growth))
+        
+        with self._lock:
+            stats = self._extensions.setdefault(extension, {
+                'requests': 0,
+                'rss_growth_total': 0,
+                'rss_growth_max': 0,
+                'peak_growth_total': 0,
+                'peak_growth_max': 0
+            })
+            stats['requests'] += 1
+            stats['rss_growth_total'] += rss_growth
+            stats['rss_growth_max'] = max(stats['rss_growth_max'], rss_growth)
+            stats['peak_growth_total'] += peak_growth
+            stats['peak_growth_max'] = max(stats['peak_growth_max'], peak_growth)
+            
+            self._conversions += 1
+            take_final_snapshot = (
+                self._baseline is not None
+                and self._final_snapshot is None
+                and self._conversions - self._baseline_conversions >= self._target_conversions
+            )
+        
+        if take_final_snapshot:
+            snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            with self._lock:
+                self._final_snapshot = snapshot
+    
+    def extension_stats(self) -> Dict[str, dict]:
+        with self._lock:
+            stats = {extension: dict(values) for extension, values in self._extensions.items()}
+        for values in stats.values():
+            values['rss_growth_avg'] = values['rss_growth_total'] // values['requests']
+            values['peak_growth_avg'] = values['peak_growth_total'] // values['requests']
+        return dict(sorted(stats.items(), key=lambda item: item[1]['rss_growth_total'], reverse=True))
+    
+    def start_tracing(self, conversions: int, frames: int) -> bool:
+        if tracemalloc.is_tracing():
+            return False
+        
+        tracemalloc.start(frames)
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        with self._lock:
+            self._baseline = snapshot
+            self._baseline_conversions = self._conversions
+            self._target_conversions = conversions
+            self._final_snapshot = None
+        return True
+    
+    def stop_tracing(self) -> None:
+        with self._lock:
+            self._baseline = None
+            self._final_snapshot = None
+        tracemalloc.stop()
+    
+    def tracing_status(self) -> dict:
+        with self._lock:
+            status = {
+                'tracing': tracemalloc.is_tracing(),
+                'pid': os.getpid(),
+                'conversions_since_baseline': self._conversions - self._baseline_conversions if self._baseline else 0,
+                'target_conversions': self._target_conversions if self._baseline else 0,
+                'complete': self._final_snapshot is not None
+            }
+        if status['tracing']:
+            current, peak = tracemalloc.get_traced_memory()
+            status['traced_memory'] = {'current': current, 'peak': peak}
+        return status
+    
+    def allocation_report(self, limit: int = 20, group_by: str = 'lineno') -> Optional[List[dict]]:
+        with self._lock:
+            baseline, final_snapshot = self._baseline, self._final_snapshot
+        if baseline is None:
+            return None
+        
+        # Until the target is reached the diff runs against the current state
+        snapshot = final_snapshot or tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        
+        return [
+            {
+                'size_diff': stat.size_diff,
+                'count_diff': stat.count_diff,
+                'size': stat.size,
+                'count': stat.count,
+                'traceback': [f'{frame.filename}:{frame.lineno}' for frame in stat.traceback]
+            }
+            for stat in snapshot.compare_to(baseline, group_by)[:limit]
+        ]
+
+
+memory_tracker = MemoryTracker()
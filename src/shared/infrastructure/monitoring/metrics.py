@@ -0,0 +1,174 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from .stage_timer import current_timer
+
+# Stages run from milliseconds (enhancement) to minutes (LibreOffice, large models)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+STAGE_DURATION = Histogram(
+    'markitdown_stage_duration_seconds',
+    'Time spent in each conversion pipeline stage',
+    ['stage'],
+    buckets=LATENCY_BUCKETS
+)
+
+REQUEST_DURATION = Histogram(
+    'markitdown_request_duration_seconds',
+    'End-to-end request time, including streamed responses',
+    ['endpoint', 'status'],
+    buckets=LATENCY_BUCKETS
+)
+
+REQUESTS_IN_FLIGHT = Gauge(
+    'markitdown_requests_in_flight',
+    'Requests currently being handled',
+    ['endpoint'],
+    multiprocess_mode='livesum'
+)
+
+AI_LATENCY = Histogram(
+    'markitdown_ai_latency_seconds',
+    'Azure OpenAI latency until the first streamed token and until the full response',
+    ['deployment', 'phase'],
+    buckets=LATENCY_BUCKETS
+)
+
+AI_TOKENS = Counter(
+    'markitdown_ai_tokens_total',
+    'Tokens reported by Azure OpenAI usage',
+    ['deployment', 'kind']
+)
+
+AI_BACKEND_CALLS = Counter(
+    'markitdown_ai_backend_calls_total',
+    'Calls routed to each configured AI backend, by outcome',
+    ['backend', 'outcome']
+)
+
+AI_FAILOVERS = Counter(
+    'markitdown_ai_failovers_total',
+    'AI calls moved to another backend after a 429, 5xx or connection error, by the backend they moved to',
+    ['backend']
+)
+
+AI_HEDGES = Counter(
+    'markitdown_ai_hedges_total',
+    'Slow AI calls that got a hedged duplicate (won/lost) or were denied one by the rate cap (skipped)',
+    ['outcome']
+)
+
+AI_CASCADE_PAGES = Counter(
+    'markitdown_ai_cascade_pages_total',
+    'Pages analyzed by the small deployment in cascade mode, by whether its answer was kept or escalated',
+    ['outcome']
+)
+
+AI_CASCADE_ESCALATIONS = Counter(
+    'markitdown_ai_cascade_escalations_total',
+    'Weaknesses that sent cascade pages to the large deployment; a page can show several',
+    ['reason']
+)
+
+AI_BATCH_JOBS = Counter(
+    'markitdown_ai_batch_jobs_total',
+    'Deferred AI conversions submitted to the batch API and how they ended',
+    ['status']
+)
+
+AI_BACKEND_CIRCUIT_OPEN = Gauge(
+    'markitdown_ai_backend_circuit_open',
+    'Whether the circuit breaker of an AI backend is open',
+    ['backend'],
+    multiprocess_mode='max'
+)
+
+CANCELLATIONS = Counter(
+    'markitdown_cancellations_total',
+    'Streaming conversions cancelled because the client disconnected, by the stage they were in',
+    ['endpoint', 'stage']
+)
+
+PAGES_PROCESSED = Counter(
+    'markitdown_pages_total',
+    'Document pages analyzed by AI conversions',
+    ['status']
+)
+
+CONVERT_CACHE = Counter(
+    'markitdown_convert_cache_total',
+    '/convert results looked up in the result cache (hit/miss), or not resent because the client had them (not_modified)',
+    ['outcome']
+)
+
+PAGE_ROUTES = Counter(
+    'markitdown_page_routes_total',
+    'Document pages converted, by how their content was obtained',
+    ['route']
+)
+
+# Resident memory a conversion left behind, from a few KB up to whole page renders
+RSS_GROWTH_BUCKETS = tuple(2 ** n * 1024 * 1024 for n in range(-4, 12))
+
+REQUEST_RSS_GROWTH = Histogram(
+    'markitdown_request_rss_growth_bytes',
+    'Worker RSS growth retained after a conversion request',
+    ['extension'],
+    buckets=RSS_GROWTH_BUCKETS
+)
+
+WORKER_RECYCLES = Counter(
+    'markitdown_worker_recycles_total',
+    'Gunicorn workers restarted by the memory watchdog',
+    ['reason']
+)
+
+ERRORS = Counter(
+    'markitdown_errors_total',
+    'Errors by pipeline stage and exception type',
+    ['stage', 'error_type']
+)
+
+
+@contextmanager
+def track_stage(stage: str, **attributes):
+    """Time a pipeline stage; attributes only annotate the request's timing span"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        record_error(stage, e)
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        STAGE_DURATION.labels(stage=stage).observe(duration)
+        timer = current_timer()
+        if timer is not None:
+            timer.add_span(stage, duration, **attributes)
+
+
+def record_error(stage: str, error: Exception) -> None:
+    ERRORS.labels(stage=stage, error_type=type(error).__name__).inc()
+
+
+def record_ai_usage(deployment: str, usage) -> None:
+    if usage is None:
+        return
+    AI_TOKENS.labels(deployment=deployment, kind='prompt').inc(getattr(usage, 'prompt_tokens', 0) or 0)
+    AI_TOKENS.labels(deployment=deployment, kind='completion').inc(getattr(usage, 'completion_tokens', 0) or 0)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    # Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR,
+    # so whichever worker serves the scrape has to aggregate all of them
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
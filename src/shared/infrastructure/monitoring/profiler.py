@@ -0,0 +1,127 @@
+import cProfile
+import functools
+import json
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# cProfile hooks the interpreter's profiling callback, so concurrent request
+# threads in one worker must not profile at the same time
+_profiling_lock = threading.Lock()
+
+# How long stop() waits for threads still profiling into the request, e.g. an
+# event pump that has sent its last event but not yet returned
+THREAD_PROFILE_WAIT_SECONDS = 2.0
+
+_current_profiler: ContextVar[Optional['RequestProfiler']] = ContextVar('request_profiler', default=None)
+
+
+class RequestProfiler:
+    """Runs one request under cProfile and saves it as a pstats file.
+
+    Each profile is written as <id>.prof (load it with pstats, snakeviz or
+    speedscope) next to <id>.json holding the tags describing the request.
+    cProfile only sees the thread it was enabled on, so work the request hands
+    to other threads (a streamed response's event pump, page calls run side by
+    side) is profiled through profiled() and merged into the same file.
+    """
+    
+    def __init__(self, output_dir: str, trigger: str):
+        self.profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self._output_dir = output_dir
+        self._trigger = trigger
+        self._profile = cProfile.Profile()
+        self._thread_profiles: List[cProfile.Profile] = []
+        self._threads_done = threading.Condition()
+        self._threads_running = 0
+        self._context_token = None
+        self._started = None
+    
+    @classmethod
+    def start(cls, output_dir: str, trigger: str) -> Optional['RequestProfiler']:
+        if not _profiling_lock.acquire(blocking=False):
+            logger.info("Skipping request profile, another request is being profiled")
+            return None
+        
+        profiler = cls(output_dir, trigger)
+        profiler._started = time.perf_counter()
+        profiler._context_token = _current_profiler.set(profiler)
+        profiler._profile.enable()
+        return profiler
+    
+    def stop(self, tags: dict) -> Optional[str]:
+        try:
+            self._profile.disable()
+            with self._threads_done:
+                self._threads_done.wait_for(lambda: self._threads_running == 0, THREAD_PROFILE_WAIT_SECONDS)
+        finally:
+            try:
+                _current_profiler.reset(self._context_token)
+            except ValueError:
+                # Stopped in another context than the one it started in
+                _current_profiler.set(None)
+            _profiling_lock.release()
+        
+        duration_ms = round((time.perf_counter() - self._started) * 1000, 1)
+        try:
+            os.makedirs(self._output_dir, exist_ok=True)
+            extension = re.sub(r'[^a-z0-9]', '', (tags.get('extension') or '').lower()) or 'none'
+            base_path = os.path.join(self._output_dir, f"{self.profile_id}_{extension}")
+            
+            self._stats().dump_stats(f"{base_path}.prof")
+            with open(f"{base_path}.json", 'w', encoding='utf-8') as f:
+                json.dump({
+                    'profile_id': self.profile_id,
+                    'trigger': self._trigger,
+                    'duration_ms': duration_ms,
+                    'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                    'pid': os.getpid(),
+                    **tags
+                }, f, ensure_ascii=False, indent=2)
+            
+            logger.info(f"Saved request profile {base_path}.prof ({duration_ms:.1f} ms, trigger={self._trigger})")
+            return f"{base_path}.prof"
+        except OSError as e:
+            logger.warning(f"Could not save request profile {self.profile_id}: {str(e)}")
+            return None
+    
+    def run_in_thread(self, fn: Callable, *args, **kwargs):
+        with self._threads_done:
+            self._threads_running += 1
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            with self._threads_done:
+                self._thread_profiles.append(profile)
+                self._threads_running -= 1
+                self._threads_done.notify_all()
+    
+    def _stats(self) -> pstats.Stats:
+        stats = pstats.Stats(self._profile)
+        # Threads still running past the wait, e.g. a losing hedged call, are left out
+        with self._threads_done:
+            for profile in self._thread_profiles:
+                stats.add(profile)
+        return stats
+
+
+def profiled(fn: Callable) -> Callable:
+    """fn, profiled into the current request's profile when it runs on another thread.
+
+    Returns fn unchanged when the current request is not being profiled.
+    """
+    profiler = _current_profiler.get()
+    if profiler is None:
+        return fn
+    return functools.partial(profiler.run_in_thread, fn)
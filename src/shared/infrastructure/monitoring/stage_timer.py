@@ -0,0 +1,63 @@
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+_current_timer: ContextVar[Optional['StageTimer']] = ContextVar('stage_timer', default=None)
+
+
+class StageTimer:
+    """Timing spans of the pipeline stages run for a single request.
+
+    While a timer is active, every stage wrapped in track_stage() is recorded on
+    it as well as in the aggregate metrics.
+    """
+    
+    def __init__(self):
+        self._started = time.perf_counter()
+        self._spans: List[dict] = []
+        self._token = None
+    
+    def activate(self) -> 'StageTimer':
+        self._token = _current_timer.set(self)
+        return self
+    
+    def deactivate(self) -> None:
+        if self._token is not None:
+            _current_timer.reset(self._token)
+            self._token = None
+    
+    def add_span(self, stage: str, duration: float, **attributes) -> None:
+        span = {'stage': stage, 'duration_ms': round(duration * 1000, 1)}
+        span.update(attributes)
+        self._spans.append(span)
+    
+    @property
+    def total_ms(self) -> float:
+        return round((time.perf_counter() - self._started) * 1000, 1)
+    
+    def stage_totals(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for span in self._spans:
+            totals[span['stage']] = round(totals.get(span['stage'], 0.0) + span['duration_ms'], 1)
+        return totals
+    
+    def as_dict(self) -> dict:
+        return {
+            'total_ms': self.total_ms,
+            'stages': self.stage_totals(),
+            'spans': list(self._spans)
+        }
+    
+    def server_timing_header(self) -> str:
+        entries = [f'{stage};dur={duration}' for stage, duration in self.stage_totals().items()]
+        entries.append(f'total;dur={self.total_ms}')
+        return ', '.join(entries)
+
+
+def current_timer() -> Optional[StageTimer]:
+    return _current_timer.get()
+
+
+def current_timings() -> Optional[dict]:
+    timer = current_timer()
+    return timer.as_dict() if timer is not None else None
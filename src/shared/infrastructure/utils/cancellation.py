@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_token: ContextVar[Optional['CancellationToken']] = ContextVar('cancellation_token', default=None)
+
+CANCEL_CLIENT_DISCONNECT = 'client_disconnect'
+CANCEL_ABANDONED = 'abandoned'
+
+
+class OperationCancelled(BaseException):
+    """Raised by work that stops because its request was cancelled.
+
+    Like asyncio.CancelledError it is not an Exception, so the many handlers
+    that turn a failed step into a fallback do not swallow it.
+    """
+
+
+class DeadlineExceeded(Exception):
+    """Raised by work that cannot finish before the request's deadline.
+
+    Unlike a cancellation the request is still answered, so this is an
+    ordinary exception: callers degrade, e.g. return the pages done so far.
+    """
+
+
+class CancellationToken:
+    """Cancellation signal and time budget shared by all work done for one request.
+
+    While a token is active, steps check it with raise_if_cancelled(), and
+    work that blocks in between, like a subprocess, registers a callback with
+    on_cancel() that stops it the moment cancel() is called. Blocking calls
+    bound their waits with timeout(), so they end by the deadline.
+    """
+
+    def __init__(self, deadline: Optional[float] = None):
+        # On the time.monotonic() clock
+        self.deadline = deadline
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: Dict[int, Callable[[], None]] = {}
+        self._next_key = 0
+        self._token = None
+        self.reason: Optional[str] = None
+
+    def activate(self) -> 'CancellationToken':
+        self._token = _current_token.set(self)
+        return self
+
+    def deactivate(self) -> None:
+        if self._token is not None:
+            _current_token.reset(self._token)
+            self._token = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left until the deadline; None without one"""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def timeout(self, timeout: Optional[float] = None) -> Optional[float]:
+        """timeout shortened to the time left until the deadline"""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def cancel(self, reason: str = CANCEL_ABANDONED) -> bool:
+        """Cancel and run the registered callbacks; False when already cancelled"""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancellation callback failed: {str(e)}")
+        return True
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run callback on cancel, right away if already cancelled; returns a function that unregisters it"""
+        with self._lock:
+            if not self._event.is_set():
+                key = self._next_key
+                self._next_key += 1
+                self._callbacks[key] = callback
+                return lambda: self._unregister(key)
+        callback()
+        return lambda: None
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise OperationCancelled(f"Cancelled: {self.reason}")
+        if self.expired:
+            raise DeadlineExceeded("Request deadline exceeded")
+
+    def _unregister(self, key: int) -> None:
+        with self._lock:
+            self._callbacks.pop(key, None)
+
+
+def current_cancellation() -> Optional[CancellationToken]:
+    return _current_token.get()
+
+
+def raise_if_cancelled() -> None:
+    token = _current_token.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+def current_timeout(timeout: Optional[float] = None) -> Optional[float]:
+    """timeout shortened to the active request's deadline"""
+    token = _current_token.get()
+    return token.timeout(timeout) if token is not None else timeout
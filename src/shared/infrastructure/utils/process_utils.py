@@ -0,0 +1,105 @@
+import os
+import resource
+import signal
+import subprocess
+import sys
+from typing import Dict, List, Optional
+from .cancellation import CancellationToken, current_cancellation
+
+
+def get_memory_usage() -> Dict[str, int]:
+    """Memory of the current process in bytes.
+
+    On Linux this reports rss, pss (shared pages split between the processes
+    mapping them) and uss (private pages), which is what matters for workers
+    sharing the preloaded master copy-on-write. Elsewhere only peak rss is known.
+    """
+    try:
+        fields = {}
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty'):
+                    fields[key] = int(value.split()[0]) * 1024
+        return {
+            'rss': fields['Rss'],
+            'pss': fields['Pss'],
+            'uss': fields['Private_Clean'] + fields['Private_Dirty']
+        }
+    except (OSError, KeyError, ValueError):
+        return {'rss': get_peak_rss_bytes()}
+
+
+def get_current_rss_bytes() -> int:
+    # /proc/self/statm is much cheaper to read than smaps_rollup, so it can be read per request
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return get_peak_rss_bytes()
+
+
+def get_peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def format_memory_usage(usage: Dict[str, int]) -> str:
+    return ', '.join(f'{key}={value / (1024 * 1024):.1f}MB' for key, value in usage.items())
+
+
+def run_cancellable(
+    cmd: List[str],
+    input=None,
+    timeout: Optional[float] = None,
+    text: bool = False,
+    env: Optional[Dict[str, str]] = None,
+    token: Optional[CancellationToken] = None
+) -> subprocess.CompletedProcess:
+    """subprocess.run(cmd, check=True, capture_output=True) that cancelling the request kills.
+
+    token defaults to the active one. The command gets its own process group,
+    so the kill also reaches what it spawned, e.g. soffice.bin behind the
+    libreoffice launcher script. Raises OperationCancelled once killed, and
+    DeadlineExceeded when it is stopped at the token's deadline.
+    """
+    token = token or current_cancellation()
+    if token is not None:
+        token.raise_if_cancelled()
+        timeout = token.timeout(timeout)
+
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=text,
+        env=env,
+        start_new_session=True
+    )
+    unregister = token.on_cancel(lambda: _kill_group(process)) if token is not None else None
+    try:
+        stdout, stderr = process.communicate(input, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _kill_group(process)
+        process.communicate()
+        if token is not None:
+            token.raise_if_cancelled()
+        raise
+    finally:
+        if unregister is not None:
+            unregister()
+
+    if token is not None:
+        token.raise_if_cancelled()
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+
+def _kill_group(process: subprocess.Popen) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
@@ -0,0 +1,36 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+from .process_utils import get_memory_usage, format_memory_usage
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """Collects per-phase timings while the application is being created"""
+    
+    def __init__(self):
+        self._started = time.perf_counter()
+        self._phases: List[Tuple[str, float]] = []
+    
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phases.append((name, time.perf_counter() - start))
+    
+    def as_dict(self) -> dict:
+        return {
+            'phases_ms': {name: round(duration * 1000, 1) for name, duration in self._phases},
+            'total_ms': round((time.perf_counter() - self._started) * 1000, 1),
+            'memory': get_memory_usage()
+        }
+    
+    def log(self) -> None:
+        report = self.as_dict()
+        for name, duration_ms in report['phases_ms'].items():
+            logger.info(f"Startup phase '{name}' took {duration_ms:.1f} ms")
+        logger.info(f"Startup finished in {report['total_ms']:.1f} ms ({format_memory_usage(report['memory'])})")
@@ -21,7 +21,7 @@ def register_error_handlers(app: Flask):
         error_data = {
             'error': 'Endpoint not found',
             'message': 'The requested endpoint does not exist',
-            'available_endpoints': ['/convert', '/convert_image', '/convert_with_ai', '/health', '/']
+            'available_endpoints': ['/convert', '/convert_image', '/convert_with_ai', '/health', '/metrics', '/']
         }
         return Response(
             json.dumps(error_data, ensure_ascii=False, indent=2),
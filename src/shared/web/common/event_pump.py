@@ -0,0 +1,87 @@
+import contextvars
+import logging
+import queue
+import threading
+from typing import Any, Iterator
+from ...infrastructure.monitoring.metrics import CANCELLATIONS
+from ...infrastructure.monitoring.profiler import profiled
+from ...infrastructure.utils.cancellation import (
+    CANCEL_ABANDONED, CANCEL_CLIENT_DISCONNECT, CancellationToken, current_cancellation
+)
+
+logger = logging.getLogger(__name__)
+
+# SSE comment line; EventSource clients ignore it
+KEEPALIVE_EVENT = ": keepalive\n\n"
+
+# Yielded by pump_events() when no event arrived for a keepalive interval
+KEEPALIVE = object()
+
+_EVENT, _ERROR, _DONE = 'event', 'error', 'done'
+
+
+def pump_events(events: Iterator[Any], token: CancellationToken, keepalive_seconds: float) -> Iterator[Any]:
+    """Iterate events on a worker thread, yielding KEEPALIVE while none arrive.
+
+    A streaming response only learns that its client went away when a write
+    fails, and nothing is written while a document renders or a model call
+    waits for its first token. Writing keepalives in those gaps lets the
+    server notice the disconnect and close the response, which cancels the
+    token: the worker stops after the current event and closes events, and
+    subprocesses registered with the token are killed right away.
+
+    The worker runs in a copy of the caller's context, with the token active,
+    and in the request's profile if it is being profiled. Exceptions raised by
+    events are re-raised here.
+    """
+    pending: queue.Queue = queue.Queue()
+
+    def run() -> None:
+        # Usually the request's token, which the copied context already has active
+        activated = current_cancellation() is not token
+        if activated:
+            token.activate()
+        try:
+            for event in events:
+                if token.cancelled:
+                    break
+                pending.put((_EVENT, event))
+        except BaseException as e:
+            pending.put((_ERROR, e))
+        finally:
+            close = getattr(events, 'close', None)
+            if close is not None:
+                close()
+            if activated:
+                token.deactivate()
+            pending.put((_DONE, None))
+
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(profiled(run),), name='event-pump', daemon=True).start()
+
+    done = False
+    try:
+        while True:
+            try:
+                kind, value = pending.get(timeout=keepalive_seconds)
+            except queue.Empty:
+                yield KEEPALIVE
+                continue
+            if kind == _DONE:
+                done = True
+                return
+            if kind == _ERROR:
+                done = True
+                raise value
+            yield value
+    finally:
+        if not done:
+            # Closed early, e.g. by the server after the client disconnected
+            token.cancel(CANCEL_ABANDONED)
+
+
+def cancel_on_disconnect(token: CancellationToken, endpoint: str, stage: str) -> None:
+    """Cancel the work of a response the server closed before it finished"""
+    if token.cancel(CANCEL_CLIENT_DISCONNECT):
+        CANCELLATIONS.labels(endpoint=endpoint, stage=stage).inc()
+        logger.info(f"Client disconnected from {endpoint} during {stage}, conversion cancelled")
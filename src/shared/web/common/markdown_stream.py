@@ -0,0 +1,51 @@
+import hashlib
+from typing import Any, List, Optional
+
+
+RESULT_PAYLOADS = ('full', 'checksum')
+
+RESULT_PAYLOAD_ERROR = f"result_payload must be one of {', '.join(RESULT_PAYLOADS)}"
+
+
+class MarkdownStream:
+    """Builds the final markdown document of an SSE conversion as chunks arrive.
+
+    Every delta returned by push() and finish() is a piece of the final document,
+    enhanced on complete lines when an enhancer is given, so the result event can
+    carry a checksum instead of repeating the whole document.
+    """
+
+    def __init__(self, markdown_enhancer: Optional[Any] = None):
+        self._incremental = markdown_enhancer.create_incremental_enhancer() if markdown_enhancer else None
+        self._digest = hashlib.sha256()
+        self._parts: List[str] = []
+        self._size = 0
+
+    def push(self, text: str) -> str:
+        delta = self._incremental.feed(text) if self._incremental else text
+        self._record(delta)
+        return delta
+
+    def finish(self) -> str:
+        delta = self._incremental.finish() if self._incremental else ''
+        self._record(delta)
+        return delta
+
+    @property
+    def markdown(self) -> str:
+        return ''.join(self._parts)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def _record(self, delta: str) -> None:
+        if not delta:
+            return
+        self._parts.append(delta)
+        self._size += len(delta)
+        self._digest.update(delta.encode('utf-8'))
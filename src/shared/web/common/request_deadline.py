@@ -0,0 +1,66 @@
+import json
+import math
+import time
+from typing import Optional
+from flask import Flask, Response, g, request
+from ...infrastructure.config.settings import AppSettings
+from ...infrastructure.utils.cancellation import CancellationToken
+from .request_metrics import CONVERSION_ENDPOINTS
+
+DEADLINE_HEADER = 'X-Request-Deadline'
+DEADLINE_FIELD = 'deadline'
+
+# Part of the budget held back from rendering and model calls for enhancing
+# the markdown and sending the answer
+FINALIZE_RESERVE_SHARE = 0.05
+FINALIZE_RESERVE_MAX_SECONDS = 1.0
+
+
+def register_request_deadline(app: Flask, settings: AppSettings):
+    """Give every conversion request a cancellation token carrying its deadline.
+
+    The budget in seconds comes from the X-Request-Deadline header or the
+    "deadline" form field and can only shorten REQUEST_DEADLINE_SECONDS. It
+    counts from the start of the request, upload included.
+    """
+
+    @app.before_request
+    def start_request_deadline():
+        if request.endpoint not in CONVERSION_ENDPOINTS:
+            return None
+        start = time.monotonic()
+        try:
+            budget = _requested_budget(settings.request_deadline_seconds)
+        except ValueError as e:
+            return Response(
+                json.dumps({'error': 'Invalid deadline', 'message': str(e)}, ensure_ascii=False, indent=2),
+                mimetype='application/json; charset=utf-8',
+                status=400
+            )
+
+        deadline = None
+        if budget is not None:
+            deadline = start + budget - min(budget * FINALIZE_RESERVE_SHARE, FINALIZE_RESERVE_MAX_SECONDS)
+        g.cancellation = CancellationToken(deadline).activate()
+        return None
+
+    # Like the stage timer, the token stays active until a streamed response ends
+    @app.teardown_request
+    def finish_request_deadline(exc):
+        token = g.pop('cancellation', None)
+        if token is not None:
+            token.deactivate()
+
+
+def _requested_budget(server_budget: float) -> Optional[float]:
+    value = request.headers.get(DEADLINE_HEADER) or request.form.get(DEADLINE_FIELD)
+    if not value:
+        return server_budget if server_budget > 0 else None
+
+    try:
+        budget = float(value)
+    except ValueError:
+        raise ValueError(f"deadline must be a number of seconds, got {value!r}")
+    if not math.isfinite(budget) or budget <= 0:
+        raise ValueError("deadline must be a positive number of seconds")
+    return min(budget, server_budget) if server_budget > 0 else budget
@@ -0,0 +1,30 @@
+import os
+from flask import Flask, g, request
+from ...infrastructure.monitoring.memory_tracker import memory_tracker
+from ...infrastructure.utils.process_utils import get_current_rss_bytes, get_peak_rss_bytes
+from .request_metrics import CONVERSION_ENDPOINTS
+
+
+def register_request_memory(app: Flask):
+    
+    @app.before_request
+    def start_request_memory():
+        if request.endpoint not in CONVERSION_ENDPOINTS:
+            return
+        g.memory_rss_before = get_current_rss_bytes()
+        g.memory_peak_before = get_peak_rss_bytes()
+    
+    # Teardown runs once an SSE stream is finished, so the deltas cover the whole conversion
+    @app.teardown_request
+    def record_request_memory(exc):
+        if 'memory_rss_before' not in g:
+            return
+        file = request.files.get('file')
+        extension = os.path.splitext(file.filename)[1].lower() if file is not None and file.filename else 'none'
+        memory_tracker.record_request(
+            extension,
+            g.pop('memory_rss_before'),
+            get_current_rss_bytes(),
+            g.pop('memory_peak_before'),
+            get_peak_rss_bytes()
+        )
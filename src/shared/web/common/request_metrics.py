@@ -0,0 +1,78 @@
+import json
+import logging
+import time
+from flask import Flask, current_app, g, request
+from ...infrastructure.monitoring.metrics import REQUEST_DURATION, REQUESTS_IN_FLIGHT
+from ...infrastructure.monitoring.stage_timer import StageTimer
+
+slow_request_logger = logging.getLogger('markitdown.slow_requests')
+
+# Scrapes and health probes would only add noise to the request metrics
+UNTRACKED_ENDPOINTS = {'monitoring.metrics', 'health.health_check', 'static'}
+UNTRACKED_BLUEPRINTS = {'memory_debug'}
+
+CONVERSION_ENDPOINTS = {
+    'file_conversion.convert_file',
+    'file_conversion.convert_image_with_llm',
+    'file_conversion.convert_document_with_ai',
+    'file_conversion.convert_document_with_ai_stream',
+    'image_conversion.convert_image',
+    'image_conversion.convert_image_stream'
+}
+
+
+def register_request_metrics(app: Flask):
+    
+    @app.before_request
+    def start_request_metrics():
+        if request.endpoint is None or request.endpoint in UNTRACKED_ENDPOINTS or request.blueprint in UNTRACKED_BLUEPRINTS:
+            return
+        g.metrics_endpoint = request.endpoint
+        g.metrics_start = time.perf_counter()
+        g.metrics_status = 500
+        g.stage_timer = StageTimer().activate()
+        REQUESTS_IN_FLIGHT.labels(endpoint=request.endpoint).inc()
+
+    @app.after_request
+    def record_response_status(response):
+        if 'metrics_endpoint' in g:
+            g.metrics_status = response.status_code
+            # A streamed body has not run yet, its timings go into the result event instead
+            if not response.is_streamed:
+                response.headers['Server-Timing'] = g.stage_timer.server_timing_header()
+        return response
+
+    # Streamed (SSE) responses keep the request context until the stream ends,
+    # so teardown marks the real end of the request for both kinds of response
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        if 'metrics_endpoint' not in g:
+            return
+        endpoint = g.pop('metrics_endpoint')
+        timer = g.pop('stage_timer')
+        timer.deactivate()
+        REQUESTS_IN_FLIGHT.labels(endpoint=endpoint).dec()
+        REQUEST_DURATION.labels(endpoint=endpoint, status=str(g.metrics_status)).observe(
+            time.perf_counter() - g.metrics_start
+        )
+        _log_slow_request(endpoint, g.metrics_status, timer)
+
+
+def _log_slow_request(endpoint: str, status: int, timer: StageTimer):
+    threshold_ms = current_app.container.settings.slow_request_threshold_ms
+    if threshold_ms <= 0:
+        return
+
+    breakdown = timer.as_dict()
+    if breakdown['total_ms'] < threshold_ms:
+        return
+
+    slow_request_logger.warning(
+        f"Slow request {request.method} {request.path} took {breakdown['total_ms']:.1f} ms: "
+        + json.dumps({
+            'endpoint': endpoint,
+            'status': status,
+            'content_length': request.content_length,
+            **breakdown
+        }, ensure_ascii=False)
+    )
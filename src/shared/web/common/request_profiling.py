@@ -0,0 +1,73 @@
+import hmac
+import os
+import random
+from flask import Flask, g, request
+from ...infrastructure.config.settings import AppSettings
+from ...infrastructure.monitoring.profiler import RequestProfiler
+from .request_metrics import CONVERSION_ENDPOINTS
+
+PROFILE_HEADER = 'X-Profile-Token'
+
+
+def register_request_profiling(app: Flask, settings: AppSettings):
+    # Nothing is hooked in unless a trigger is configured, so requests pay
+    # no cost at all while profiling is off
+    if not settings.profile_token and settings.profile_sample_rate <= 0:
+        return
+    
+    @app.before_request
+    def start_request_profile():
+        if request.endpoint not in CONVERSION_ENDPOINTS:
+            return
+        
+        trigger = _profile_trigger(settings)
+        if trigger:
+            profiler = RequestProfiler.start(settings.profile_dir, trigger)
+            if profiler:
+                g.request_profiler = profiler
+    
+    @app.after_request
+    def add_profile_header(response):
+        if 'request_profiler' in g:
+            response.headers['X-Profile-Id'] = g.request_profiler.profile_id
+            g.profile_status = response.status_code
+        return response
+    
+    # Runs after an SSE stream has been fully sent, so streamed conversions
+    # are profiled end to end
+    @app.teardown_request
+    def save_request_profile(exc):
+        if 'request_profiler' not in g:
+            return
+        profiler = g.pop('request_profiler')
+        profiler.stop(_request_tags(g.get('profile_status', 500)))
+
+
+def _profile_trigger(settings: AppSettings):
+    token = request.headers.get(PROFILE_HEADER)
+    if token and settings.profile_token and hmac.compare_digest(token, settings.profile_token):
+        return 'header'
+    if settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate:
+        return 'sample'
+    return None
+
+
+def _request_tags(status: int) -> dict:
+    tags = {
+        'endpoint': request.endpoint,
+        'method': request.method,
+        'path': request.path,
+        'status': status,
+        'content_length': request.content_length
+    }
+    
+    file = request.files.get('file')
+    if file is not None and file.filename:
+        tags['filename'] = file.filename
+        tags['extension'] = os.path.splitext(file.filename)[1].lower()
+        try:
+            file.stream.seek(0, os.SEEK_END)
+            tags['file_size'] = file.stream.tell()
+        except (OSError, ValueError):
+            tags['file_size'] = None
+    return tags
@@ -1,14 +1,23 @@
 from flask import Flask
 from ..shared.infrastructure.config.settings import AppSettings
 from ..shared.infrastructure.utils.logger import setup_logging
+from ..shared.infrastructure.utils.startup_report import StartupReport
 from ..features.file_conversion.web.controllers.file_conversion_controller import file_conversion_bp
 from ..features.image_conversion.web.controllers.image_conversion_controller import image_conversion_bp
 from ..features.health.web.controllers.health_controller import health_bp
+from ..features.monitoring.web.controllers.metrics_controller import monitoring_bp
+from ..features.monitoring.web.controllers.memory_debug_controller import memory_debug_bp
 from ..shared.web.common.error_handlers import register_error_handlers
+from ..shared.web.common.request_metrics import register_request_metrics
+from ..shared.web.common.request_profiling import register_request_profiling
+from ..shared.web.common.request_memory import register_request_memory
+from ..shared.web.common.request_deadline import register_request_deadline
 from .dependency_injection import DependencyContainer
 
 
 def create_app(settings: AppSettings = None) -> Flask:
+    report = StartupReport()
+    
     if settings is None:
         settings = AppSettings()
     
@@ -18,13 +27,27 @@ def create_app(settings: AppSettings = None) -> Flask:
     
     setup_logging()
     
-    container = DependencyContainer()
+    with report.phase('container'):
+        container = DependencyContainer(settings)
     app.container = container
     
-    app.register_blueprint(file_conversion_bp)
-    app.register_blueprint(image_conversion_bp)
-    app.register_blueprint(health_bp)
+    if settings.warmup_converters:
+        container.warmup(report)
+    
+    with report.phase('blueprints'):
+        app.register_blueprint(file_conversion_bp)
+        app.register_blueprint(image_conversion_bp)
+        app.register_blueprint(health_bp)
+        app.register_blueprint(monitoring_bp)
+        app.register_blueprint(memory_debug_bp)
+        
+        register_error_handlers(app)
+        register_request_metrics(app)
+        register_request_profiling(app, settings)
+        register_request_memory(app)
+        register_request_deadline(app, settings)
     
-    register_error_handlers(app)
+    app.startup_report = report
+    report.log()
     
-    return app
\ No newline at end of file
+    return app
@@ -1,42 +1,101 @@
+from typing import Dict
 from ..features.file_conversion.application.use_cases.convert_file import ConvertFileUseCase
 from ..features.image_conversion.application.use_cases.convert_image import ConvertImageUseCase
 from ..features.ai_conversion.application.use_cases.convert_with_ai import ConvertWithAIUseCase
 from ..features.file_conversion.domain.services.markdown_enhancer import MarkdownEnhancerService
 from ..features.file_conversion.infrastructure.adapters.markitdown_adapter import MarkItDownAdapter, MarkItDownLLMAdapter
+from ..features.file_conversion.infrastructure.adapters.converter_registry import ConverterRegistry, parse_allowlist
 from ..features.image_conversion.infrastructure.adapters.azure_openai_adapter import AzureOpenAIAdapter
 from ..features.ai_conversion.infrastructure.adapters.image_converter_adapter import ImageConverterAdapter
+from ..features.ai_conversion.infrastructure.adapters.pdf_text_layer_adapter import PdfMinerTextLayerAdapter
+from ..features.ai_conversion.infrastructure.adapters.tesseract_ocr_adapter import TesseractOCRAdapter
+from ..features.ai_conversion.infrastructure.adapters.numpy_page_filter_adapter import NumpyPageFilterAdapter
+from ..features.ai_conversion.infrastructure.adapters.numpy_page_detail_adapter import NumpyPageDetailAdapter
+from ..features.ai_conversion.infrastructure.adapters.routing_ai_client import RoutingAIClient, parse_ai_backends
+from ..features.ai_conversion.infrastructure.adapters.preset_catalog import parse_conversion_presets
+from ..features.ai_conversion.infrastructure.adapters.azure_batch_adapter import AzureBatchAdapter
+from ..features.ai_conversion.infrastructure.adapters.file_job_store import FileJobStore
+from ..features.ai_conversion.infrastructure.adapters.batch_job_poller import BatchJobPoller
+from ..shared.domain.models.conversion_preset import ConversionPreset
+from ..features.ai_conversion.domain.services.backend_balancer import BackendBalancer
+from ..features.ai_conversion.domain.services.dpi_planner import DpiPlanner
+from ..features.ai_conversion.domain.services.hedge_policy import HedgePolicy
+from ..features.ai_conversion.domain.services.page_router import PageRouter
 from ..features.file_conversion.infrastructure.adapters.file_storage_adapter import FileStorageAdapter
+from ..features.file_conversion.infrastructure.adapters.file_result_cache import FileResultCache
+from ..shared.infrastructure.config.settings import AppSettings
+from ..shared.infrastructure.utils.startup_report import StartupReport
 
 
 class DependencyContainer:
     
-    def __init__(self):
+    def __init__(self, settings: AppSettings = None):
+        self._settings = settings or AppSettings()
+        self._converter_registry = ConverterRegistry(parse_allowlist(self._settings.converter_allowlist))
         self._markdown_enhancer = MarkdownEnhancerService()
-        self._markitdown_adapter = MarkItDownAdapter()
+        self._markitdown_adapter = MarkItDownAdapter(self._converter_registry)
         self._markitdown_llm_adapter = MarkItDownLLMAdapter()
         self._azure_openai_adapter = AzureOpenAIAdapter()
+        self._ai_router = RoutingAIClient(
+            self._azure_openai_adapter,
+            BackendBalancer(
+                parse_ai_backends(self._settings.ai_endpoints),
+                failure_threshold=self._settings.ai_breaker_failures,
+                open_seconds=self._settings.ai_breaker_open_seconds
+            ),
+            max_attempts=self._settings.ai_max_attempts,
+            hedge_policy=HedgePolicy(
+                self._settings.ai_hedge_percentile,
+                self._settings.ai_hedge_max_rate
+            ) if self._settings.ai_hedging else None
+        )
+        self._presets = parse_conversion_presets(self._settings.ai_presets)
         self._image_converter_adapter = ImageConverterAdapter()
+        self._text_layer_adapter = PdfMinerTextLayerAdapter()
+        self._ocr_adapter = TesseractOCRAdapter(self._settings.ocr_languages, self._settings.ocr_workers or None)
+        self._page_router = PageRouter(min_ocr_confidence=self._settings.ocr_min_confidence)
         self._file_storage_adapter = FileStorageAdapter()
         
         self._convert_file_use_case = ConvertFileUseCase(
             self._markitdown_adapter,
             self._file_storage_adapter,
-            self._markdown_enhancer
+            self._markdown_enhancer,
+            FileResultCache(self._settings.convert_cache_dir, self._settings.convert_cache_max_entries)
+            if self._settings.convert_cache_max_entries > 0 else None
         )
         
         self._convert_image_use_case = ConvertImageUseCase(
             self._markitdown_llm_adapter,
             self._azure_openai_adapter,
             self._file_storage_adapter,
-            self._markdown_enhancer
+            self._markdown_enhancer,
+            self._ocr_adapter,
+            self._page_router
         )
         
         self._convert_with_ai_use_case = ConvertWithAIUseCase(
-            self._azure_openai_adapter,
+            self._ai_router,
             self._image_converter_adapter,
             self._file_storage_adapter,
-            self._markdown_enhancer
+            self._markdown_enhancer,
+            self._text_layer_adapter,
+            self._page_router,
+            self._ocr_adapter,
+            NumpyPageFilterAdapter(),
+            page_detail=NumpyPageDetailAdapter(),
+            dpi_planner=DpiPlanner(pixel_budget=self._settings.adaptive_dpi_megapixels * 1e6),
+            batch_client=AzureBatchAdapter(self._azure_openai_adapter, self._settings.ai_batch_api_version),
+            job_store=FileJobStore(self._settings.ai_batch_job_dir)
         )
+        self._batch_job_poller = BatchJobPoller(self._convert_with_ai_use_case, self._settings.ai_batch_poll_seconds)
+    
+    def warmup(self, report: StartupReport) -> None:
+        with report.phase('warmup_markitdown'):
+            self._markitdown_adapter.warmup()
+        with report.phase('warmup_image_converter'):
+            self._image_converter_adapter.warmup()
+        with report.phase('warmup_azure_openai'):
+            self._azure_openai_adapter.warmup()
     
     @property
     def convert_file_use_case(self) -> ConvertFileUseCase:
@@ -50,6 +109,34 @@ class DependencyContainer:
     def convert_with_ai_use_case(self) -> ConvertWithAIUseCase:
         return self._convert_with_ai_use_case
     
+    @property
+    def batch_job_poller(self) -> BatchJobPoller:
+        return self._batch_job_poller
+
+    @property
+    def ai_router(self) -> RoutingAIClient:
+        return self._ai_router
+    
+    @property
+    def presets(self) -> Dict[str, ConversionPreset]:
+        return self._presets
+    
+    @property
+    def ocr_adapter(self) -> TesseractOCRAdapter:
+        return self._ocr_adapter
+    
+    @property
+    def page_router(self) -> PageRouter:
+        return self._page_router
+    
     @property
     def file_storage_adapter(self) -> FileStorageAdapter:
-        return self._file_storage_adapter
\ No newline at end of file
+        return self._file_storage_adapter
+    
+    @property
+    def converter_registry(self) -> ConverterRegistry:
+        return self._converter_registry
+    
+    @property
+    def settings(self) -> AppSettings:
+        return self._settings
\ No newline at end of file
@@ -16,6 +16,5 @@ exec gunicorn \
     --workers 4 \
     --timeout 30 \
     --keep-alive 2 \
-    --max-requests 1000 \
     --preload \
     main:app
\ No newline at end of file
@@ -0,0 +1,485 @@
+"""Local stand-in for the Azure OpenAI chat completions API.
+
+Serves the deployment route used by AzureOpenAIAdapter, streaming and not,
+with simulated time to first token, generation speed, throttling (429 with
+retry-after) and failures, so load and latency tests can run without quota.
+The files and batches routes of the batch API are served too: a submitted
+batch completes after batch_seconds, with the answers the chat route gives.
+
+    python tools/mock_azure_openai.py --port 8089 --ttft-ms 800 --tokens-per-sec 40
+
+Point the server at it with azure_endpoint=http://127.0.0.1:8089 and any
+api_key. Settings can be changed at runtime through POST /mock/config and
+counters are available from GET /mock/stats.
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, fields
+from typing import Iterator, List, Optional
+from flask import Flask, Response, request
+
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'lognormal')
+
+# Azure bills a high-detail image by tiles; a fixed estimate is enough here
+IMAGE_PROMPT_TOKENS = 765
+
+WORDS = (
+    'document', 'quarterly', 'revenue', 'analysis', 'customer', 'product', 'market', 'report',
+    'summary', 'growth', 'region', 'service', 'total', 'project', 'result', 'schedule',
+    '매출', '분기', '보고서', '고객', '분석', '요약', '제품', '일정'
+)
+
+REFUSAL_TOKENS = ("I'm ", "sorry, ", "but ", "I ", "can't ", "analyze ", "this ", "image.")
+
+
+@dataclass
+class MockConfig:
+    latency_distribution: str = 'lognormal'
+    ttft_ms: float = 800.0
+    # Relative spread of time to first token: +-spread for uniform, sigma for lognormal
+    ttft_spread: float = 0.4
+    tokens_per_sec: float = 50.0
+    output_tokens: int = 400
+    # Fraction of requests rejected with 429, plus a hard concurrency quota
+    throttle_rate: float = 0.0
+    max_concurrency: int = 0
+    retry_after_seconds: float = 1.0
+    # Fraction of requests answered with 500, and of streams cut off halfway
+    failure_rate: float = 0.0
+    midstream_failure_rate: float = 0.0
+    # Fraction of answers that are a refusal instead of markdown, from every deployment
+    # or only from refusal_deployment (e.g. the small model of a cascade)
+    refusal_rate: float = 0.0
+    refusal_deployment: Optional[str] = None
+    # Seconds from submitting a batch until it is completed
+    batch_seconds: float = 5.0
+    seed: Optional[int] = None
+
+    def update(self, values: dict) -> None:
+        known = {f.name for f in fields(self)}
+        for key, value in values.items():
+            if key not in known:
+                raise ValueError(f"Unknown setting: {key}")
+            setattr(self, key, value)
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_distribution must be one of: {', '.join(LATENCY_DISTRIBUTIONS)}")
+
+
+class MockStats:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.streamed = 0
+            self.throttled = 0
+            self.failed = 0
+            self.midstream_failures = 0
+            self.refused = 0
+            self.batches = 0
+            self.batch_requests = 0
+            self.completed = 0
+            self.completion_tokens = 0
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+    def count(self, **increments) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {name: value for name, value in vars(self).items() if not name.startswith('_')}
+
+
+def create_mock_app(config: Optional[MockConfig] = None) -> Flask:
+    config = config or MockConfig()
+    stats = MockStats()
+    rng = random.Random(config.seed)
+    rng_lock = threading.Lock()
+
+    app = Flask(__name__)
+    app.mock_config = config
+    app.mock_stats = stats
+    # Uploaded files and batch jobs of the batch API, by id
+    files = {}
+    batches = {}
+    batch_lock = threading.RLock()
+
+    def roll(probability: float) -> bool:
+        with rng_lock:
+            return probability > 0 and rng.random() < probability
+
+    def sample_ttft() -> float:
+        with rng_lock:
+            if config.latency_distribution == 'uniform':
+                factor = rng.uniform(1 - config.ttft_spread, 1 + config.ttft_spread)
+            elif config.latency_distribution == 'lognormal':
+                factor = math.exp(rng.gauss(0, config.ttft_spread))
+            else:
+                factor = 1.0
+        return max(0.0, config.ttft_ms * factor / 1000)
+
+    def generate_tokens(page: str) -> List[str]:
+        with rng_lock:
+            words = [rng.choice(WORDS) for _ in range(max(1, config.output_tokens - 8))]
+        tokens = ['# ', f'{page}\n\n']
+        for i, word in enumerate(words):
+            if i and i % 40 == 0:
+                tokens.append('\n\n## ')
+            elif i and i % 12 == 0:
+                tokens.append('\n- ')
+            tokens.append(f'{word} ')
+        return tokens
+
+    def answer(deployment: str, body: dict):
+        """Tokens of the reply to a chat request and why it finished"""
+        max_tokens = body.get('max_tokens') or config.output_tokens
+        if roll(config.refusal_rate) and config.refusal_deployment in (None, deployment):
+            stats.count(refused=1)
+            generated = list(REFUSAL_TOKENS)
+        else:
+            generated = generate_tokens(_page_label(body.get('messages', [])))
+        # Like the real API, an answer cut off at max_tokens finishes with 'length'
+        return generated[:max_tokens], 'length' if len(generated) > max_tokens else 'stop'
+
+    def store_file(content: bytes, filename: str, purpose: str) -> dict:
+        file_id = f'file-{uuid.uuid4().hex[:24]}'
+        entry = {
+            'id': file_id, 'object': 'file', 'bytes': len(content), 'created_at': int(time.time()),
+            'filename': filename, 'purpose': purpose, 'status': 'processed'
+        }
+        with batch_lock:
+            files[file_id] = (entry, content)
+        return entry
+
+    def run_batch(batch: dict) -> None:
+        """Answer every line of the batch's input file, as the batch API does once the batch ran"""
+        _, content = files[batch['input_file_id']]
+        outputs, errors = [], []
+        for line in content.decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            body = entry.get('body') or {}
+            result = {'id': f'batch_req_{uuid.uuid4().hex[:24]}', 'custom_id': entry.get('custom_id')}
+            if roll(config.failure_rate):
+                result.update(response={'status_code': 500, 'body': {'error': {
+                    'code': 'InternalServerError', 'message': 'The server had an error while processing your request.'
+                }}}, error=None)
+                errors.append(result)
+                continue
+            tokens, finish_reason = answer(body.get('model', ''), body)
+            completion = _completion(
+                f'chatcmpl-{uuid.uuid4().hex[:24]}', body.get('model', ''), tokens, finish_reason,
+                _estimate_prompt_tokens(body.get('messages', []))
+            )
+            result.update(response={'status_code': 200, 'body': completion}, error=None)
+            outputs.append(result)
+
+        stats.count(batch_requests=len(outputs) + len(errors), completion_tokens=sum(
+            result['response']['body']['usage']['completion_tokens'] for result in outputs
+        ))
+        batch['output_file_id'] = store_file(_jsonl(outputs), 'output.jsonl', 'batch_output')['id']
+        batch['error_file_id'] = store_file(_jsonl(errors), 'errors.jsonl', 'batch_output')['id'] if errors else None
+        batch['request_counts'] = {'total': len(outputs) + len(errors), 'completed': len(outputs), 'failed': len(errors)}
+        batch['status'] = 'completed'
+        batch['completed_at'] = int(time.time())
+
+    def error_response(status: int, code: str, message: str, headers: dict = None) -> Response:
+        return Response(
+            json.dumps({'error': {'code': code, 'message': message}}),
+            status=status,
+            mimetype='application/json',
+            headers=headers or {}
+        )
+
+    @app.route('/openai/deployments/<deployment>/chat/completions', methods=['POST'])
+    def chat_completions(deployment: str):
+        if not request.headers.get('api-key') and not request.headers.get('Authorization'):
+            return error_response(401, '401', 'Access denied due to missing subscription key.')
+
+        body = request.get_json(silent=True) or {}
+        stream = bool(body.get('stream'))
+        stats.count(requests=1)
+
+        if roll(config.throttle_rate) or (config.max_concurrency and stats.in_flight >= config.max_concurrency):
+            stats.count(throttled=1)
+            retry_after = config.retry_after_seconds
+            return error_response(
+                429, '429',
+                f'Requests to the ChatCompletions_Create Operation have exceeded the rate limit. '
+                f'Please retry after {math.ceil(retry_after)} seconds.',
+                {'retry-after': str(math.ceil(retry_after)), 'retry-after-ms': str(int(retry_after * 1000))}
+            )
+
+        if roll(config.failure_rate):
+            stats.count(failed=1)
+            return error_response(500, 'InternalServerError', 'The server had an error while processing your request.')
+
+        prompt_tokens = _estimate_prompt_tokens(body.get('messages', []))
+        tokens, finish_reason = answer(deployment, body)
+        ttft = sample_ttft()
+        token_interval = 1 / config.tokens_per_sec if config.tokens_per_sec > 0 else 0.0
+        completion_id = f'chatcmpl-{uuid.uuid4().hex[:24]}'
+
+        if not stream:
+            stats.count(in_flight=1)
+            try:
+                time.sleep(ttft + token_interval * len(tokens))
+            finally:
+                stats.count(in_flight=-1, completed=1, completion_tokens=len(tokens))
+            return Response(
+                json.dumps(_completion(completion_id, deployment, tokens, finish_reason, prompt_tokens), ensure_ascii=False),
+                mimetype='application/json'
+            )
+
+        include_usage = bool((body.get('stream_options') or {}).get('include_usage'))
+        cut_off_at = len(tokens) // 2 if roll(config.midstream_failure_rate) else None
+        stats.count(streamed=1)
+
+        def generate() -> Iterator[str]:
+            stats.count(in_flight=1)
+            sent = 0
+            try:
+                time.sleep(ttft)
+                yield _stream_chunk(completion_id, deployment, {'role': 'assistant', 'content': ''})
+                for token in tokens:
+                    if cut_off_at is not None and sent >= cut_off_at:
+                        stats.count(midstream_failures=1)
+                        return
+                    yield _stream_chunk(completion_id, deployment, {'content': token})
+                    sent += 1
+                    if token_interval:
+                        time.sleep(token_interval)
+                yield _stream_chunk(completion_id, deployment, {}, finish_reason=finish_reason)
+                if include_usage:
+                    yield 'data: ' + json.dumps({
+                        'id': completion_id, 'object': 'chat.completion.chunk', 'model': deployment, 'choices': [],
+                        'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': sent, 'total_tokens': prompt_tokens + sent}
+                    }) + '\n\n'
+                yield 'data: [DONE]\n\n'
+                stats.count(completed=1)
+            finally:
+                stats.count(in_flight=-1, completion_tokens=sent)
+
+        return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+    @app.route('/openai/files', methods=['POST'])
+    def upload_file():
+        upload = request.files.get('file')
+        if upload is None:
+            return error_response(400, 'invalidPayload', 'A file is required.')
+        entry = store_file(upload.read(), upload.filename or 'upload.jsonl', request.form.get('purpose', 'batch'))
+        return Response(json.dumps(entry), mimetype='application/json')
+
+    @app.route('/openai/files/<file_id>', methods=['GET'])
+    def get_file(file_id: str):
+        if file_id not in files:
+            return error_response(404, 'notFound', f'File {file_id} not found.')
+        return Response(json.dumps(files[file_id][0]), mimetype='application/json')
+
+    @app.route('/openai/files/<file_id>/content', methods=['GET'])
+    def get_file_content(file_id: str):
+        if file_id not in files:
+            return error_response(404, 'notFound', f'File {file_id} not found.')
+        return Response(files[file_id][1], mimetype='application/octet-stream')
+
+    @app.route('/openai/batches', methods=['POST'])
+    def create_batch():
+        body = request.get_json(silent=True) or {}
+        if body.get('input_file_id') not in files:
+            return error_response(400, 'invalidPayload', f"Input file {body.get('input_file_id')} not found.")
+        batch = {
+            'id': f'batch_{uuid.uuid4()}', 'object': 'batch', 'endpoint': body.get('endpoint', '/chat/completions'),
+            'input_file_id': body['input_file_id'], 'completion_window': body.get('completion_window', '24h'),
+            'status': 'validating', 'created_at': int(time.time()), 'output_file_id': None, 'error_file_id': None,
+            'errors': None, 'request_counts': {'total': 0, 'completed': 0, 'failed': 0}
+        }
+        with batch_lock:
+            batches[batch['id']] = (batch, time.monotonic() + config.batch_seconds)
+        stats.count(batches=1)
+        return Response(json.dumps(batch), mimetype='application/json')
+
+    @app.route('/openai/batches/<batch_id>', methods=['GET'])
+    def get_batch(batch_id: str):
+        if batch_id not in batches:
+            return error_response(404, 'notFound', f'Batch {batch_id} not found.')
+        batch, ready_at = batches[batch_id]
+        with batch_lock:
+            if batch['status'] != 'completed':
+                if time.monotonic() >= ready_at:
+                    run_batch(batch)
+                else:
+                    batch['status'] = 'in_progress'
+        return Response(json.dumps(batch), mimetype='application/json')
+
+    @app.route('/mock/config', methods=['GET', 'POST'])
+    def mock_config():
+        if request.method == 'POST':
+            try:
+                config.update(request.get_json(force=True) or {})
+            except (ValueError, TypeError) as e:
+                return error_response(400, 'InvalidConfig', str(e))
+            if 'seed' in (request.get_json(silent=True) or {}):
+                with rng_lock:
+                    rng.seed(config.seed)
+        return Response(json.dumps(asdict(config)), mimetype='application/json')
+
+    @app.route('/mock/stats', methods=['GET'])
+    def mock_stats():
+        return Response(json.dumps(stats.as_dict()), mimetype='application/json')
+
+    @app.route('/mock/reset', methods=['POST'])
+    def mock_reset():
+        stats.reset()
+        return Response(json.dumps(stats.as_dict()), mimetype='application/json')
+
+    return app
+
+
+def _stream_chunk(completion_id: str, deployment: str, delta: dict, finish_reason: str = None) -> str:
+    return 'data: ' + json.dumps({
+        'id': completion_id,
+        'object': 'chat.completion.chunk',
+        'created': int(time.time()),
+        'model': deployment,
+        'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]
+    }, ensure_ascii=False) + '\n\n'
+
+
+def _completion(completion_id: str, deployment: str, tokens: List[str], finish_reason: str, prompt_tokens: int) -> dict:
+    return {
+        'id': completion_id,
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': deployment,
+        'choices': [{
+            'index': 0,
+            'finish_reason': finish_reason,
+            'message': {'role': 'assistant', 'content': ''.join(tokens)}
+        }],
+        'usage': {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': len(tokens),
+            'total_tokens': prompt_tokens + len(tokens)
+        }
+    }
+
+
+def _jsonl(lines: List[dict]) -> bytes:
+    return ''.join(json.dumps(line, ensure_ascii=False) + '\n' for line in lines).encode('utf-8')
+
+
+def _estimate_prompt_tokens(messages: list) -> int:
+    tokens = 0
+    for message in messages:
+        content = message.get('content')
+        parts = content if isinstance(content, list) else [{'type': 'text', 'text': content or ''}]
+        for part in parts:
+            if part.get('type') == 'image_url':
+                tokens += IMAGE_PROMPT_TOKENS
+            else:
+                tokens += len(part.get('text') or '') // 4
+    return tokens
+
+
+def _page_label(messages: list) -> str:
+    # The adapter names the page in its prompt ("examine this page 3")
+    for message in messages:
+        content = message.get('content')
+        for part in content if isinstance(content, list) else []:
+            text = part.get('text') or ''
+            marker = text.find('examine this ')
+            if marker >= 0:
+                return text[marker + len('examine this '):].split(' and', 1)[0].strip().title()
+    return 'Image'
+
+
+class MockAzureOpenAIServer:
+    """The mock served from a background thread, for benchmarks and tests"""
+
+    def __init__(self, config: Optional[MockConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        from werkzeug.serving import make_server
+
+        self.app = create_mock_app(config)
+        self._server = make_server(host, port, self.app, threaded=True)
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-azure-openai', daemon=True)
+
+    @property
+    def endpoint(self) -> str:
+        return f'http://{self._server.host}:{self._server.port}'
+
+    @property
+    def config(self) -> MockConfig:
+        return self.app.mock_config
+
+    @property
+    def stats(self) -> MockStats:
+        return self.app.mock_stats
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def start(self) -> 'MockAzureOpenAIServer':
+        if not self._thread.is_alive():
+            self._thread.start()
+        return self
+
+    def shutdown(self) -> None:
+        self._server.shutdown()
+        self._thread.join()
+
+    def __enter__(self) -> 'MockAzureOpenAIServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+
+def start_in_thread(config: Optional[MockConfig] = None, host: str = '127.0.0.1', port: int = 0) -> MockAzureOpenAIServer:
+    return MockAzureOpenAIServer(config, host, port).start()
+
+
+def main() -> None:
+    defaults = MockConfig()
+    parser = argparse.ArgumentParser(description='Mock Azure OpenAI chat completions server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency-distribution', choices=LATENCY_DISTRIBUTIONS, default=defaults.latency_distribution)
+    parser.add_argument('--ttft-ms', type=float, default=defaults.ttft_ms, help='median time to first token')
+    parser.add_argument('--ttft-spread', type=float, default=defaults.ttft_spread)
+    parser.add_argument('--tokens-per-sec', type=float, default=defaults.tokens_per_sec, help='0 sends every token at once')
+    parser.add_argument('--output-tokens', type=int, default=defaults.output_tokens)
+    parser.add_argument('--throttle-rate', type=float, default=defaults.throttle_rate, help='fraction of requests answered with 429')
+    parser.add_argument('--max-concurrency', type=int, default=defaults.max_concurrency, help='429 above this many in-flight requests, 0 is unlimited')
+    parser.add_argument('--retry-after-seconds', type=float, default=defaults.retry_after_seconds)
+    parser.add_argument('--failure-rate', type=float, default=defaults.failure_rate, help='fraction of requests answered with 500')
+    parser.add_argument('--midstream-failure-rate', type=float, default=defaults.midstream_failure_rate)
+    parser.add_argument('--refusal-rate', type=float, default=defaults.refusal_rate, help='fraction of answers that are refusals')
+    parser.add_argument('--refusal-deployment', default=defaults.refusal_deployment, help='only this deployment refuses')
+    parser.add_argument('--batch-seconds', type=float, default=defaults.batch_seconds, help='time until a submitted batch is completed')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    config = MockConfig(**{f.name: getattr(args, f.name) for f in fields(MockConfig)})
+    server = MockAzureOpenAIServer(config, args.host, args.port)
+    print(f"Mock Azure OpenAI listening on {server.endpoint} ({json.dumps(asdict(config))})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file